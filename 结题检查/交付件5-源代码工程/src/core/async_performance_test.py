@@ -0,0 +1,267 @@
+"""
+异步性能测试工具
+基于 asyncio 的并发测试引擎，单个线程即可维持数千个并发虚拟用户
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, Any, Optional, List, Tuple
+from performance_test import PerformanceTest
+from histogram import LatencyHistogram
+from load_profile import LoadProfile
+from config import LOAD_PROFILE_TICK_MS
+from async_utils import AsyncHttpClient
+from request_trace import RequestOutcomes
+import request_trace
+import json_codec
+from logger import get_logger, begin_sampled_call, end_sampled_call
+
+logger = get_logger(__name__)
+
+
+class AsyncPerformanceTest(PerformanceTest):
+    """异步性能测试工具类
+
+    调用方式与结果格式均与 PerformanceTest 相同，区别在于被测函数必须是协程函数
+    （如 BaseTest.async_get_books），所有并发请求在同一个事件循环中执行。
+    """
+
+    def concurrent_test(
+        self,
+        func: Callable,
+        concurrency: int = 1,
+        iterations: int = 1,
+        *args,
+        expected_interval_ms: Optional[float] = None,
+        keep_samples: bool = False,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        异步并发测试
+
+        Args:
+            func: 要测试的协程函数
+            concurrency: 并发数
+            iterations: 每次测试的迭代次数（取平均值）
+            *args: 函数位置参数
+            expected_interval_ms: 期望请求间隔（毫秒），指定后额外计算协调遗漏校正后的统计数据
+            keep_samples: 是否保留全部原始样本（结果中的 all_durations），默认只记录直方图
+            **kwargs: 函数关键字参数
+
+        Returns:
+            性能测试结果字典
+        """
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError(f"异步引擎需要协程函数，实际为: {func!r}")
+
+        logger.info(f"开始异步并发测试 - 并发数: {concurrency}, 迭代次数: {iterations}")
+
+        histogram, samples, outcomes = asyncio.run(
+            self._run_iterations(func, concurrency, iterations, args, kwargs, keep_samples)
+        )
+
+        # 计算统计数据并打印结果
+        return self._build_result(histogram, concurrency, iterations, expected_interval_ms, samples, outcomes.summary())
+
+    async def _run_iterations(
+        self,
+        func: Callable,
+        concurrency: int,
+        iterations: int,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        keep_samples: bool = False
+    ) -> Tuple[LatencyHistogram, Optional[List[float]], RequestOutcomes]:
+        """
+        在同一个事件循环中执行全部迭代
+
+        Args:
+            func: 要测试的协程函数
+            concurrency: 并发数
+            iterations: 迭代次数
+            args: 函数位置参数
+            kwargs: 函数关键字参数
+            keep_samples: 是否保留全部原始样本
+
+        Returns:
+            (所有成功请求的响应时间直方图, 原始样本列表或 None, 调用结果统计)
+        """
+        histogram = LatencyHistogram()
+        outcomes = RequestOutcomes()
+        samples = [] if keep_samples else None
+
+        window_start = time.perf_counter()
+        try:
+            for iteration in range(iterations):
+                logger.info(f"执行第 {iteration + 1}/{iterations} 次迭代")
+
+                start_time = time.perf_counter()
+                durations = await asyncio.gather(
+                    *(self._async_observed_execution(outcomes, func, *args, **kwargs) for _ in range(concurrency)),
+                    return_exceptions=True
+                )
+                total_time = time.perf_counter() - start_time
+
+                for outcome in durations:
+                    if isinstance(outcome, BaseException):
+                        logger.error(f"任务执行失败: {str(outcome)}")
+                    else:
+                        histogram.record(outcome)
+                        if samples is not None:
+                            samples.append(outcome)
+
+                logger.info(f"第 {iteration + 1} 次迭代完成 - 总耗时: {total_time:.4f}秒")
+        finally:
+            outcomes.elapsed_s = time.perf_counter() - window_start
+            # 会话绑定在本次事件循环上，循环结束前统一关闭
+            await AsyncHttpClient.close_all()
+
+        return histogram, samples, outcomes
+
+    def _run_profile(
+        self,
+        func: Callable,
+        profile: LoadProfile,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        slot: int = 0,
+        stride: int = 1
+    ) -> Tuple[Dict[str, LatencyHistogram], Dict[str, RequestOutcomes]]:
+        """
+        在同一个事件循环中按负载曲线执行，每个虚拟用户是一个常驻协程
+
+        Args:
+            func: 要测试的协程函数
+            profile: 负载曲线
+            args: 函数位置参数
+            kwargs: 函数关键字参数
+            slot: 本次负责的虚拟用户编号余数
+            stride: 虚拟用户编号的步长
+
+        Returns:
+            (各阶段响应时间直方图, 各阶段调用结果统计)
+        """
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError(f"异步引擎需要协程函数，实际为: {func!r}")
+
+        return asyncio.run(self._run_profile_async(func, profile, args, kwargs, slot, stride))
+
+    async def _run_profile_async(
+        self,
+        func: Callable,
+        profile: LoadProfile,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        slot: int,
+        stride: int
+    ) -> Tuple[Dict[str, LatencyHistogram], Dict[str, RequestOutcomes]]:
+        """
+        负载曲线的协程实现，逻辑与 VirtualUserPool 相同
+
+        Returns:
+            (各阶段响应时间直方图, 各阶段调用结果统计)
+        """
+        histograms = {stage.name: LatencyHistogram() for stage in profile.stages}
+        outcomes = {stage.name: RequestOutcomes() for stage in profile.stages}
+        condition = asyncio.Condition()
+        state = {"stage": None, "target": 0, "finished": False}
+
+        async def virtual_user(user_index: int):
+            while True:
+                async with condition:
+                    await condition.wait_for(lambda: state["finished"] or user_index < state["target"])
+                    if state["finished"]:
+                        return
+                    stage = state["stage"]
+
+                try:
+                    duration = await self._async_observed_execution(outcomes[stage.name], func, *args, **kwargs)
+                except Exception:
+                    continue
+                histograms[stage.name].record(duration)
+
+        users = [
+            asyncio.create_task(virtual_user(user_index))
+            for user_index in range(slot, profile.max_users, stride)
+        ]
+
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        try:
+            while True:
+                located = profile.locate(loop.time() - start_time)
+                if located is None:
+                    break
+
+                index, stage, offset = located
+                target = stage.users_at(offset)
+                if stage is not state["stage"]:
+                    logger.info(f"进入负载阶段 {index + 1}/{len(profile.stages)}: {stage}")
+
+                if stage is not state["stage"] or target != state["target"]:
+                    async with condition:
+                        state["stage"] = stage
+                        state["target"] = target
+                        condition.notify_all()
+
+                await asyncio.sleep(LOAD_PROFILE_TICK_MS / 1000)
+        finally:
+            async with condition:
+                state["finished"] = True
+                condition.notify_all()
+            await asyncio.gather(*users, return_exceptions=True)
+            await AsyncHttpClient.close_all()
+
+        for stage in profile.stages:
+            outcomes[stage.name].elapsed_s = stage.duration
+        return histograms, outcomes
+
+    async def _async_observed_execution(self, outcomes: RequestOutcomes, func: Callable, *args, **kwargs) -> float:
+        """
+        执行协程函数并测量时间，同时追踪期间的HTTP响应并计入调用结果统计
+
+        Args:
+            outcomes: 调用结果统计
+            func: 要执行的协程函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            执行时间（毫秒）
+        """
+        begin_sampled_call()
+        request_trace.begin()
+        try:
+            with json_codec.decoding(self.decode_responses):
+                duration_ms = await self._async_timed_execution(func, *args, **kwargs)
+        except Exception as e:
+            outcomes.record(request_trace.end(), e)
+            end_sampled_call(True)
+            raise
+        end_sampled_call(outcomes.record(request_trace.end(), duration_ms=duration_ms))
+        return duration_ms
+
+    async def _async_timed_execution(self, func: Callable, *args, **kwargs) -> float:
+        """
+        执行协程函数并测量时间
+
+        Args:
+            func: 要执行的协程函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            执行时间（毫秒）
+        """
+        start_time = time.perf_counter()
+        try:
+            await func(*args, **kwargs)
+        except Exception as e:
+            logger.error("函数执行出错: %s", e)
+            raise
+
+        return (time.perf_counter() - start_time) * 1000
+
+
+# 创建全局异步性能测试实例
+async_perf_test = AsyncPerformanceTest()
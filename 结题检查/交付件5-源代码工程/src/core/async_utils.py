@@ -0,0 +1,256 @@
+"""
+异步HTTP客户端模块
+基于 asyncio 和 aiohttp 的非阻塞HTTP客户端，供异步性能测试引擎使用
+"""
+
+import asyncio
+import json
+import time
+import weakref
+from typing import Dict, Any, Optional
+from config import API_BASE_URL, REQUEST_TIMEOUT, ASYNC_CONNECTION_LIMIT, REQUEST_ID_HEADER
+from logger import get_logger
+import request_trace
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = get_logger(__name__)
+
+
+class AsyncResponse:
+    """异步请求的响应对象（与 requests.Response 的常用属性保持一致）"""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes, url: str = ""):
+        """
+        初始化响应对象
+
+        Args:
+            status_code: 响应状态码
+            headers: 响应头
+            content: 响应体
+            url: 请求URL
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self) -> str:
+        """响应体文本"""
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """将响应体解析为JSON"""
+        return json.loads(self.content)
+
+
+def _phase_trace_config() -> "aiohttp.TraceConfig":
+    """
+    创建按阶段记录请求耗时的 aiohttp 追踪配置
+
+    aiohttp 的连接建立事件包含 TLS 握手，因此 HTTPS 请求的 TLS 耗时计入 TCP 连接阶段。
+
+    Returns:
+        aiohttp.TraceConfig: 追踪配置
+    """
+    config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter_ns()
+        context.sent = context.start
+        context.dns_ns = 0
+        context.setup_ns = 0
+
+    async def on_dns_resolvehost_start(session, context, params):
+        context.dns_start = time.perf_counter_ns()
+
+    async def on_dns_resolvehost_end(session, context, params):
+        elapsed = time.perf_counter_ns() - context.dns_start
+        context.dns_ns += elapsed
+        request_trace.record_phase("dns", elapsed)
+
+    async def on_connection_create_start(session, context, params):
+        context.connect_start = time.perf_counter_ns()
+
+    async def on_connection_create_end(session, context, params):
+        elapsed = time.perf_counter_ns() - context.connect_start
+        context.setup_ns += elapsed
+        request_trace.record_phase("connect", max(elapsed - context.dns_ns, 0))
+
+    async def on_request_headers_sent(session, context, params):
+        context.sent = time.perf_counter_ns()
+        request_trace.record_phase("send", max(context.sent - context.start - context.setup_ns, 0))
+
+    async def on_request_end(session, context, params):
+        request_trace.record_phase("ttfb", time.perf_counter_ns() - context.sent)
+
+    config.on_request_start.append(on_request_start)
+    config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    config.on_connection_create_start.append(on_connection_create_start)
+    config.on_connection_create_end.append(on_connection_create_end)
+    config.on_request_headers_sent.append(on_request_headers_sent)
+    config.on_request_end.append(on_request_end)
+    return config
+
+
+class AsyncHttpClient:
+    """异步HTTP客户端封装"""
+
+    _instances = weakref.WeakSet()
+
+    def __init__(
+        self,
+        base_url=API_BASE_URL,
+        timeout=REQUEST_TIMEOUT,
+        limit=ASYNC_CONNECTION_LIMIT,
+        request_id_header: Optional[str] = REQUEST_ID_HEADER
+    ):
+        """
+        初始化异步HTTP客户端
+
+        aiohttp 的会话必须在事件循环内创建，因此会话在首次请求时按当前事件循环惰性创建。
+
+        Args:
+            base_url: 基础URL
+            timeout: 请求超时时间（秒）
+            limit: 连接数上限（0 表示不限制）
+            request_id_header: 携带请求ID的请求头名称（同 HttpClient），为空时不发送
+        """
+        if aiohttp is None:
+            raise ImportError("异步HTTP客户端需要安装 aiohttp: pip install aiohttp")
+
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limit = limit
+        self.request_id_header = request_id_header
+        self.cookies = {}
+        self._session = None
+        self._loop = None
+
+        AsyncHttpClient._instances.add(self)
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """
+        获取绑定到当前事件循环的会话
+
+        Returns:
+            aiohttp.ClientSession: 会话对象
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.limit)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                cookies=self.cookies,
+                trace_configs=[_phase_trace_config()]
+            )
+            self._loop = loop
+        return self._session
+
+    def set_cookies(self, cookies: Dict[str, str]):
+        """
+        设置cookies
+
+        Args:
+            cookies: cookies字典
+        """
+        self.cookies = dict(cookies)
+        if self._session is not None and not self._session.closed:
+            self._session.cookie_jar.update_cookies(cookies)
+
+    def get_cookies(self) -> Dict[str, str]:
+        """
+        获取当前cookies
+
+        Returns:
+            cookies字典
+        """
+        if self._session is not None and not self._session.closed:
+            return {cookie.key: cookie.value for cookie in self._session.cookie_jar}
+        return dict(self.cookies)
+
+    def clear_cookies(self):
+        """清除cookies"""
+        self.cookies = {}
+        if self._session is not None and not self._session.closed:
+            self._session.cookie_jar.clear()
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> AsyncResponse:
+        """
+        发送异步HTTP请求
+
+        Args:
+            method: 请求方法（GET, POST, PUT, DELETE等）
+            endpoint: API端点
+            **kwargs: 其他请求参数（params, json, data, headers, timeout 等）
+
+        Returns:
+            AsyncResponse: 响应对象
+        """
+        url = f"{self.base_url}{endpoint}" if not endpoint.startswith('http') else endpoint
+
+        # 兼容 requests 风格的数值超时参数
+        if isinstance(kwargs.get('timeout'), (int, float)):
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=kwargs['timeout'])
+
+        kwargs['headers'], request_id = request_trace.tag_request(kwargs.get('headers'), self.request_id_header)
+        logger.debug("发送异步 %s 请求: %s", method, url)
+
+        request_trace.begin_request()
+        sent_at = time.perf_counter_ns()
+        try:
+            async with self._get_session().request(method, url, **kwargs) as response:
+                start = time.perf_counter_ns()
+                content = await response.read()
+                request_trace.record_phase("body", time.perf_counter_ns() - start)
+                if request_id:
+                    request_trace.record_detail("request_id", request_id)
+                    request_trace.record_detail("elapsed_ms", (time.perf_counter_ns() - sent_at) / 1e6)
+                phases, details = request_trace.end_request()
+                for phase in ("dns", "connect"):
+                    phases.setdefault(phase, 0)
+                logger.debug("响应状态码: %d", response.status)
+                request_trace.record_response(response.status, len(content), phases, details)
+                return AsyncResponse(response.status, dict(response.headers), content, str(response.url))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            request_trace.end_request()
+            logger.error("异步请求失败: %s", e)
+            raise
+
+    async def get(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """GET请求"""
+        return await self.request('GET', endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """POST请求"""
+        return await self.request('POST', endpoint, **kwargs)
+
+    async def put(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """PUT请求"""
+        return await self.request('PUT', endpoint, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """DELETE请求"""
+        return await self.request('DELETE', endpoint, **kwargs)
+
+    async def close(self):
+        """关闭会话，释放连接"""
+        if self._session is not None and not self._session.closed:
+            self.cookies = self.get_cookies()
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    @classmethod
+    async def close_all(cls):
+        """关闭所有绑定到当前事件循环的客户端会话"""
+        loop = asyncio.get_running_loop()
+        for client in list(cls._instances):
+            if client._loop is loop:
+                await client.close()
@@ -5,9 +5,11 @@
 
 import time
 import pytest
-from typing import Optional
-from logger import get_logger
+from typing import Any, Optional
+from logger import get_logger, flush_logs
 from utils import HttpClient, TimeUtils, FileUtils, AssertUtils
+from json_codec import decode_response
+from async_utils import AsyncHttpClient
 from config import API_BASE_URL, AUTO_SCREENSHOT, ALL_USERS
 
 logger = get_logger(__name__)
@@ -50,6 +52,32 @@ class BaseTest:
         # 清理session
         if hasattr(self, 'client'):
             self.client.clear_cookies()
+        if getattr(self, '_async_client', None) is not None:
+            self._async_client.clear_cookies()
+        
+        # 队列模式下写完本测试的日志，使其出现在本测试的输出中
+        flush_logs()
+    
+    @property
+    def async_client(self) -> AsyncHttpClient:
+        """
+        异步HTTP客户端（首次访问时按同步客户端的基础URL创建）
+        
+        每次访问时检查同步客户端的cookies，自上次同步后有变化（通过同步辅助方法登录、切换用户或登出）
+        就用其替换异步客户端的cookies；同步客户端未变化时保留异步客户端自己的会话（如 async_login 的结果）
+        
+        Returns:
+            AsyncHttpClient: 异步HTTP客户端
+        """
+        if getattr(self, '_async_client', None) is None:
+            self._async_client = AsyncHttpClient(self.client.base_url)
+            self._synced_cookies = None
+        cookies = self.client.get_cookies()
+        if cookies != self._synced_cookies:
+            self._async_client.clear_cookies()
+            self._async_client.set_cookies(cookies)
+            self._synced_cookies = cookies
+        return self._async_client
     
     def login(self, username: str, password: str) -> dict:
         """
@@ -80,7 +108,7 @@ class BaseTest:
             
             # 尝试解析响应
             try:
-                result = response.json() if response.content else {}
+                result = self.decode(response, lazy=False)
                 logger.info(f"登录响应数据: {result}")
                 return result
             except Exception as e:
@@ -89,7 +117,7 @@ class BaseTest:
         else:
             logger.warning(f"用户 {username} 登录失败，状态码: {response.status_code}")
             try:
-                error_data = response.json() if response.content else {}
+                error_data = self.decode(response, lazy=False)
                 logger.warning(f"错误响应: {error_data}")
                 return error_data
             except:
@@ -147,7 +175,7 @@ class BaseTest:
             params["keyword"] = keyword
         
         response = self.client.get("/api/books", params=params)
-        return response.json() if response.content else {}
+        return self.decode(response)
     
     def search_books(self, keyword: str) -> dict:
         """
@@ -162,7 +190,81 @@ class BaseTest:
         logger.info(f"搜索图书，关键词: {keyword}")
         
         response = self.client.get("/api/books/search", params={"keyword": keyword})
-        return response.json() if response.content else {}
+        return self.decode(response)
+    
+    async def async_login(self, username: str, password: str) -> dict:
+        """
+        执行登录操作（异步版本）
+        
+        Args:
+            username: 用户名
+            password: 密码
+        
+        Returns:
+            登录响应数据
+        """
+        logger.info(f"尝试异步登录用户: {username}")
+        
+        login_data = {
+            "username": username,
+            "password": password
+        }
+        
+        response = await self.async_client.post("/api/login", json=login_data)
+        
+        logger.info(f"登录响应状态码: {response.status_code}")
+        
+        if response.status_code == 200:
+            logger.info(f"用户 {username} 登录成功")
+            try:
+                return self.decode(response, lazy=False)
+            except Exception as e:
+                logger.warning(f"解析登录响应失败: {e}")
+                return {"status": "success", "message": "登录成功"}
+        else:
+            logger.warning(f"用户 {username} 登录失败，状态码: {response.status_code}")
+            try:
+                return self.decode(response, lazy=False)
+            except Exception:
+                return {"status": "error", "message": f"登录失败，状态码: {response.status_code}"}
+    
+    async def async_get_books(self, page: int = 1, size: int = 18, keyword: str = "") -> dict:
+        """
+        获取图书列表（异步版本）
+        
+        Args:
+            page: 页码
+            size: 每页数量
+            keyword: 搜索关键词
+        
+        Returns:
+            图书列表数据
+        """
+        params = {
+            "page": page,
+            "size": size
+        }
+        
+        if keyword:
+            params["keyword"] = keyword
+        
+        response = await self.async_client.get("/api/books", params=params)
+        return self.decode(response)
+    
+    async def async_search_books(self, keyword: str) -> dict:
+        """
+        搜索图书（异步版本）
+        
+        Args:
+            keyword: 搜索关键词
+        
+        Returns:
+            搜索结果
+        """
+        logger.info(f"异步搜索图书，关键词: {keyword}")
+        
+        response = await self.async_client.get("/api/books/search", params={"keyword": keyword})
+        return self.decode(response)
     
     def get_book_categories(self) -> dict:
         """
@@ -172,7 +274,7 @@ class BaseTest:
             分类列表
         """
         response = self.client.get("/api/categories")
-        return response.json() if response.content else {}
+        return self.decode(response)
     
     def create_article(self, title: str, content: str) -> dict:
         """
@@ -193,7 +295,7 @@ class BaseTest:
         }
         
         response = self.client.post("/api/articles", json=article_data)
-        return response.json() if response.content else {}
+        return self.decode(response)
     
     def delete_article(self, article_id: int) -> dict:
         """
@@ -208,7 +310,7 @@ class BaseTest:
         logger.info(f"删除文章: {article_id}")
         
         response = self.client.delete(f"/api/articles/{article_id}")
-        return response.json() if response.content else {}
+        return self.decode(response)
     
     def get_admin_statistics(self) -> dict:
         """
@@ -218,7 +320,7 @@ class BaseTest:
             统计信息
         """
         response = self.client.get("/api/admin/statistics")
-        return response.json() if response.content else {}
+        return self.decode(response)
     
     def get_users(self) -> dict:
         """
@@ -228,7 +330,7 @@ class BaseTest:
             用户列表
         """
         response = self.client.get("/api/admin/users")
-        return response.json() if response.content else {}
+        return self.decode(response)
     
     def update_user_status(self, user_id: int, enabled: bool) -> dict:
         """
@@ -243,7 +345,7 @@ class BaseTest:
         """
         endpoint = f"/api/admin/users/{user_id}/{'enable' if enabled else 'disable'}"
         response = self.client.post(endpoint)
-        return response.json() if response.content else {}
+        return self.decode(response)
     
     def update_user_role(self, user_id: int, role: str) -> dict:
         """
@@ -258,7 +360,23 @@ class BaseTest:
         """
         role_data = {"role": role}
         response = self.client.put(f"/api/admin/users/{user_id}/role", json=role_data)
-        return response.json() if response.content else {}
+        return self.decode(response)
+    
+    def decode(self, response, path: Optional[str] = None, lazy: Optional[bool] = None) -> Any:
+        """
+        解码响应体（使用已安装的最快 JSON 后端）
+        
+        性能测试执行期间默认返回延迟解码的 LazyJSON，被测函数不读取内容时不解码（见 PerformanceTest.decode_responses）
+        
+        Args:
+            response: 响应对象
+            path: 只取该字段路径的值，如 "result.0.username"
+            lazy: 是否延迟解码，默认由是否处于性能测试执行期间决定
+        
+        Returns:
+            解码结果，响应体为空时返回 {}
+        """
+        return decode_response(response, path, lazy)
     
     def measure_response_time(self, func, *args, **kwargs) -> tuple:
         """
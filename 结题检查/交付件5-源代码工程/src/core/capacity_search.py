@@ -0,0 +1,298 @@
+"""
+容量搜索
+在 SLO（P95 响应时间、错误率）约束下自动寻找最高可持续并发数或到达率
+"""
+
+import math
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from config import (
+    MAX_WAIT_TIME_MS,
+    OPEN_LOOP_MAX_IN_FLIGHT,
+    CAPACITY_MAX_ERROR_RATE,
+    CAPACITY_CONFIRM_TRIALS,
+    CAPACITY_SEARCH_LIMIT
+)
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CapacitySearch:
+    """容量搜索工具类
+
+    先从 start 开始按倍数指数探测，找到第一个不满足 SLO 的级别；再在最后一个满足与第一个
+    不满足的级别之间二分查找；最后对边界级别重复测试 confirm_trials 次，全部满足才确认
+    （一次不满足即停止），否则在已确认的级别（没有时为 start）与确认失败的级别之间重新二分确认。
+    所有测量点都记录在结果的 curve 中。
+
+    SLO 为 P95 响应时间不超过 max_p95_time_ms，且错误率严格小于 max_error_rate。
+
+    mode 为 "concurrency" 时每个级别调用 concurrent_test（级别为并发数），
+    为 "rate" 时调用 open_loop_test（级别为到达率，请求/秒）。
+    """
+
+    def __init__(
+        self,
+        perf,
+        mode: str = "concurrency",
+        max_p95_time_ms: float = MAX_WAIT_TIME_MS,
+        max_error_rate: float = CAPACITY_MAX_ERROR_RATE,
+        iterations: int = 10,
+        duration: float = 10,
+        confirm_trials: int = CAPACITY_CONFIRM_TRIALS,
+        growth: float = 2
+    ):
+        """
+        初始化容量搜索
+
+        Args:
+            perf: 执行测试的性能测试实例（PerformanceTest 或其子类）
+            mode: 搜索维度，"concurrency"（并发数）或 "rate"（到达率）
+            max_p95_time_ms: P95 响应时间上限（毫秒）
+            max_error_rate: 错误率上限（0-1，错误率须严格小于该值）
+            iterations: 并发模式下每个级别的迭代次数
+            duration: 到达率模式下每个级别的持续时间（秒）
+            confirm_trials: 边界级别的重复测试次数
+            growth: 指数探测的倍数
+        """
+        if mode not in ("concurrency", "rate"):
+            raise ValueError(f"不支持的搜索维度: {mode}")
+        if growth <= 1:
+            raise ValueError(f"探测倍数必须大于 1: {growth}")
+
+        self.perf = perf
+        self.mode = mode
+        self.max_p95_time_ms = max_p95_time_ms
+        self.max_error_rate = max_error_rate
+        self.iterations = iterations
+        self.duration = duration
+        self.confirm_trials = max(1, confirm_trials)
+        self.growth = growth
+        self.curve: List[Dict[str, Any]] = []
+
+    def search(
+        self,
+        func: Callable,
+        *args,
+        start: float = 1,
+        limit: float = CAPACITY_SEARCH_LIMIT,
+        resolution: float = 1,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        执行容量搜索
+
+        Args:
+            func: 要测试的函数
+            *args: 函数位置参数
+            start: 起始级别
+            limit: 级别上限，达到上限仍满足 SLO 时停止探测
+            resolution: 二分查找的精度（并发模式下至少为 1）
+            **kwargs: 函数关键字参数
+
+        Returns:
+            搜索结果字典，包含容量、SLO、确认通过率和测量曲线
+        """
+        if self.mode == "concurrency":
+            start, limit, resolution = int(start), int(limit), max(1, int(resolution))
+
+        logger.info(f"开始容量搜索 - 维度: {self.mode}, SLO: P95 <= {self.max_p95_time_ms}ms, "
+                    f"错误率 < {self.max_error_rate:.2%}, 起始级别: {start}, 上限: {limit}")
+        self.curve = []
+
+        # 指数探测
+        passed_level, failed_level = None, None
+        level = start
+        while True:
+            if self._measure(func, level, args, kwargs, "probe"):
+                passed_level = level
+                if level >= limit:
+                    break
+                level = min(self._next_level(level), limit)
+            else:
+                failed_level = level
+                break
+
+        # 二分查找
+        if passed_level is not None and failed_level is not None:
+            while failed_level - passed_level > resolution:
+                middle = self._middle(passed_level, failed_level)
+                if self._measure(func, middle, args, kwargs, "bisect"):
+                    passed_level = middle
+                else:
+                    failed_level = middle
+
+        # 重复测试确认边界，确认失败时在已确认的级别与确认失败的级别之间重新二分
+        capacity, pass_rate = None, 0.0
+        failed_confirm = None
+        candidate = passed_level
+        while candidate is not None:
+            passes, trials = self._confirm(func, candidate, args, kwargs)
+            if passes == trials:
+                capacity, pass_rate = candidate, 1.0
+            else:
+                logger.info(f"级别 {candidate} 确认未通过（{passes}/{trials}），重新二分确认")
+                failed_confirm = candidate
+                if capacity is None:
+                    pass_rate = passes / trials
+            candidate = self._next_confirm_level(start, capacity, failed_confirm, resolution)
+
+        result = {
+            "mode": self.mode,
+            "capacity": capacity,
+            "max_p95_time_ms": self.max_p95_time_ms,
+            "max_error_rate": self.max_error_rate,
+            "confirm_trials": self.confirm_trials,
+            "confirm_pass_rate": pass_rate,
+            "reached_limit": failed_level is None and capacity == limit,
+            "evaluations": len(self.curve),
+            "curve": sorted(self.curve, key=lambda point: point["level"]),
+        }
+        self._print_summary(result)
+        return result
+
+    def _measure(self, func: Callable, level: float, args: tuple, kwargs: Dict[str, Any], phase: str) -> bool:
+        """
+        在指定级别执行一次测试并判断是否满足 SLO
+
+        Args:
+            func: 要测试的函数
+            level: 并发数或到达率
+            args: 函数位置参数
+            kwargs: 函数关键字参数
+            phase: 所处阶段（probe / bisect / confirm）
+
+        Returns:
+            是否满足 SLO
+        """
+        logger.info(f"容量搜索[{phase}] - 测试级别: {level}")
+        if self.mode == "concurrency":
+            result = self.perf.concurrent_test(func, level, self.iterations, *args, **kwargs)
+        else:
+            result = self.perf.open_loop_test(
+                func, level, self.duration, False, OPEN_LOOP_MAX_IN_FLIGHT, *args, **kwargs
+            )
+
+        # 错误率按严格小于上限判断（validate_performance_requirement 允许等于上限）
+        passed = (
+            "error" not in result
+            and result.get("error_rate", 1) < self.max_error_rate
+            and self.perf.validate_performance_requirement(
+                result,
+                max_avg_time_ms=math.inf,
+                max_p95_time_ms=self.max_p95_time_ms,
+                max_p99_time_ms=math.inf
+            )
+        )
+
+        self.curve.append({
+            "level": level,
+            "phase": phase,
+            "passed": passed,
+            "throughput_rps": result.get("throughput_rps", 0),
+            "p95_ms": result.get("p95_ms", 0),
+            "p99_ms": result.get("p99_ms", 0),
+            "error_rate": result.get("error_rate", 1),
+        })
+        return passed
+
+    def _confirm(self, func: Callable, level: float, args: tuple, kwargs: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        在指定级别重复测试确认，第一次不满足 SLO 即停止
+
+        Args:
+            func: 要测试的函数
+            level: 并发数或到达率
+            args: 函数位置参数
+            kwargs: 函数关键字参数
+
+        Returns:
+            (满足 SLO 的次数, 实际测试次数)
+        """
+        for trial in range(self.confirm_trials):
+            if not self._measure(func, level, args, kwargs, "confirm"):
+                return trial, trial + 1
+        return self.confirm_trials, self.confirm_trials
+
+    def _next_confirm_level(
+        self,
+        start: float,
+        confirmed: Optional[float],
+        failed: Optional[float],
+        resolution: float
+    ) -> Optional[float]:
+        """
+        下一个需要确认的级别
+
+        Args:
+            start: 起始级别
+            confirmed: 已确认的最高级别，没有时为 None
+            failed: 确认失败的最低级别，没有时为 None
+            resolution: 二分查找的精度
+
+        Returns:
+            下一个级别，无需继续确认时为 None
+        """
+        if failed is None:
+            return None
+        if confirmed is None:
+            # 还没有确认的级别：区间已不大于精度时最后确认起始级别本身
+            if failed <= start:
+                return None
+            if failed - start <= resolution:
+                return start
+            return self._middle(start, failed)
+        if failed - confirmed <= resolution:
+            return None
+        return self._middle(confirmed, failed)
+
+    def _next_level(self, level: float) -> float:
+        """指数探测的下一个级别"""
+        if self.mode == "concurrency":
+            return max(level + 1, int(level * self.growth))
+        return level * self.growth
+
+    def _middle(self, low: float, high: float) -> float:
+        """二分查找的中间级别"""
+        if self.mode == "concurrency":
+            return (low + high) // 2
+        return (low + high) / 2
+
+    def _print_summary(self, result: Dict[str, Any]):
+        """
+        打印容量搜索结果
+
+        Args:
+            result: 搜索结果字典
+        """
+        logger.info("\n" + "=" * 80)
+        logger.info("容量搜索结果:")
+        logger.info("=" * 80)
+        logger.info(f"{'级别':<10} {'阶段':<10} {'吞吐量(/s)':<12} {'P95(ms)':<12} {'P99(ms)':<12} {'错误率':<10} {'SLO':<6}")
+        logger.info("-" * 80)
+        for point in result["curve"]:
+            logger.info(
+                f"{point['level']:<10} "
+                f"{point['phase']:<10} "
+                f"{point['throughput_rps']:<12.2f} "
+                f"{point['p95_ms']:<12.2f} "
+                f"{point['p99_ms']:<12.2f} "
+                f"{point['error_rate']:<10.2%} "
+                f"{'✓' if point['passed'] else '✗':<6}"
+            )
+        logger.info("-" * 80)
+        unit = "并发" if self.mode == "concurrency" else "请求/秒"
+        passed_levels = [point["level"] for point in result["curve"]
+                         if point["phase"] != "confirm" and point["passed"]]
+        if result["capacity"] is None and not passed_levels:
+            logger.info("起始级别即不满足 SLO，未找到可持续容量")
+        elif result["capacity"] is None:
+            # 探测或二分时曾满足 SLO，但确认阶段逐级下调到起始级别仍未全部通过，说明结果不稳定
+            logger.info(f"探测或二分阶段最高满足 SLO 的级别为 {max(passed_levels)} {unit}，但确认阶段下调到起始级别仍未全部通过"
+                        f"（起始级别确认通过率: {result['confirm_pass_rate']:.0%}），未找到可持续容量")
+        else:
+            logger.info(f"最高可持续{'并发数' if self.mode == 'concurrency' else '到达率'}: "
+                        f"{result['capacity']} {unit}"
+                        f"{'（已达搜索上限）' if result['reached_limit'] else ''}, "
+                        f"确认通过率: {result['confirm_pass_rate']:.0%}")
+        logger.info("=" * 80)
@@ -101,9 +101,77 @@ REQUEST_TIMEOUT = 10
 PAGE_LOAD_TIMEOUT = 30
 IMPLICIT_WAIT = 10
 
+# HTTP连接池：每个主机保留的连接数（需不小于最大并发数）、连接用尽时是否阻塞等待、是否使用长连接
+HTTP_POOL_MAXSIZE = 64
+HTTP_POOL_BLOCK = False
+HTTP_KEEP_ALIVE = True
+
+# HTTP传输层："requests"（默认）或 "raw"（直接收发 HTTP/1.1 报文的低开销传输，仅供高 RPS 性能测试使用）
+HTTP_TRANSPORT = "requests"
+
+# 是否请求压缩的响应体：True 发送 Accept-Encoding: gzip, deflate，False 发送 identity，
+# None 保持传输层的默认行为（requests 请求压缩，raw 不请求压缩）
+HTTP_COMPRESSION = None
+
+# HTTPS：证书校验（True 按 requests 的默认规则，也可以是 CA 证书路径或 False），
+# 新建连接时是否恢复之前的 TLS 会话（False 时每个新连接都是完整握手）
+TLS_VERIFY = True
+TLS_SESSION_RESUMPTION = True
+
+# 条件请求缓存（ETag/Last-Modified）：是否默认启用、最多保存的响应数、缓存项有效期（秒）
+HTTP_CACHE_ENABLED = False
+HTTP_CACHE_MAX_ENTRIES = 256
+HTTP_CACHE_TTL_S = 300
+
+# JSON 解码后端："auto"（按 orjson、ujson、json 的顺序选择已安装的）或指定后端名称
+JSON_BACKEND = "auto"
+
+# 性能测试执行期间 BaseTest 辅助方法是否立即解码响应（False 时返回延迟解码的结果，不读取就不解码）
+PERF_DECODE_RESPONSES = False
+
+# 是否在每个请求收到响应后读取连接的 TCP_INFO（仅 Linux），以及结果中保留的最慢样本数
+TCP_INFO_SAMPLING = False
+SLOWEST_SAMPLE_COUNT = 10
+
+# 每个请求携带唯一请求ID的请求头（用于与服务器访问日志关联），为空时不发送
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# 临时端口监控：采样间隔（秒）、占用比例达到多少时警告端口即将耗尽
+PORT_MONITOR_INTERVAL_S = 0.5
+PORT_EXHAUSTION_WARN_RATIO = 0.8
+
 # 最大等待时长（毫秒）- 用于性能测试
 MAX_WAIT_TIME_MS = 5000
 
+# 开环（恒定到达率）性能测试的在途请求数上限
+OPEN_LOOP_MAX_IN_FLIGHT = 200
+
+# 异步性能测试引擎的连接数上限（0 表示不限制）
+ASYNC_CONNECTION_LIMIT = 0
+
+# 延迟直方图的有效数字位数（1-5）及可记录的最大响应时间（毫秒）
+HISTOGRAM_SIGNIFICANT_DIGITS = 3
+HISTOGRAM_MAX_VALUE_MS = 3600000
+
+# 负载曲线控制节拍（毫秒）：按此间隔重新计算当前阶段和目标虚拟用户数
+LOAD_PROFILE_TICK_MS = 100
+
+# 多进程引擎等待工作进程结果时检查进程是否异常退出的间隔（秒）
+PROCESS_WORKER_POLL_S = 1.0
+
+# 耐久测试：快照间隔（秒）及各指标允许的最大上升斜率（每分钟）
+SOAK_SNAPSHOT_INTERVAL_S = 60
+SOAK_MAX_P50_SLOPE_MS_PER_MIN = 0.5
+SOAK_MAX_P99_SLOPE_MS_PER_MIN = 2.0
+SOAK_MAX_ERROR_RATE_SLOPE_PER_MIN = 0.0005
+# 耐久测试中调用失败后虚拟用户暂停的时间（秒），避免后端持续出错时空转
+SOAK_ERROR_BACKOFF_S = 0.05
+
+# 容量搜索：错误率上限、边界级别的重复测试次数及级别搜索上限（P95 上限默认为 MAX_WAIT_TIME_MS）
+CAPACITY_MAX_ERROR_RATE = 0.001
+CAPACITY_CONFIRM_TRIALS = 3
+CAPACITY_SEARCH_LIMIT = 1024
+
 # 测试数据配置
 TEST_DATA_DIR = "../outputs"
 LOG_DIR = "../outputs/logs"
@@ -137,6 +205,19 @@ DB_CONFIG = {
 # 是否启用详细日志
 VERBOSE_LOGGING = True
 
+# 日志队列模式：调用日志接口的线程只把日志记录放入队列，由单独的监听线程批量格式化并写入文件和控制台，
+# 避免写日志的耗时计入被测请求的响应时间；监听线程每批最多处理的记录数
+LOG_QUEUE_MODE = True
+LOG_QUEUE_BATCH_SIZE = 256
+
+# 压测期间的日志采样与限流（只作用于性能测试中被测函数调用期间记录的日志，功能测试不受影响）：
+# 每 LOG_SAMPLE_RATE 次成功调用保留 1 次调用的 DEBUG/INFO 日志，失败和进入最慢样本的调用总是保留；
+# 相同的日志每 LOG_RATE_LIMIT_INTERVAL_S 秒最多写出 LOG_RATE_LIMIT_COUNT 条，其余只计数
+LOG_SAMPLING = True
+LOG_SAMPLE_RATE = 100
+LOG_RATE_LIMIT_COUNT = 10
+LOG_RATE_LIMIT_INTERVAL_S = 1.0
+
 # 是否在测试失败时自动截图
 AUTO_SCREENSHOT = True
 
@@ -0,0 +1,197 @@
+"""
+HTTP连接池
+在 requests 默认适配器的基础上统计每个连接池实际建立的TCP连接数，用于区分连接复用与新建连接，
+按阶段（DNS解析、TCP连接、TLS握手、发送请求、等待首字节）记录每个请求的耗时，
+并可在收到响应后采样连接的 TCP_INFO。HTTPS 连接池的所有连接共用一个 SSLContext（只加载一次 CA 证书），
+开启会话恢复时新建连接复用之前握手得到的 TLS 会话，并统计完整握手和恢复握手的次数
+"""
+
+import socket
+import ssl
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.ssl_ import resolve_cert_reqs
+from tcp_info import read_tcp_info
+from tls_session import client_context
+import request_trace
+
+
+class _TrackedConnectionMixin:
+    """建立连接后通知所属连接池计数，并把各阶段耗时记录到当前请求
+
+    urllib3 的连接对象在断开后会被放回连接池并在下次使用时重新连接，
+    因此按 connect() 次数而不是连接对象个数统计新建连接。
+    http.client 会在发送请求时按需建立连接，发送阶段的耗时需扣除其中的连接耗时。
+    所属连接池开启 tcp_info 时，收到响应头后读取 TCP_INFO，并计算本次请求期间新增的重传段数。
+    """
+
+    pool = None
+    tls = False
+    _session_saved = True
+    _connect_ns = 0
+    _setup_ns = 0
+    _total_retrans = 0
+
+    def _new_conn(self):
+        # 先单独解析域名并计时，再用解析出的地址建立TCP连接，避免重复解析
+        host = self._dns_host
+        start = time.perf_counter_ns()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror:
+            # 解析失败交给 urllib3 按原有方式抛出 NameResolutionError
+            return super()._new_conn()
+        resolved = time.perf_counter_ns()
+
+        self._dns_host = addresses[0][4][0]
+        try:
+            sock = super()._new_conn()
+        except Exception:
+            if len(addresses) == 1:
+                raise
+            # 第一个地址连接失败时按域名重新连接，由 urllib3 依次尝试其余地址
+            self._dns_host = host
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = host
+        connected = time.perf_counter_ns()
+
+        request_trace.record_phase("dns", resolved - start)
+        request_trace.record_phase("connect", connected - resolved)
+        self._setup_ns = connected - start
+        return sock
+
+    def connect(self):
+        self._setup_ns = 0
+        start = time.perf_counter_ns()
+        super().connect()
+        elapsed = time.perf_counter_ns() - start
+
+        if self.tls:
+            request_trace.record_phase("tls", max(elapsed - self._setup_ns, 0))
+            self._session_saved = False
+        self._connect_ns += elapsed
+        self._total_retrans = 0
+        if self.pool is not None:
+            self.pool.count_connect()
+
+    def request(self, *args, **kwargs):
+        connect_before = self._connect_ns
+        start = time.perf_counter_ns()
+        super().request(*args, **kwargs)
+        elapsed = time.perf_counter_ns() - start
+        request_trace.record_phase("send", max(elapsed - (self._connect_ns - connect_before), 0))
+
+    def getresponse(self, *args, **kwargs):
+        start = time.perf_counter_ns()
+        response = super().getresponse(*args, **kwargs)
+        request_trace.record_phase("ttfb", time.perf_counter_ns() - start)
+
+        # TLS 1.3 的会话票据在握手后才到达，收到第一个响应后再保存会话
+        if not self._session_saved:
+            self._session_saved = True
+            if self.pool is not None and self.pool.tls_resumption:
+                self.pool.tls_context.save_session(self.sock)
+
+        if self.pool is not None and self.pool.tcp_info:
+            info = read_tcp_info(self.sock)
+            if info is not None:
+                info["retrans_delta"] = info["total_retrans"] - self._total_retrans
+                self._total_retrans = info["total_retrans"]
+                request_trace.record_detail("tcp_info", info)
+        return response
+
+
+class TrackedHTTPConnection(_TrackedConnectionMixin, HTTPConnection):
+    """统计建立次数的 HTTP 连接"""
+
+
+class TrackedHTTPSConnection(_TrackedConnectionMixin, HTTPSConnection):
+    """统计建立次数的 HTTPS 连接"""
+
+    tls = True
+
+
+class _TrackedPoolMixin:
+    """记录本连接池建立的TCP连接数（num_connects），请求数沿用 urllib3 的 num_requests"""
+
+    tcp_info = False
+    tls_resumption = False
+    tls_context = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._connect_lock = threading.Lock()
+        self.num_connects = 0
+
+    def count_connect(self):
+        """新建连接计数加一"""
+        with self._connect_lock:
+            self.num_connects += 1
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.pool = self
+        return conn
+
+
+class TrackedHTTPConnectionPool(_TrackedPoolMixin, HTTPConnectionPool):
+    """统计新建连接数的 HTTP 连接池"""
+
+    ConnectionCls = TrackedHTTPConnection
+
+
+class TrackedHTTPSConnectionPool(_TrackedPoolMixin, HTTPSConnectionPool):
+    """统计新建连接数和 TLS 握手次数的 HTTPS 连接池"""
+
+    ConnectionCls = TrackedHTTPSConnection
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        # 未指定 SSLContext 时 urllib3 为每个连接新建一个，TLS 会话无法跨连接恢复，改为共用连接池的 SSLContext
+        if conn.ssl_context is None:
+            with self._connect_lock:
+                if self.tls_context is None:
+                    verify = resolve_cert_reqs(self.cert_reqs) != ssl.CERT_NONE and (
+                        self.ca_certs or self.ca_cert_dir or True
+                    )
+                    self.tls_context = client_context(verify)
+            conn.ssl_context = self.tls_context
+            conn.ca_certs = conn.ca_cert_dir = None
+        return conn
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """使用可统计连接池的 requests 适配器"""
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["tcp_info", "tls_resumption"]
+
+    def __init__(self, *args, tcp_info: bool = False, tls_resumption: bool = True, **kwargs):
+        """
+        初始化适配器
+
+        Args:
+            tcp_info: 是否在每个请求收到响应后采样连接的 TCP_INFO
+            tls_resumption: 新建 HTTPS 连接时是否恢复之前的 TLS 会话（否则每次都是完整握手）
+            其余参数同 HTTPAdapter
+        """
+        self.tcp_info = tcp_info
+        self.tls_resumption = tls_resumption
+        super().__init__(*args, **kwargs)
+
+    def get_connection_with_tls_context(self, *args, **kwargs):
+        pool = super().get_connection_with_tls_context(*args, **kwargs)
+        pool.tcp_info = self.tcp_info
+        pool.tls_resumption = self.tls_resumption
+        return pool
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TrackedHTTPConnectionPool,
+            "https": TrackedHTTPSConnectionPool,
+        }
@@ -0,0 +1,246 @@
+"""
+延迟直方图
+固定内存、按对数分桶的 HDR 直方图，用于替代保存全部响应时间样本的列表
+"""
+
+import math
+from array import array
+from typing import Optional
+from config import HISTOGRAM_SIGNIFICANT_DIGITS, HISTOGRAM_MAX_VALUE_MS
+
+
+class LatencyHistogram:
+    """延迟直方图（HdrHistogram 分桶方案）
+
+    内部以微秒为单位的整数计数，按 2 的幂划分桶，每个桶再等分为若干子桶，
+    在任意量级上都保持 significant_digits 位有效数字的精度。
+    记录一个样本为 O(1)，查询百分位数为 O(桶数)，相同配置的直方图可以精确合并。
+    最小值、最大值、平均值和标准差单独精确累计，不受分桶精度影响。
+    """
+
+    def __init__(
+        self,
+        significant_digits: int = HISTOGRAM_SIGNIFICANT_DIGITS,
+        max_value_ms: float = HISTOGRAM_MAX_VALUE_MS
+    ):
+        """
+        初始化直方图
+
+        Args:
+            significant_digits: 有效数字位数（1-5）
+            max_value_ms: 可精确记录的最大值（毫秒），更大的值计入最高的桶
+        """
+        if not 1 <= significant_digits <= 5:
+            raise ValueError(f"有效数字位数必须在 1-5 之间: {significant_digits}")
+
+        self.significant_digits = significant_digits
+        self.max_value_ms = max_value_ms
+
+        # 子桶数量需要能区分 10^digits 个相邻值，取不小于 2 * 10^digits 的 2 的幂
+        largest_single_unit = 2 * 10 ** significant_digits
+        sub_bucket_count_magnitude = max(1, math.ceil(math.log2(largest_single_unit)))
+        self._sub_bucket_half_count_magnitude = sub_bucket_count_magnitude - 1
+        self._sub_bucket_count = 1 << sub_bucket_count_magnitude
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+
+        self._highest_trackable = max(int(max_value_ms * 1000), 2)
+        bucket_count = 1
+        smallest_untrackable = self._sub_bucket_count
+        while smallest_untrackable <= self._highest_trackable:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self._bucket_count = bucket_count
+
+        self._counts_length = (bucket_count + 1) * self._sub_bucket_half_count
+        self.reset()
+
+    def reset(self):
+        """清空所有计数"""
+        self._counts = array('q', [0]) * self._counts_length
+        self.total_count = 0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def _counts_index(self, value: int) -> int:
+        """
+        计算整数值（微秒）对应的计数数组下标
+
+        Args:
+            value: 微秒值
+
+        Returns:
+            计数数组下标
+        """
+        bucket_index = max(0, (value | self._sub_bucket_mask).bit_length() - self._sub_bucket_half_count_magnitude - 1)
+        sub_bucket_index = value >> bucket_index
+        return ((bucket_index + 1) << self._sub_bucket_half_count_magnitude) + sub_bucket_index - self._sub_bucket_half_count
+
+    def _value_range(self, index: int):
+        """
+        计算计数数组下标对应的取值范围（微秒）
+
+        Args:
+            index: 计数数组下标
+
+        Returns:
+            (桶内最小值, 桶内最大值)
+        """
+        bucket_index = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self._sub_bucket_half_count
+            bucket_index = 0
+        lowest = sub_bucket_index << bucket_index
+        return lowest, lowest + (1 << bucket_index) - 1
+
+    def record(self, value_ms: float, count: int = 1):
+        """
+        记录样本
+
+        Args:
+            value_ms: 样本值（毫秒）
+            count: 样本数量
+        """
+        if value_ms < 0:
+            raise ValueError(f"样本值不能为负数: {value_ms}")
+
+        value = min(int(value_ms * 1000), self._highest_trackable)
+        self._counts[self._counts_index(value)] += count
+
+        # Welford 算法累计均值和方差（批量记录相同值时按合并公式更新）
+        new_total = self.total_count + count
+        delta = value_ms - self._mean
+        self._mean += delta * count / new_total
+        self._m2 += delta * delta * self.total_count * count / new_total
+        self.total_count = new_total
+
+        if value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def record_corrected(self, value_ms: float, expected_interval_ms: float, count: int = 1):
+        """
+        记录样本并进行协调遗漏校正（同 HdrHistogram 的 recordValueWithExpectedInterval）
+
+        超过期望间隔的样本，依次补录 value - interval、value - 2 * interval ... 直到不大于期望间隔。
+
+        Args:
+            value_ms: 样本值（毫秒）
+            expected_interval_ms: 期望请求间隔（毫秒）
+            count: 样本数量
+        """
+        if expected_interval_ms <= 0:
+            raise ValueError(f"期望请求间隔必须为正数: {expected_interval_ms}")
+
+        self.record(value_ms, count)
+        missing = value_ms - expected_interval_ms
+        while missing >= expected_interval_ms:
+            self.record(missing, count)
+            missing -= expected_interval_ms
+
+    def corrected_copy(self, expected_interval_ms: float) -> "LatencyHistogram":
+        """
+        生成协调遗漏校正后的直方图副本
+
+        Args:
+            expected_interval_ms: 期望请求间隔（毫秒）
+
+        Returns:
+            校正后的新直方图
+        """
+        corrected = LatencyHistogram(self.significant_digits, self.max_value_ms)
+        for index, count in enumerate(self._counts):
+            if count:
+                lowest, highest = self._value_range(index)
+                corrected.record_corrected(self._clamp((lowest + highest) / 2000), expected_interval_ms, count)
+        return corrected
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        将另一个直方图的数据精确合并到当前直方图
+
+        Args:
+            other: 配置相同的直方图
+
+        Returns:
+            当前直方图
+        """
+        if (other.significant_digits, other.max_value_ms) != (self.significant_digits, self.max_value_ms):
+            raise ValueError("只能合并精度和量程相同的直方图")
+        if other.total_count == 0:
+            return self
+
+        for index, count in enumerate(other._counts):
+            if count:
+                self._counts[index] += count
+
+        new_total = self.total_count + other.total_count
+        delta = other._mean - self._mean
+        self._mean += delta * other.total_count / new_total
+        self._m2 += other._m2 + delta * delta * self.total_count * other.total_count / new_total
+        self.total_count = new_total
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+
+    def percentile(self, percentile: float) -> float:
+        """
+        查询百分位数
+
+        Args:
+            percentile: 百分位（0-100）
+
+        Returns:
+            百分位数值（毫秒），取所在桶的中点并限制在实际最小/最大值之间
+        """
+        if self.total_count == 0:
+            return 0
+
+        target = max(1, math.ceil(self.total_count * percentile / 100))
+        cumulative = 0
+        for index, count in enumerate(self._counts):
+            cumulative += count
+            if cumulative >= target:
+                lowest, highest = self._value_range(index)
+                return self._clamp((lowest + highest) / 2000)
+        return self.max_ms
+
+    def _clamp(self, value_ms: float) -> float:
+        """将值限制在实际观测到的最小/最大值之间"""
+        return min(max(value_ms, self.min_ms), self.max_ms)
+
+    @property
+    def mean(self) -> float:
+        """平均值（毫秒）"""
+        return self._mean if self.total_count else 0
+
+    @property
+    def stdev(self) -> float:
+        """样本标准差（毫秒）"""
+        if self.total_count < 2:
+            return 0
+        return math.sqrt(max(self._m2, 0.0) / (self.total_count - 1))
+
+    def __len__(self) -> int:
+        return self.total_count
+
+    @classmethod
+    def from_values(cls, values, significant_digits: Optional[int] = None) -> "LatencyHistogram":
+        """
+        由样本列表构造直方图
+
+        Args:
+            values: 样本值（毫秒）可迭代对象
+            significant_digits: 有效数字位数，默认使用配置值
+
+        Returns:
+            新的直方图
+        """
+        histogram = cls(significant_digits or HISTOGRAM_SIGNIFICANT_DIGITS)
+        for value in values:
+            histogram.record(value)
+        return histogram
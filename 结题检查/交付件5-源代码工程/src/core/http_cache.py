@@ -0,0 +1,297 @@
+"""
+条件请求缓存
+为 GET 响应保存校验器（ETag、Last-Modified）和响应体，再次请求时发送 If-None-Match / If-Modified-Since，
+服务器返回 304 时直接使用缓存的响应体，并统计 304 节省的流量和时间。
+每次请求都会向服务器校验，缓存不会在未经服务器确认的情况下返回响应，因此不影响测试结果的正确性
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from config import HTTP_CACHE_MAX_ENTRIES, HTTP_CACHE_TTL_S
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CacheEntry:
+    """一个缓存的响应"""
+
+    def __init__(self, response, elapsed_ms: float):
+        """
+        根据完整响应创建缓存项
+
+        Args:
+            response: 状态码为 200 的响应（requests.Response 或 RawResponse）
+            elapsed_ms: 获取完整响应的耗时（毫秒），用于估算 304 节省的时间
+        """
+        self.status_code = response.status_code
+        self.headers = CaseInsensitiveDict(response.headers)
+        self.content = response.content
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.full_ms = elapsed_ms
+        self.stored_at = time.monotonic()
+
+    def validators(self) -> Dict[str, str]:
+        """
+        生成条件请求头
+
+        Returns:
+            If-None-Match 和/或 If-Modified-Since 请求头
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ConditionalCache:
+    """LRU + TTL 淘汰的条件请求缓存，可在多个线程（和 HttpClient 副本）之间共享
+
+    缓存项数超过 max_entries 时淘汰最久未使用的项；缓存项保存超过 ttl_s 秒后失效，下次请求重新完整获取。
+    缓存键为 URL、查询参数和请求携带的凭据（Authorization、Cookie 请求头），不同用户的缓存项互不共享：
+    只有 Last-Modified 校验器时，服务器可能对另一个用户的请求返回 304，共享缓存项会把前一个用户的响应体交给他。
+    """
+
+    # 计入缓存键的凭据请求头
+    CREDENTIAL_HEADERS = ("Authorization", "Cookie")
+
+    # stats() 中的计数器
+    COUNTERS = (
+        "requests", "conditional_requests", "not_modified", "modified", "stored",
+        "lru_evictions", "ttl_evictions", "bytes_saved", "time_saved_ms",
+    )
+
+    def __init__(self, max_entries: int = HTTP_CACHE_MAX_ENTRIES, ttl_s: float = HTTP_CACHE_TTL_S):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最多保存的响应数
+            ttl_s: 缓存项有效期（秒）
+        """
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[Tuple[str, str, str], CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(self.COUNTERS, 0)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def key(
+        cls,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None
+    ) -> Tuple[str, str, str]:
+        """
+        生成缓存键
+
+        Args:
+            url: 请求URL
+            params: 查询参数
+            headers: 请求实际携带的请求头（包括会话的请求头和 cookies），其中的凭据计入缓存键
+
+        Returns:
+            缓存键
+        """
+        credentials = ""
+        if headers:
+            headers = CaseInsensitiveDict(headers)
+            credentials = "\n".join(headers.get(name, "") for name in cls.CREDENTIAL_HEADERS)
+        return url, urlencode(sorted(params.items()), doseq=True) if params else "", credentials
+
+    def lookup(self, key: Tuple[str, str, str]) -> Optional[CacheEntry]:
+        """
+        查找未过期的缓存项并标记为最近使用
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存项，不存在或已过期时返回 None
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.stored_at > self.ttl_s:
+                del self._entries[key]
+                self._stats["ttl_evictions"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["conditional_requests"] += 1
+            return entry
+
+    def conditional_headers(self, key: Tuple[str, str, str], headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        为请求加上缓存项的条件请求头
+
+        Args:
+            key: 缓存键
+            headers: 调用方指定的请求头
+
+        Returns:
+            合并后的请求头（没有缓存项时与调用方指定的相同）
+        """
+        headers = dict(headers or {})
+        entry = self.lookup(key)
+        if entry is not None:
+            headers.update(entry.validators())
+        return headers
+
+    def update(self, key: Tuple[str, str, str], response, elapsed_ms: float):
+        """
+        根据响应更新缓存：304 时把缓存的响应体填回响应，200 且带校验器时保存响应
+
+        Args:
+            key: 缓存键
+            response: 响应（requests.Response 或 RawResponse）
+            elapsed_ms: 请求耗时（毫秒）
+
+        Returns:
+            可直接使用的响应，304 时状态码、响应头和响应体取自缓存，并设置 from_cache = True
+        """
+        if response.status_code == 304:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._stats["not_modified"] += 1
+                    self._stats["bytes_saved"] += len(entry.content) - len(response.content)
+                    self._stats["time_saved_ms"] += max(entry.full_ms - elapsed_ms, 0)
+            if entry is None:
+                logger.warning(f"收到 304 但缓存项已被淘汰: {key[0]}")
+                return response
+            return self._serve_cached(response, entry)
+
+        if response.status_code != 200:
+            return response
+
+        cacheable = (
+            ("ETag" in response.headers or "Last-Modified" in response.headers)
+            and "no-store" not in response.headers.get("Cache-Control", "")
+        )
+        with self._lock:
+            if key in self._entries:
+                self._stats["modified"] += 1
+                if not cacheable:
+                    del self._entries[key]
+            if cacheable:
+                self._entries[key] = CacheEntry(response, elapsed_ms)
+                self._entries.move_to_end(key)
+                self._stats["stored"] += 1
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats["lru_evictions"] += 1
+        return response
+
+    @staticmethod
+    def _serve_cached(response, entry: CacheEntry):
+        """将 304 响应改写为缓存的完整响应"""
+        headers = CaseInsensitiveDict(entry.headers)
+        headers.update(response.headers)
+        response.status_code = entry.status_code
+        response.headers = headers
+        if isinstance(response, requests.Response):
+            response._content = entry.content
+            response.encoding = get_encoding_from_headers(headers)
+        else:
+            response.content = entry.content
+        response.from_cache = True
+        return response
+
+    def clear(self):
+        """清空缓存项（统计不清零）"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取累计统计
+
+        Returns:
+            COUNTERS 中各计数器的当前值
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        生成统计摘要
+
+        Returns:
+            累计统计，另含当前缓存项数和 304 命中率（304 数 / 条件请求数）
+        """
+        stats = self.stats()
+        stats["entries"] = len(self._entries)
+        stats["hit_ratio"] = stats["not_modified"] / stats["conditional_requests"] if stats["conditional_requests"] else 0
+        return stats
+
+
+def probe_conditional_support(client, endpoint: str, **kwargs) -> Dict[str, Any]:
+    """
+    探测服务器的接口是否支持条件请求
+
+    先完整请求一次取得校验器，再带校验器请求一次，服务器返回 304 即视为支持。两次请求都不经过客户端的缓存。
+
+    Args:
+        client: HttpClient
+        endpoint: API端点
+        **kwargs: 其他请求参数（如 params）
+
+    Returns:
+        包含 endpoint、etag、last_modified（服务器返回的校验器）、status（条件请求的状态码）、
+        supported、full_bytes、full_ms 和 conditional_ms 的字典
+    """
+    headers = dict(kwargs.pop("headers", None) or {})
+
+    start = time.perf_counter()
+    full = client.get(endpoint, headers=headers, cache=False, **kwargs)
+    full_ms = (time.perf_counter() - start) * 1000
+
+    etag = full.headers.get("ETag")
+    last_modified = full.headers.get("Last-Modified")
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    status, conditional_ms = None, None
+    if etag or last_modified:
+        start = time.perf_counter()
+        status = client.get(endpoint, headers=headers, cache=False, **kwargs).status_code
+        conditional_ms = (time.perf_counter() - start) * 1000
+
+    result = {
+        "endpoint": endpoint,
+        "etag": etag,
+        "last_modified": last_modified,
+        "status": status,
+        "supported": status == 304,
+        "full_bytes": len(full.content),
+        "full_ms": full_ms,
+        "conditional_ms": conditional_ms,
+    }
+    logger.info(f"条件请求探测 {endpoint}: {'支持' if result['supported'] else '不支持'} "
+                f"(ETag: {etag or '无'}, Last-Modified: {last_modified or '无'}, 条件请求状态码: {status})")
+    return result
@@ -0,0 +1,195 @@
+"""
+JSON 解码
+按 orjson → ujson → 标准库 json 的顺序选择已安装的最快后端，提供按字段路径取值和延迟解码。
+性能测试执行期间（PerformanceTest.decode_responses 为 False 时）BaseTest 的辅助方法返回延迟解码的结果，
+被测函数不读取响应内容时完全不解码
+"""
+
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional, Union
+from config import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _select_backend(name: str) -> str:
+    """
+    选择 JSON 后端
+
+    Args:
+        name: "auto"、"orjson"、"ujson" 或 "json"
+
+    Returns:
+        实际使用的后端名称（指定的后端未安装时退回标准库 json）
+    """
+    available = {"orjson": orjson, "ujson": ujson, "json": json}
+    if name == "auto":
+        return next(backend for backend in ("orjson", "ujson", "json") if available[backend] is not None)
+    if name not in available:
+        raise ValueError(f"未知的 JSON 后端: {name}")
+    return name if available[name] is not None else "json"
+
+
+BACKEND = _select_backend(JSON_BACKEND)
+
+# 各后端的解码函数；ujson 只接受 str 和 bytes
+_LOADS = {
+    "orjson": orjson.loads if orjson else None,
+    "ujson": ujson.loads if ujson else None,
+    "json": json.loads,
+}
+
+# 当前线程（或协程）中 BaseTest 辅助方法是否立即解码响应
+_decode_eagerly: ContextVar[bool] = ContextVar("json_decode_eagerly", default=True)
+
+
+def loads(data: Union[bytes, str], backend: Optional[str] = None) -> Any:
+    """
+    解码 JSON
+
+    Args:
+        data: JSON 文本
+        backend: 使用的后端，默认为自动选择的 BACKEND
+
+    Returns:
+        解码结果
+    """
+    return _LOADS[backend or BACKEND](data)
+
+
+def get_path(data: Any, path: str) -> Any:
+    """
+    按字段路径取值
+
+    Args:
+        data: 解码后的 JSON
+        path: 以点分隔的字段路径，列表下标用数字表示，如 "result.0.username"
+
+    Returns:
+        字段的值
+
+    Raises:
+        KeyError: 字段不存在或下标越界
+    """
+    value = data
+    for part in path.split("."):
+        try:
+            value = value[int(part)] if isinstance(value, list) else value[part]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise KeyError(f"JSON 中不存在字段: {path}") from None
+    return value
+
+
+class LazyJSON:
+    """延迟解码的 JSON
+
+    第一次访问内容时才解码并缓存结果；支持下标、get、迭代、长度、in、== 等常用操作，
+    其他属性和方法转发给解码结果。需要真正的 dict/list（如 isinstance 判断）时使用 value。
+    """
+
+    __slots__ = ("_content", "_value", "_decoded")
+
+    def __init__(self, content: Union[bytes, str]):
+        """
+        初始化
+
+        Args:
+            content: JSON 文本
+        """
+        self._content = content
+        self._value = None
+        self._decoded = False
+
+    @property
+    def decoded(self) -> bool:
+        """是否已经解码"""
+        return self._decoded
+
+    @property
+    def value(self) -> Any:
+        """解码结果（首次访问时解码）"""
+        if not self._decoded:
+            self._value = loads(self._content)
+            self._decoded = True
+            self._content = None
+        return self._value
+
+    def path(self, path: str) -> Any:
+        """按字段路径取值（见 get_path）"""
+        return get_path(self.value, path)
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __getattr__(self, name: str):
+        return getattr(self.value, name)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.value)
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __contains__(self, item) -> bool:
+        return item in self.value
+
+    def __bool__(self) -> bool:
+        return bool(self.value)
+
+    def __eq__(self, other) -> bool:
+        return self.value == (other.value if isinstance(other, LazyJSON) else other)
+
+    def __repr__(self) -> str:
+        return repr(self.value) if self._decoded else f"<LazyJSON {len(self._content)} 字节未解码>"
+
+
+def eager_decoding() -> bool:
+    """当前线程（或协程）中 BaseTest 辅助方法是否立即解码响应"""
+    return _decode_eagerly.get()
+
+
+@contextmanager
+def decoding(eager: bool):
+    """
+    在上下文中设置 BaseTest 辅助方法是否立即解码响应（只影响当前线程或协程）
+
+    Args:
+        eager: 为 False 时返回 LazyJSON，只在访问内容时解码
+    """
+    token = _decode_eagerly.set(eager)
+    try:
+        yield
+    finally:
+        _decode_eagerly.reset(token)
+
+
+def decode_response(response, path: Optional[str] = None, lazy: Optional[bool] = None) -> Any:
+    """
+    解码响应体
+
+    Args:
+        response: 带 content 属性的响应（requests.Response、RawResponse 或 AsyncResponse）
+        path: 只取该字段路径的值（见 get_path）
+        lazy: 是否返回 LazyJSON，默认在性能测试执行期间（eager_decoding() 为 False）延迟解码
+
+    Returns:
+        解码结果；响应体为空时返回 {}
+    """
+    content = response.content
+    if not content:
+        return {}
+    if path is not None:
+        return get_path(loads(content), path)
+    if lazy if lazy is not None else not eager_decoding():
+        return LazyJSON(content)
+    return loads(content)
@@ -0,0 +1,334 @@
+"""
+负载曲线
+声明式描述虚拟用户数随时间的变化（线性爬坡、阶梯、尖峰、平台），并提供按曲线施压的常驻虚拟用户线程池
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from histogram import LatencyHistogram
+from request_trace import RequestOutcomes
+from config import LOAD_PROFILE_TICK_MS
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LoadStage:
+    """负载阶段
+
+    在 duration 秒内，虚拟用户数从 start_users 线性变化到 end_users。
+    起止用户数相同即为平台（或阶梯中的一级、尖峰）。
+    """
+
+    def __init__(self, name: str, kind: str, duration: float, start_users: int, end_users: int):
+        """
+        初始化负载阶段
+
+        Args:
+            name: 阶段名称（在同一负载曲线中唯一，用于标记样本）
+            kind: 阶段类型（ramp / step / spike / plateau）
+            duration: 持续时间（秒）
+            start_users: 阶段开始时的虚拟用户数
+            end_users: 阶段结束时的虚拟用户数
+        """
+        if duration <= 0:
+            raise ValueError(f"阶段持续时间必须为正数: {duration}")
+        if start_users < 0 or end_users < 0:
+            raise ValueError(f"虚拟用户数不能为负数: {start_users} -> {end_users}")
+
+        self.name = name
+        self.kind = kind
+        self.duration = duration
+        self.start_users = start_users
+        self.end_users = end_users
+
+    @property
+    def max_users(self) -> int:
+        """阶段内的最大虚拟用户数"""
+        return max(self.start_users, self.end_users)
+
+    def users_at(self, offset: float) -> int:
+        """
+        计算阶段内某一时刻的虚拟用户数
+
+        Args:
+            offset: 距阶段开始的时间（秒）
+
+        Returns:
+            虚拟用户数
+        """
+        fraction = min(max(offset / self.duration, 0.0), 1.0)
+        return round(self.start_users + (self.end_users - self.start_users) * fraction)
+
+    def __repr__(self) -> str:
+        return (f"LoadStage({self.name!r}, {self.kind}, {self.duration}s, "
+                f"{self.start_users}->{self.end_users})")
+
+
+class LoadProfile:
+    """负载曲线
+
+    由若干负载阶段依次组成，支持链式构造，例如
+    LoadProfile().ramp(1, 200, 300).plateau(200, 600).spike(500, 30)
+    """
+
+    def __init__(self, stages: Optional[List[LoadStage]] = None):
+        """
+        初始化负载曲线
+
+        Args:
+            stages: 初始阶段列表
+        """
+        self.stages: List[LoadStage] = []
+        for stage in stages or []:
+            self.add_stage(stage)
+
+    def add_stage(self, stage: LoadStage) -> "LoadProfile":
+        """
+        追加一个阶段
+
+        Args:
+            stage: 负载阶段
+
+        Returns:
+            当前负载曲线
+        """
+        if any(existing.name == stage.name for existing in self.stages):
+            raise ValueError(f"阶段名称重复: {stage.name}")
+        self.stages.append(stage)
+        return self
+
+    def _default_name(self, kind: str) -> str:
+        """生成阶段的默认名称"""
+        return f"{kind}-{len(self.stages) + 1}"
+
+    def ramp(self, start_users: int, end_users: int, duration: float, name: Optional[str] = None) -> "LoadProfile":
+        """
+        线性爬坡（或下降）阶段
+
+        Args:
+            start_users: 起始虚拟用户数
+            end_users: 结束虚拟用户数
+            duration: 持续时间（秒）
+            name: 阶段名称
+
+        Returns:
+            当前负载曲线
+        """
+        return self.add_stage(LoadStage(name or self._default_name("ramp"), "ramp", duration, start_users, end_users))
+
+    def plateau(self, users: int, duration: float, name: Optional[str] = None) -> "LoadProfile":
+        """
+        持续平台阶段
+
+        Args:
+            users: 虚拟用户数
+            duration: 持续时间（秒）
+            name: 阶段名称
+
+        Returns:
+            当前负载曲线
+        """
+        return self.add_stage(LoadStage(name or self._default_name("plateau"), "plateau", duration, users, users))
+
+    def spike(self, users: int, duration: float, name: Optional[str] = None) -> "LoadProfile":
+        """
+        尖峰阶段：虚拟用户数立即跳变到 users 并保持 duration 秒，之后由下一阶段决定回落水平
+
+        Args:
+            users: 尖峰虚拟用户数
+            duration: 持续时间（秒）
+            name: 阶段名称
+
+        Returns:
+            当前负载曲线
+        """
+        return self.add_stage(LoadStage(name or self._default_name("spike"), "spike", duration, users, users))
+
+    def step(
+        self,
+        start_users: int,
+        end_users: int,
+        step_users: int,
+        step_duration: float,
+        name: Optional[str] = None
+    ) -> "LoadProfile":
+        """
+        阶梯阶段：从 start_users 起每级增加（或减少）step_users，每级保持 step_duration 秒
+
+        每一级作为独立的阶段（名称为 "<name>-<级数>"），以便分别统计。
+
+        Args:
+            start_users: 第一级虚拟用户数
+            end_users: 最后一级虚拟用户数
+            step_users: 每级变化的虚拟用户数
+            step_duration: 每级持续时间（秒）
+            name: 阶段名称前缀
+
+        Returns:
+            当前负载曲线
+        """
+        if step_users <= 0:
+            raise ValueError(f"每级变化的虚拟用户数必须为正数: {step_users}")
+
+        prefix = name or self._default_name("step")
+        direction = 1 if end_users >= start_users else -1
+        levels = abs(end_users - start_users) // step_users + 1
+
+        for level in range(levels):
+            users = start_users + direction * step_users * level
+            self.add_stage(LoadStage(f"{prefix}-{level + 1}", "step", step_duration, users, users))
+        return self
+
+    @property
+    def total_duration(self) -> float:
+        """总持续时间（秒）"""
+        return sum(stage.duration for stage in self.stages)
+
+    @property
+    def max_users(self) -> int:
+        """整条曲线的最大虚拟用户数"""
+        return max((stage.max_users for stage in self.stages), default=0)
+
+    def locate(self, elapsed: float) -> Optional[Tuple[int, LoadStage, float]]:
+        """
+        查找某一时刻所处的阶段
+
+        Args:
+            elapsed: 距曲线开始的时间（秒）
+
+        Returns:
+            (阶段序号, 阶段, 阶段内偏移秒数)，曲线已结束时返回 None
+        """
+        start = 0.0
+        for index, stage in enumerate(self.stages):
+            if elapsed < start + stage.duration:
+                return index, stage, elapsed - start
+            start += stage.duration
+        return None
+
+    def users_at(self, elapsed: float) -> int:
+        """
+        计算某一时刻的虚拟用户数
+
+        Args:
+            elapsed: 距曲线开始的时间（秒）
+
+        Returns:
+            虚拟用户数，曲线结束后为 0
+        """
+        located = self.locate(elapsed)
+        return located[1].users_at(located[2]) if located else 0
+
+
+class VirtualUserPool:
+    """常驻虚拟用户线程池
+
+    按曲线的最大虚拟用户数一次性创建线程，整条曲线执行期间不重建。
+    控制线程按固定节拍计算当前阶段和目标用户数，编号小于目标用户数的虚拟用户循环发送请求，
+    其余虚拟用户挂起等待。每个样本按请求开始时所处的阶段记录到该阶段的直方图中。
+
+    多进程执行时，第 slot 个进程只负责编号满足 index % stride == slot 的虚拟用户。
+    """
+
+    def __init__(
+        self,
+        profile: LoadProfile,
+        execute: Callable[[RequestOutcomes], float],
+        slot: int = 0,
+        stride: int = 1,
+        tick_ms: float = LOAD_PROFILE_TICK_MS
+    ):
+        """
+        初始化虚拟用户线程池
+
+        Args:
+            profile: 负载曲线
+            execute: 执行一次请求并返回响应时间（毫秒）的函数，参数为所处阶段的调用结果统计，失败时抛出异常
+            slot: 本线程池负责的虚拟用户编号余数
+            stride: 虚拟用户编号的步长（即进程总数）
+            tick_ms: 控制节拍（毫秒）
+        """
+        self.profile = profile
+        self.execute = execute
+        self.slot = slot
+        self.stride = stride
+        self.tick_ms = tick_ms
+
+        self.histograms: Dict[str, LatencyHistogram] = {stage.name: LatencyHistogram() for stage in profile.stages}
+        self.outcomes: Dict[str, RequestOutcomes] = {stage.name: RequestOutcomes() for stage in profile.stages}
+
+        self._lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._target_users = 0
+        self._stage: Optional[LoadStage] = None
+        self._finished = False
+
+    def _worker(self, user_index: int):
+        """
+        虚拟用户主循环
+
+        Args:
+            user_index: 虚拟用户全局编号
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._finished or user_index < self._target_users)
+                if self._finished:
+                    return
+                stage = self._stage
+
+            try:
+                duration = self.execute(self.outcomes[stage.name])
+            except Exception:
+                continue
+
+            with self._lock:
+                self.histograms[stage.name].record(duration)
+
+    def run(self) -> Tuple[Dict[str, LatencyHistogram], Dict[str, RequestOutcomes]]:
+        """
+        按负载曲线执行，直到曲线结束且所有在途请求完成
+
+        Returns:
+            (各阶段响应时间直方图, 各阶段调用结果统计)
+        """
+        threads = [
+            threading.Thread(target=self._worker, args=(user_index,), daemon=True, name=f"virtual-user-{user_index}")
+            for user_index in range(self.slot, self.profile.max_users, self.stride)
+        ]
+        for thread in threads:
+            thread.start()
+
+        start_time = time.perf_counter()
+        current = None
+        try:
+            while True:
+                located = self.profile.locate(time.perf_counter() - start_time)
+                if located is None:
+                    break
+
+                index, stage, offset = located
+                target = stage.users_at(offset)
+                if stage is not current:
+                    logger.info(f"进入负载阶段 {index + 1}/{len(self.profile.stages)}: {stage}")
+                    current = stage
+
+                if stage is not self._stage or target != self._target_users:
+                    with self._condition:
+                        self._stage = stage
+                        self._target_users = target
+                        self._condition.notify_all()
+
+                time.sleep(self.tick_ms / 1000)
+        finally:
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+            for thread in threads:
+                thread.join()
+
+        for stage in self.profile.stages:
+            self.outcomes[stage.name].elapsed_s = stage.duration
+        return self.histograms, self.outcomes
@@ -0,0 +1,162 @@
+"""
+访问日志关联
+按请求ID（X-Request-ID）把性能测试结果中的最慢样本与服务器访问日志关联，
+把每个尾部请求的客户端耗时拆分为服务器处理耗时和网络与客户端耗时（客户端耗时 - 服务器耗时），
+用于判断慢请求是慢在服务器还是慢在网络和客户端。
+
+服务器访问日志需要记录请求ID和处理耗时，例如：
+    Spring Boot / Tomcat: server.tomcat.accesslog.pattern=%h %l %u %t "%r" %s %b %{X-Request-ID}i %D
+    Nginx: log_format perf '... $http_x_request_id $request_time';
+
+命令行用法：
+    python log_join.py 结果.json 访问日志 [--format tomcat|tomcat10|nginx]
+"""
+
+import argparse
+import json
+import re
+from typing import Any, Dict, List, Optional
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# 预置的访问日志格式：(正则表达式, 耗时换算为毫秒的倍数)。
+# 正则表达式需包含 request_id 和 server_time 两个命名分组，默认都取行尾的最后两个字段
+_TRAILING_FIELDS = r"(?P<request_id>\S+)\s+(?P<server_time>\d+(?:\.\d+)?)\s*$"
+ACCESS_LOG_FORMATS = {
+    # Tomcat 8.5/9（Spring Boot 2）的 %D 为毫秒
+    "tomcat": (_TRAILING_FIELDS, 1.0),
+    # Tomcat 10 起 %D 为微秒
+    "tomcat10": (_TRAILING_FIELDS, 0.001),
+    # Nginx 的 $request_time 为秒（毫秒精度）
+    "nginx": (_TRAILING_FIELDS, 1000.0),
+}
+
+
+def parse_access_log(
+    path: str,
+    log_format: str = "tomcat",
+    pattern: Optional[str] = None,
+    time_scale: Optional[float] = None
+) -> Dict[str, float]:
+    """
+    读取访问日志中每个请求ID的服务器处理耗时
+
+    Args:
+        path: 访问日志文件路径
+        log_format: 预置格式名称（见 ACCESS_LOG_FORMATS）
+        pattern: 自定义正则表达式（需包含 request_id 和 server_time 命名分组），覆盖预置格式
+        time_scale: 耗时换算为毫秒的倍数，覆盖预置格式
+
+    Returns:
+        请求ID -> 服务器处理耗时（毫秒）；没有请求ID（"-"）或不匹配的行被忽略，同一ID出现多次时以最后一次为准
+    """
+    if log_format not in ACCESS_LOG_FORMATS:
+        raise ValueError(f"未知的访问日志格式: {log_format}")
+    default_pattern, default_scale = ACCESS_LOG_FORMATS[log_format]
+    regex = re.compile(pattern or default_pattern)
+    scale = time_scale if time_scale is not None else default_scale
+
+    server_times = {}
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = regex.search(line)
+            if match and match.group("request_id") != "-":
+                server_times[match.group("request_id")] = float(match.group("server_time")) * scale
+    return server_times
+
+
+def join_slowest(result: Dict[str, Any], server_times: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    按请求ID关联最慢样本中的每个请求与服务器处理耗时
+
+    Args:
+        result: 性能测试结果（包含 slowest_samples）
+        server_times: parse_access_log 的返回值
+
+    Returns:
+        按样本耗时降序的请求列表，每项包含 request_id、status、sample_ms（所在调用的耗时）、
+        client_ms（客户端观察到的请求耗时）、server_ms（服务器处理耗时，未找到时为 None）、
+        network_client_ms（网络与客户端耗时）和 server_share（服务器耗时占比）
+    """
+    rows = []
+    for sample in result.get("slowest_samples", []):
+        for request in sample["requests"]:
+            request_id = request.get("request_id")
+            if request_id is None:
+                continue
+            client_ms = request.get("elapsed_ms")
+            server_ms = server_times.get(request_id)
+            matched = server_ms is not None and client_ms is not None
+            rows.append({
+                "request_id": request_id,
+                "status": request.get("status"),
+                "sample_ms": sample["duration_ms"],
+                "client_ms": client_ms,
+                "server_ms": server_ms,
+                "network_client_ms": max(client_ms - server_ms, 0) if matched else None,
+                "server_share": min(server_ms / client_ms, 1.0) if matched and client_ms > 0 else None,
+            })
+    return rows
+
+
+def join_access_log(result: Dict[str, Any], path: str, log_format: str = "tomcat", **kwargs) -> List[Dict[str, Any]]:
+    """
+    读取访问日志、关联最慢样本并打印拆分结果
+
+    Args:
+        result: 性能测试结果（包含 slowest_samples）
+        path: 访问日志文件路径
+        log_format: 预置格式名称（见 ACCESS_LOG_FORMATS）
+        **kwargs: parse_access_log 的 pattern 和 time_scale 参数
+
+    Returns:
+        join_slowest 的返回值
+    """
+    rows = join_slowest(result, parse_access_log(path, log_format, **kwargs))
+    print_join(rows)
+    return rows
+
+
+def print_join(rows: List[Dict[str, Any]]):
+    """
+    打印最慢请求的耗时拆分
+
+    Args:
+        rows: join_slowest 的返回值
+    """
+    logger.info("=" * 80)
+    logger.info("最慢请求耗时拆分（服务器 / 网络与客户端）:")
+    logger.info(f"{'请求ID':<20} {'状态码':<8} {'客户端(ms)':<12} {'服务器(ms)':<12} {'网络+客户端(ms)':<16} {'服务器占比':<10}")
+    for row in rows:
+        if row["server_ms"] is None:
+            logger.info(f"{row['request_id']:<20} {row['status']!s:<8} {row['client_ms'] or 0:<12.3f} 访问日志中未找到")
+            continue
+        logger.info(
+            f"{row['request_id']:<20} {row['status']!s:<8} {row['client_ms']:<12.3f} {row['server_ms']:<12.3f} "
+            f"{row['network_client_ms']:<16.3f} {row['server_share']:<10.1%}"
+        )
+    matched = [row for row in rows if row["server_ms"] is not None]
+    logger.info(f"已关联 {len(matched)}/{len(rows)} 个请求")
+    logger.info("=" * 80)
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口：结果文件可以是单个测试结果，也可以是多个结果组成的字典（如对比测试的结果）"""
+    parser = argparse.ArgumentParser(description="按请求ID关联性能测试最慢样本与服务器访问日志")
+    parser.add_argument("result", help="保存为 JSON 的性能测试结果")
+    parser.add_argument("access_log", help="服务器访问日志")
+    parser.add_argument("--format", default="tomcat", choices=sorted(ACCESS_LOG_FORMATS), help="访问日志格式")
+    args = parser.parse_args(argv)
+
+    with open(args.result, encoding="utf-8") as f:
+        data = json.load(f)
+    results = [data] if "slowest_samples" in data else [value for value in data.values() if isinstance(value, dict)]
+    server_times = parse_access_log(args.access_log, args.format)
+    for result in results:
+        print_join(join_slowest(result, server_times))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,374 @@
 提供统一的日志记录功能
 """
 
+import atexit
+import contextvars
+import itertools
 import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
+import time
+import weakref
 from datetime import datetime
-from config import LOG_DIR, VERBOSE_LOGGING
+from typing import Any, Dict, List, Optional
+from config import (
+    LOG_DIR,
+    VERBOSE_LOGGING,
+    LOG_QUEUE_MODE,
+    LOG_QUEUE_BATCH_SIZE,
+    LOG_SAMPLING,
+    LOG_SAMPLE_RATE,
+    LOG_RATE_LIMIT_COUNT,
+    LOG_RATE_LIMIT_INTERVAL_S
+)
+
+
+# 可以延迟到监听线程再格式化的参数类型：不可变，放入队列后不会被调用方修改
+_IMMUTABLE_ARG_TYPES = (str, int, float, bool, bytes, type(None))
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """写到当前 sys.stderr 的控制台处理器
+
+    StreamHandler 在创建时就固定了输出流。队列模式下记录由监听线程稍后写出，
+    此时 sys.stderr 可能已被替换（如 pytest 结束对某个测试的输出捕获并关闭了捕获文件），
+    因此每次写出时再取当前的 sys.stderr（与 logging.lastResort 相同）。
+    """
+
+    def __init__(self):
+        super().__init__(sys.stderr)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """不在调用线程格式化日志的队列处理器
+
+    标准 QueueHandler 在入队前就格式化消息（为了能跨进程传递），这里队列只在进程内使用，
+    因此原样放入日志记录（消息模板和参数），由监听线程格式化。消息不是字符串或参数中有可变对象时仍立即合并消息，
+    避免调用方之后修改对象导致日志内容与记录时不符。
+    """
+
+    def __init__(self, listener: "BatchingQueueListener"):
+        """
+        初始化队列处理器
+
+        Args:
+            listener: 写出日志的监听器（fork 后监听器换用新队列，因此每次入队时取其当前队列）
+        """
+        super().__init__(listener.queue)
+        self.listener = listener
+
+    def enqueue(self, record: logging.LogRecord):
+        self.listener.queue.put_nowait(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if not isinstance(record.msg, str) or args and not all(isinstance(arg, _IMMUTABLE_ARG_TYPES) for arg in (
+            args.values() if isinstance(args, dict) else args
+        )):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class BatchingQueueListener:
+    """批量写日志的队列监听器
+
+    单个监听线程从队列中取出日志记录，每次取出当前积压的全部记录（最多 batch_size 条），
+    对每个处理器只加一次锁、写完整批后只刷新一次，而不是每条记录都刷新一次文件和控制台。
+    """
+
+    def __init__(self, handlers: List[logging.Handler], batch_size: int = LOG_QUEUE_BATCH_SIZE):
+        """
+        初始化监听器
+
+        Args:
+            handlers: 实际写日志的处理器
+            batch_size: 每批最多处理的记录数
+        """
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.queue = queue.SimpleQueue()
+        self._thread = None
+        # 写出一批记录期间持有；fork 前获取，保证子进程不会继承监听线程写到一半时持有的流缓冲区锁
+        self._write_lock = threading.Lock()
+
+    def start(self):
+        """启动监听线程"""
+        self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+        self._thread.start()
+        _running_listeners.add(self)
+
+    def stop(self):
+        """写完队列中已有的记录后停止监听线程"""
+        if self._thread is None:
+            return
+        _running_listeners.discard(self)
+        self.queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        等待此前放入队列的记录全部写出
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+        """
+        if self._thread is None:
+            return
+        written = threading.Event()
+        self.queue.put(written)
+        written.wait(timeout)
+
+    def _restart_in_child(self):
+        """fork 出的子进程中没有监听线程，换用新队列重新启动（父进程积压的记录由父进程写出）"""
+        self.queue = queue.SimpleQueue()
+        self._write_lock = threading.Lock()
+        self.start()
+
+    def _run(self):
+        """监听线程：阻塞等待第一条记录，再取出已积压的记录组成一批写出"""
+        q = self.queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            records = [item for item in batch if isinstance(item, logging.LogRecord)]
+            if records:
+                with self._write_lock:
+                    for handler in self.handlers:
+                        self._write(handler, records)
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in batch:
+                return
+
+    @staticmethod
+    def _write(handler: logging.Handler, records: List[logging.LogRecord]):
+        """
+        用一个处理器写出一批记录
+
+        Args:
+            handler: 处理器
+            records: 日志记录
+        """
+        stream = getattr(handler, "stream", None)
+        if not isinstance(handler, logging.StreamHandler) or stream is None:
+            for record in records:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            return
+        handler.acquire()
+        try:
+            for record in records:
+                if record.levelno >= handler.level and handler.filter(record):
+                    try:
+                        stream.write(handler.format(record) + handler.terminator)
+                    except Exception:
+                        handler.handleError(record)
+                # 格式化同样需要持有 GIL：每写一条让出一次，收到响应的工作线程不必等满一个线程切换间隔（默认 5ms）
+                time.sleep(0)
+            try:
+                handler.flush()
+            except Exception:
+                # 与 StreamHandler.emit 相同，写日志出错不能让监听线程退出（否则之后的日志和 flush 都会卡住）
+                handler.handleError(records[-1])
+        finally:
+            handler.release()
+
+
+# 正在运行的监听器，fork 后在子进程中重新启动
+_running_listeners = weakref.WeakSet()
+
+
+# fork 前获取的写锁，fork 后在父进程中逐个释放
+_paused_locks = []
+
+
+def _pause_listeners():
+    for listener in list(_running_listeners):
+        listener._write_lock.acquire()
+        _paused_locks.append(listener._write_lock)
+
+
+def _resume_listeners():
+    while _paused_locks:
+        _paused_locks.pop().release()
+
+
+def _restart_listeners_in_child():
+    _paused_locks.clear()
+    for listener in list(_running_listeners):
+        listener._restart_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_pause_listeners,
+        after_in_parent=_resume_listeners,
+        after_in_child=_restart_listeners_in_child
+    )
+
+
+# 当前线程（或协程）正在执行的压测调用缓冲的日志记录，不在压测调用中时为 None
+_call_records = contextvars.ContextVar("call_records", default=None)
+
+# 限流窗口数量超过该值时清理已过期且没有省略记录的窗口
+_RATE_LIMIT_MAX_KEYS = 4096
+
+
+class LoadRunLogFilter(logging.Filter):
+    """压测期间的日志采样与限流过滤器
+
+    只对压测调用（begin_call 与 end_call 之间）中记录的日志生效，其他日志原样放行，因此功能测试不受影响。
+    调用期间 WARNING 以下的记录先缓冲在当前线程（或协程）中，调用结束时按结果决定是否写出：
+    失败或进入最慢样本的调用总是写出，其余调用每 sample_rate 次写出一次，使同一请求的日志要么完整保留要么整体丢弃。
+    WARNING 及以上的记录立即写出。写出的记录再按内容限流，相同的日志每个时间窗口最多写出 rate_limit 条，
+    被省略的条数在下一个窗口写出该日志时附在消息后，或由 report_suppressed 汇总。
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = LOG_SAMPLE_RATE,
+        rate_limit: int = LOG_RATE_LIMIT_COUNT,
+        interval_s: float = LOG_RATE_LIMIT_INTERVAL_S
+    ):
+        """
+        初始化过滤器
+
+        Args:
+            sample_rate: 每多少次成功调用保留一次调用的日志
+            rate_limit: 每个时间窗口内相同日志最多写出的条数
+            interval_s: 限流时间窗口（秒）
+        """
+        super().__init__()
+        self.sample_rate = max(int(sample_rate), 1)
+        self.rate_limit = rate_limit
+        self.interval_s = interval_s
+        # 挂载该过滤器的处理器，采样保留的记录在调用结束后交给它们写出
+        self.handlers = []
+        self.dropped_calls = 0
+        self.suppressed = 0
+        self._calls = itertools.count()
+        # 限流窗口：日志内容 -> [窗口开始时间, 已写出条数, 已省略条数, 最近一条被省略的记录]
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # 同步写日志时文件和控制台处理器共用一个过滤器，同一条记录只判断一次
+        decision = getattr(record, "_load_run_decision", None)
+        if decision is not None:
+            return decision
+        records = _call_records.get()
+        if records is None:
+            return True
+        if record.levelno < logging.WARNING:
+            records.append(record)
+            decision = False
+        else:
+            decision = self._rate_limit(record)
+        record._load_run_decision = decision
+        return decision
+
+    def begin_call(self):
+        """开始一次压测调用：之后当前线程（或协程）记录的 WARNING 以下日志先缓冲，直到 end_call"""
+        _call_records.set([])
+
+    def end_call(self, keep: bool):
+        """
+        结束压测调用，决定是否写出调用期间缓冲的日志
+
+        Args:
+            keep: 是否必须保留（调用失败或进入最慢样本），否则按采样率保留
+        """
+        records = _call_records.get()
+        if records is None:
+            return
+        _call_records.set(None)
+        if not keep and next(self._calls) % self.sample_rate:
+            if records:
+                with self._lock:
+                    self.dropped_calls += 1
+            return
+        for record in records:
+            record._load_run_decision = self._rate_limit(record)
+            if record._load_run_decision:
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+
+    def _rate_limit(self, record: logging.LogRecord) -> bool:
+        """
+        按日志内容限流
+
+        Args:
+            record: 日志记录
+
+        Returns:
+            是否写出；写出时若上一个窗口省略过相同日志，在消息后附上省略的条数
+        """
+        key = (record.name, record.levelno, record.msg, record.args)
+        try:
+            hash(key)
+        except TypeError:
+            key = (record.name, record.levelno, record.getMessage(), None)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is not None and now - window[0] < self.interval_s:
+                if window[1] < self.rate_limit:
+                    window[1] += 1
+                    return True
+                window[2] += 1
+                window[3] = record
+                self.suppressed += 1
+                return False
+            if len(self._windows) >= _RATE_LIMIT_MAX_KEYS:
+                self._windows = {
+                    k: w for k, w in self._windows.items() if w[2] or now - w[0] < self.interval_s
+                }
+            self._windows[key] = [now, 1, 0, None]
+        if window is not None and window[2]:
+            record.msg = f"{record.msg}（此前 {self.interval_s:g} 秒内另有 {window[2]} 条相同日志被省略）"
+        return True
+
+    def report_suppressed(self) -> Dict[str, Any]:
+        """
+        汇总并清零压测期间被采样丢弃的调用数和被限流省略的日志条数，逐条写出仍未报告的限流省略
+
+        Returns:
+            包含 dropped_calls（日志被采样丢弃的调用数）和 suppressed（被限流省略的日志条数）的字典
+        """
+        with self._lock:
+            pending = [window for window in self._windows.values() if window[2]]
+            self._windows = {}
+            stats = {"dropped_calls": self.dropped_calls, "suppressed": self.suppressed}
+            self.dropped_calls = self.suppressed = 0
+        for _, _, count, record in pending:
+            logging.getLogger(record.name).log(
+                record.levelno, "%s（限流省略 %d 条相同日志）", record.getMessage(), count
+            )
+        if stats["dropped_calls"] or stats["suppressed"]:
+            logging.getLogger(__name__).info(
+                "压测日志采样: %d 次调用的日志按 1/%d 采样未写出, %d 条重复日志被限流省略",
+                stats["dropped_calls"], self.sample_rate, stats["suppressed"]
+            )
+        return stats
 
 
 class TestLogger:
@@ -43,21 +407,44 @@ class TestLogger:
         # 设置日志级别
         log_level = logging.DEBUG if VERBOSE_LOGGING else logging.INFO
         
+        handlers = [
+            # 文件处理器
+            logging.FileHandler(log_file, encoding='utf-8'),
+            # 控制台处理器
+            ConsoleHandler()
+        ]
+        
+        # 队列模式下根日志记录器只挂队列处理器，文件和控制台由监听线程批量写入
+        self.listener = None
+        if LOG_QUEUE_MODE:
+            formatter = logging.Formatter(log_format, date_format)
+            for handler in handlers:
+                handler.setFormatter(formatter)
+            self.listener = BatchingQueueListener(handlers)
+            handlers = [DeferredQueueHandler(self.listener)]
+        
+        # 压测调用期间的日志采样与限流，挂在根日志记录器的处理器上
+        self.sampling_filter = LoadRunLogFilter() if LOG_SAMPLING else None
+        if self.sampling_filter is not None:
+            for handler in handlers:
+                handler.addFilter(self.sampling_filter)
+            self.sampling_filter.handlers = handlers
+        
         # 配置根日志记录器
         logging.basicConfig(
             level=log_level,
             format=log_format,
             datefmt=date_format,
-            handlers=[
-                # 文件处理器
-                logging.FileHandler(log_file, encoding='utf-8'),
-                # 控制台处理器
-                logging.StreamHandler()
-            ]
+            handlers=handlers
         )
         
+        if self.listener is not None:
+            self.listener.start()
+            # 先于 logging 模块自身的退出清理执行，保证退出前写完队列中的记录
+            atexit.register(self.listener.stop)
+        
         self.logger = logging.getLogger('TestLogger')
-        self.logger.info(f"日志系统初始化完成，日志文件: {log_file}")
+        self.logger.info("日志系统初始化完成，日志文件: %s", log_file)
     
     def get_logger(self, name=None):
         """
@@ -73,6 +460,11 @@ class TestLogger:
             return logging.getLogger(name)
         return self.logger
     
+    def flush(self):
+        """队列模式下等待已记录的日志全部写入文件和控制台（如读取日志文件之前）"""
+        if self.listener is not None:
+            self.listener.flush()
+    
     def info(self, message):
         """记录INFO级别日志"""
         self.logger.info(message)
@@ -182,3 +574,43 @@ def get_logger(name=None):
         logging.Logger: 日志记录器实例
     """
     return logger.get_logger(name)
+
+
+def flush_logs():
+    """等待已记录的日志全部写出（队列模式下，以 os._exit 退出的子进程在退出前调用）"""
+    logger.flush()
+
+
+def begin_sampled_call():
+    """开始一次压测调用的日志采样（未启用 LOG_SAMPLING 时不做任何事）"""
+    if logger.sampling_filter is not None:
+        logger.sampling_filter.begin_call()
+
+
+def end_sampled_call(keep: bool):
+    """
+    结束压测调用的日志采样
+
+    Args:
+        keep: 是否必须保留调用期间的日志（调用失败或进入最慢样本）
+    """
+    if logger.sampling_filter is not None:
+        logger.sampling_filter.end_call(keep)
+
+
+def report_suppressed_logs(*worker_stats: Optional[Dict[str, int]]) -> Optional[Dict[str, int]]:
+    """
+    压测结束时汇总并清零采样丢弃和限流省略的日志计数（每次运行结束时调用一次）
+
+    Args:
+        *worker_stats: 工作进程回传的统计，与本进程的统计相加
+
+    Returns:
+        包含 dropped_calls 和 suppressed 的字典；未启用 LOG_SAMPLING 且没有工作进程统计时返回 None
+    """
+    stats = [item for item in worker_stats if item]
+    if logger.sampling_filter is not None:
+        stats.append(logger.sampling_filter.report_suppressed())
+    if not stats:
+        return None
+    return {key: sum(item[key] for item in stats) for key in ("dropped_calls", "suppressed")}
@@ -3,20 +3,197 @@
 提供并发测试、响应时间测试等功能
 """
 
+import os
+import json
+import math
 import time
-import statistics
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, List, Dict, Any
-from logger import get_logger
+import random
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
+from logger import get_logger, begin_sampled_call, end_sampled_call, report_suppressed_logs
+from histogram import LatencyHistogram
+from load_profile import LoadProfile, VirtualUserPool
+from soak import IntervalRecorder, linear_trend
+from request_trace import RequestOutcomes
+from capacity_search import CapacitySearch
+from scalability import analyze_scalability
+from port_monitor import EphemeralPortMonitor
+import request_trace
+import json_codec
+from utils import FileUtils, TimeUtils, WorkerLocal, find_http_client, rebind_http_client, worker_local
+from config import (
+    MAX_WAIT_TIME_MS,
+    OPEN_LOOP_MAX_IN_FLIGHT,
+    REPORT_DIR,
+    SOAK_SNAPSHOT_INTERVAL_S,
+    SOAK_MAX_P50_SLOPE_MS_PER_MIN,
+    SOAK_MAX_P99_SLOPE_MS_PER_MIN,
+    SOAK_MAX_ERROR_RATE_SLOPE_PER_MIN,
+    SOAK_ERROR_BACKOFF_S,
+    CAPACITY_MAX_ERROR_RATE,
+    CAPACITY_CONFIRM_TRIALS,
+    CAPACITY_SEARCH_LIMIT,
+    PERF_DECODE_RESPONSES
+)
 
 logger = get_logger(__name__)
 
 
+class BurstWorkerPool:
+    """常驻突发工作线程池
+    
+    在测量窗口开始前一次性创建全部工作线程，之后的每次迭代都复用这些线程。
+    每轮迭代中所有线程先在屏障处等待，被同时释放后再发出请求，保证“并发 N”
+    确实是 N 个请求同时发出。每个线程只写入自己预分配的缓冲区，无需加锁。
+    """
+    
+    def __init__(
+        self,
+        perf: "PerformanceTest",
+        concurrency: int,
+        iterations: int,
+        setup: Optional[Callable[[], Any]] = None
+    ):
+        """
+        初始化并启动工作线程
+        
+        Args:
+            perf: 执行计时的性能测试实例
+            concurrency: 工作线程数（并发数）
+            iterations: 迭代次数（决定缓冲区大小）
+            setup: 每个工作线程在测量窗口开始前执行一次的准备函数（如创建线程独立会话）
+        """
+        self.perf = perf
+        self.concurrency = concurrency
+        self.iterations = iterations
+        
+        # 每个工作线程独占的缓冲区：响应时间（失败为 NaN）和实际发送时间
+        self.durations = [array('d', [math.nan]) * iterations for _ in range(concurrency)]
+        self.send_times = [array('d', [0.0]) * iterations for _ in range(concurrency)]
+        self.outcomes = [RequestOutcomes() for _ in range(concurrency)]
+        
+        self._start_barrier = threading.Barrier(concurrency + 1)
+        self._done_barrier = threading.Barrier(concurrency + 1)
+        self._task = None
+        self._iteration = 0
+        self._stopping = False
+        self._setup = setup
+        
+        self._threads = [
+            threading.Thread(target=self._worker, args=(index,), daemon=True, name=f"burst-worker-{index}")
+            for index in range(concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+        
+        # 空跑一轮屏障，让所有线程在测量窗口开始前都至少被调度过一次（同时执行准备函数）
+        self._start_barrier.wait()
+        self._done_barrier.wait()
+    
+    def _worker(self, index: int):
+        """
+        工作线程主循环
+        
+        Args:
+            index: 工作线程序号
+        """
+        durations = self.durations[index]
+        send_times = self.send_times[index]
+        outcomes = self.outcomes[index]
+        
+        while True:
+            self._start_barrier.wait()
+            if self._stopping:
+                return
+            if self._task is None:
+                if self._setup is not None:
+                    try:
+                        self._setup()
+                    except Exception as e:
+                        logger.error(f"工作线程准备失败: {str(e)}")
+                self._done_barrier.wait()
+                continue
+            
+            func, args, kwargs = self._task
+            iteration = self._iteration
+            send_times[iteration] = time.perf_counter()
+            try:
+                durations[iteration] = self.perf._observed_execution(
+                    outcomes, self.perf._timed_execution, func, *args, **kwargs
+                )
+            except Exception as e:
+                logger.error(f"任务执行失败: {str(e)}")
+            
+            self._done_barrier.wait()
+    
+    def run_burst(self, iteration: int, func: Callable, args: tuple, kwargs: Dict[str, Any]) -> float:
+        """
+        同时释放所有工作线程执行一轮请求，并等待全部完成
+        
+        Args:
+            iteration: 迭代序号
+            func: 要测试的函数
+            args: 函数位置参数
+            kwargs: 函数关键字参数
+        
+        Returns:
+            本轮发送时间的离散程度（最晚与最早发送时间之差，毫秒）
+        """
+        self._task = (func, args, kwargs)
+        self._iteration = iteration
+        
+        self._start_barrier.wait()
+        self._done_barrier.wait()
+        
+        sends = [send_times[iteration] for send_times in self.send_times]
+        return (max(sends) - min(sends)) * 1000
+    
+    def collect(
+        self,
+        histogram: LatencyHistogram,
+        outcomes: RequestOutcomes,
+        samples: Optional[List[float]] = None
+    ):
+        """
+        将所有缓冲区中的成功样本写入直方图，并合并各线程的调用结果统计
+        
+        Args:
+            histogram: 目标直方图
+            outcomes: 目标调用结果统计
+            samples: 原始样本列表，为空时不保留原始样本
+        """
+        for worker_outcomes in self.outcomes:
+            outcomes.merge(worker_outcomes)
+        for durations in self.durations:
+            for duration in durations:
+                if not math.isnan(duration):
+                    histogram.record(duration)
+                    if samples is not None:
+                        samples.append(duration)
+    
+    def shutdown(self):
+        """停止并回收所有工作线程"""
+        self._stopping = True
+        self._start_barrier.wait()
+        for thread in self._threads:
+            thread.join()
+
+
 class PerformanceTest:
     """性能测试工具类"""
     
-    def __init__(self):
+    def __init__(self, decode_responses: bool = PERF_DECODE_RESPONSES):
+        """
+        初始化
+        
+        Args:
+            decode_responses: 被测函数调用 BaseTest 辅助方法时是否立即解码响应。默认不解码，
+                辅助方法返回延迟解码的结果，只有读取内容（校验响应）时才解码，避免解码耗时计入响应时间
+        """
         self.results = []
+        self.decode_responses = decode_responses
     
     def concurrent_test(
         self, 
@@ -24,6 +201,11 @@ class PerformanceTest:
         concurrency: int = 1, 
         iterations: int = 1,
         *args, 
+        expected_interval_ms: Optional[float] = None,
+        keep_samples: bool = False,
+        warm_up: bool = False,
+        isolate_sessions: bool = False,
+        monitor_ports: bool = False,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -34,6 +216,12 @@ class PerformanceTest:
             concurrency: 并发数
             iterations: 每次测试的迭代次数（取平均值）
             *args: 函数位置参数
+            expected_interval_ms: 期望请求间隔（毫秒），指定后额外计算协调遗漏校正后的统计数据
+            keep_samples: 是否保留全部原始样本（结果中的 all_durations），默认只记录直方图
+            warm_up: 是否在测量窗口开始前为被测函数使用的 HttpClient 预建与并发数相同的连接
+            isolate_sessions: 是否为每个工作线程复制独立的 HttpClient（见 worker_local），
+                各迭代复用同一份会话；被测函数已是 WorkerLocal 时总是使用独立会话
+            monitor_ports: 是否在测试期间监控本机 TIME_WAIT 套接字数和临时端口占用（结果中的 ports）
             **kwargs: 函数关键字参数
         
         Returns:
@@ -41,45 +229,523 @@ class PerformanceTest:
         """
         logger.info(f"开始并发测试 - 并发数: {concurrency}, 迭代次数: {iterations}")
         
-        all_durations = []
+        with EphemeralPortMonitor(enabled=monitor_ports) as ports:
+            histogram, samples, burst_stats, outcomes = self._run_closed_loop(
+                func, concurrency, iterations, args, kwargs, keep_samples, warm_up, isolate_sessions
+            )
         
-        for iteration in range(iterations):
-            logger.info(f"执行第 {iteration + 1}/{iterations} 次迭代")
-            
-            durations = []
-            
-            with ThreadPoolExecutor(max_workers=concurrency) as executor:
-                # 提交并发任务
-                futures = []
-                start_time = time.time()
+        # 计算统计数据并打印结果
+        extra = dict(burst_stats, **outcomes.summary())
+        extra.update(ports.summary())
+        return self._build_result(histogram, concurrency, iterations, expected_interval_ms, samples, extra)
+    
+    def _run_closed_loop(
+        self,
+        func: Callable,
+        concurrency: int,
+        iterations: int,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        keep_samples: bool = False,
+        warm_up: bool = False,
+        isolate_sessions: bool = False
+    ) -> Tuple[LatencyHistogram, Optional[List[float]], Dict[str, float], RequestOutcomes]:
+        """
+        执行闭环并发测试的全部迭代
+        
+        工作线程在测量窗口开始前创建并在各迭代间复用，每轮迭代在屏障处同时发出请求。
+        
+        Args:
+            func: 要测试的函数
+            concurrency: 并发数
+            iterations: 迭代次数
+            args: 函数位置参数
+            kwargs: 函数关键字参数
+            keep_samples: 是否保留全部原始样本
+            warm_up: 是否在测量窗口开始前预建连接
+            isolate_sessions: 是否为每个工作线程使用独立的 HttpClient
+        
+        Returns:
+            (所有成功请求的响应时间直方图, 原始样本列表或 None,
+             发送时间离散程度统计（连接池小于并发数时另含 pool_shortfall，预热时另含 warmed_connections）, 调用结果统计)
+        """
+        histogram = LatencyHistogram()
+        outcomes = RequestOutcomes()
+        samples = [] if keep_samples else None
+        spreads = []
+        
+        # 独立会话在工作线程空跑一轮时创建，本次测试内部创建的在测试结束后关闭
+        owned_local = isolate_sessions and not isinstance(func, WorkerLocal)
+        if isolate_sessions:
+            func = worker_local(func)
+        local = func if isinstance(func, WorkerLocal) else None
+        
+        pool = BurstWorkerPool(self, concurrency, iterations, setup=local.attach if local else None)
+        
+        client = local or find_http_client(func)
+        pool_stats = {}
+        if local is None and client is not None and concurrency > client.pool_size:
+            pool_stats["pool_shortfall"] = concurrency - client.pool_size
+            logger.warning(f"并发数 {concurrency} 超过连接池大小 {client.pool_size}，每轮多出的 "
+                           f"{pool_stats['pool_shortfall']} 个连接用完即被丢弃、下一轮重新建立，响应时间会包含建连耗时；"
+                           f"请使用 HttpClient(pool_size={concurrency}) 或 isolate_sessions=True")
+        if warm_up and client is not None:
+            # 独立会话每个预建 1 个连接，共享客户端预建与并发数相同的连接，两种情况下都应共有 concurrency 个
+            pool_stats["warmed_connections"] = client.warm_up(1 if local else concurrency)
+            if pool_stats["warmed_connections"] < concurrency:
+                logger.warning(f"连接池预热只建立了 {pool_stats['warmed_connections']}/{concurrency} 个连接，"
+                               f"测量窗口内仍会新建连接")
+        connections_before = client.connection_stats() if client is not None else None
+        cache = getattr(client, "cache", None)
+        cache_before = cache.stats() if cache is not None else None
+        
+        window_start = time.perf_counter()
+        try:
+            for iteration in range(iterations):
+                logger.info(f"执行第 {iteration + 1}/{iterations} 次迭代")
                 
-                for i in range(concurrency):
-                    future = executor.submit(self._timed_execution, func, *args, **kwargs)
-                    futures.append(future)
+                start_time = time.perf_counter()
+                spreads.append(pool.run_burst(iteration, func, args, kwargs))
+                total_time = time.perf_counter() - start_time
                 
-                # 等待所有任务完成并收集结果
-                for future in as_completed(futures):
-                    try:
-                        duration = future.result()
-                        durations.append(duration)
-                    except Exception as e:
-                        logger.error(f"任务执行失败: {str(e)}")
+                logger.info(f"第 {iteration + 1} 次迭代完成 - 总耗时: {total_time:.4f}秒, "
+                            f"发送时间差: {spreads[-1]:.3f}ms")
+        finally:
+            outcomes.elapsed_s = time.perf_counter() - window_start
+            pool.shutdown()
+        
+        pool.collect(histogram, outcomes, samples)
+        if connections_before is not None:
+            outcomes.record_connections(connections_before, client.connection_stats())
+        if cache_before is not None:
+            outcomes.record_cache(cache_before, cache.stats())
+        if owned_local:
+            local.close()
+        
+        burst_stats = {
+            "send_spread_avg_ms": sum(spreads) / len(spreads) if spreads else 0,
+            "send_spread_max_ms": max(spreads) if spreads else 0,
+        }
+        burst_stats.update(pool_stats)
+        return histogram, samples, burst_stats, outcomes
+    
+    def _build_result(
+        self,
+        histogram: LatencyHistogram,
+        concurrency: int,
+        iterations: int,
+        expected_interval_ms: Optional[float] = None,
+        samples: Optional[List[float]] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        汇总闭环测试结果：计算统计数据、按需进行协调遗漏校正并打印结果
+        
+        Args:
+            histogram: 响应时间直方图
+            concurrency: 并发数
+            iterations: 迭代次数
+            expected_interval_ms: 期望请求间隔（毫秒），为空时不做校正
+            samples: 原始样本列表，为空时结果中不包含 all_durations
+            extra: 由具体测试引擎补充的结果字段
+        
+        Returns:
+            性能测试结果字典
+        """
+        result = self._calculate_statistics(histogram, concurrency, iterations, samples)
+        
+        if extra:
+            result.update(extra)
+        
+        if expected_interval_ms:
+            result.update(self._calculate_corrected_statistics(histogram, expected_interval_ms))
+        
+        result["log_sampling"] = self._log_sampling_stats()
+        self._print_results(result)
+        
+        return result
+    
+    def open_loop_test(
+        self,
+        func: Callable,
+        rate: float,
+        duration: float,
+        poisson: bool = False,
+        max_in_flight: int = OPEN_LOOP_MAX_IN_FLIGHT,
+        *args,
+        keep_samples: bool = False,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        开环测试（恒定到达率）
+        
+        按目标到达率预先计算每个请求的计划发送时间，不论还有多少请求未返回都按计划发送，
+        后端变慢时施加的负载不会随之下降。响应时间从计划发送时间开始计算，
+        在途请求数达到上限时发送会被推迟，推迟量记为发送延迟。
+        
+        Args:
+            func: 要测试的函数
+            rate: 目标到达率（请求/秒）
+            duration: 测试持续时间（秒）
+            poisson: 是否使用泊松到达（请求间隔服从指数分布），默认等间隔到达
+            max_in_flight: 在途请求数上限，防止客户端内存耗尽
+            *args: 函数位置参数
+            keep_samples: 是否保留全部原始样本（结果中的 all_durations），默认只记录直方图
+            **kwargs: 函数关键字参数
+        
+        Returns:
+            性能测试结果字典，额外包含目标/实际到达率和发送延迟统计
+        """
+        if rate <= 0 or duration <= 0:
+            raise ValueError(f"到达率和持续时间必须为正数: rate={rate}, duration={duration}")
+        
+        logger.info(
+            f"开始开环测试 - 目标速率: {rate}/秒, 持续时间: {duration}秒, "
+            f"到达方式: {'泊松' if poisson else '等间隔'}, 在途上限: {max_in_flight}"
+        )
+        
+        histogram = LatencyHistogram()
+        send_lags = LatencyHistogram()
+        outcomes = RequestOutcomes()
+        samples = [] if keep_samples else None
+        state = {"in_flight": 0, "peak_in_flight": 0}
+        lock = threading.Lock()
+        slots = threading.BoundedSemaphore(max_in_flight)
+        rng = random.Random()
+        client = find_http_client(func)
+        connections_before = client.connection_stats() if client is not None else None
+        cache = getattr(client, "cache", None)
+        cache_before = cache.stats() if cache is not None else None
+        
+        def on_done(future):
+            try:
+                duration_ms = future.result()
+                with lock:
+                    histogram.record(duration_ms)
+                    if samples is not None:
+                        samples.append(duration_ms)
+            except Exception as e:
+                logger.error(f"任务执行失败: {str(e)}")
+            finally:
+                with lock:
+                    state["in_flight"] -= 1
+                slots.release()
+        
+        start_time = time.perf_counter()
+        end_time = start_time + duration
+        intended = start_time
+        sent = 0
+        
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            while intended < end_time:
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
                 
-                total_time = time.time() - start_time
-            
-            # 记录本次迭代结果
-            all_durations.extend(durations)
+                # 在途请求数达到上限时阻塞，直到有请求返回
+                slots.acquire()
+                send_lags.record((time.perf_counter() - intended) * 1000)
+                with lock:
+                    state["in_flight"] += 1
+                    state["peak_in_flight"] = max(state["peak_in_flight"], state["in_flight"])
+                
+                future = executor.submit(
+                    self._observed_execution, outcomes, self._open_loop_execution, intended, func, *args, **kwargs
+                )
+                future.add_done_callback(on_done)
+                sent += 1
+                
+                intended += rng.expovariate(rate) if poisson else 1.0 / rate
             
-            logger.info(f"第 {iteration + 1} 次迭代完成 - 总耗时: {total_time:.4f}秒")
+            send_window = max(time.perf_counter() - start_time, duration)
         
-        # 计算统计数据
-        result = self._calculate_statistics(all_durations, concurrency, iterations)
+        total_time = time.perf_counter() - start_time
+        outcomes.elapsed_s = total_time
+        if connections_before is not None:
+            outcomes.record_connections(connections_before, client.connection_stats())
+        if cache_before is not None:
+            outcomes.record_cache(cache_before, cache.stats())
+        logger.info(f"开环测试完成 - 已发送: {sent}, 总耗时: {total_time:.4f}秒")
+        
+        result = self._calculate_statistics(histogram, state["peak_in_flight"], 1, samples)
+        result.update({
+            "mode": "open_loop",
+            "arrival": "poisson" if poisson else "constant",
+            "max_in_flight": max_in_flight,
+            "target_rate": rate,
+            "achieved_rate": sent / send_window,
+            "sent_requests": sent,
+            "send_lag_avg_ms": send_lags.mean,
+            "send_lag_p99_ms": send_lags.percentile(99),
+            "send_lag_max_ms": send_lags.max_ms,
+        })
+        result.update(outcomes.summary())
+        result["log_sampling"] = self._log_sampling_stats()
         
-        # 打印结果
         self._print_results(result)
         
         return result
     
+    def _open_loop_execution(self, intended: float, func: Callable, *args, **kwargs) -> float:
+        """
+        执行开环测试中的单个请求
+        
+        Args:
+            intended: 计划发送时间（time.perf_counter 时间戳）
+            func: 要执行的函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+        
+        Returns:
+            从计划发送时间到完成的耗时（毫秒）
+        """
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            logger.error("函数执行出错: %s", e)
+            raise
+        
+        return (time.perf_counter() - intended) * 1000
+    
+    def soak_test(
+        self,
+        func: Callable,
+        duration: float,
+        concurrency: int = 1,
+        *args,
+        snapshot_interval: float = SOAK_SNAPSHOT_INTERVAL_S,
+        snapshot_file: Optional[str] = None,
+        max_p50_slope: Optional[float] = SOAK_MAX_P50_SLOPE_MS_PER_MIN,
+        max_p99_slope: Optional[float] = SOAK_MAX_P99_SLOPE_MS_PER_MIN,
+        max_error_rate_slope: Optional[float] = SOAK_MAX_ERROR_RATE_SLOPE_PER_MIN,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        耐久（浸泡）测试：按墙钟时长持续施压，检测性能是否随时间劣化
+        
+        concurrency 个常驻虚拟用户循环发送请求。每隔 snapshot_interval 秒生成一份间隔快照
+        （以 JSON Lines 格式追加写入 snapshot_file），结束后对各间隔的 P50、P99 和错误率
+        做最小二乘线性拟合，任一斜率超过阈值即判定为劣化（结果中 trend_passed 为 False）。
+        间隔直方图轮换复用，内存占用与测试时长无关。
+        
+        Args:
+            func: 要测试的函数
+            duration: 测试持续时间（秒）
+            concurrency: 虚拟用户数
+            *args: 函数位置参数
+            snapshot_interval: 快照间隔（秒）
+            snapshot_file: 快照文件路径，默认写入报告目录下的 soak_<时间戳>.jsonl
+            max_p50_slope: P50 允许的最大上升斜率（毫秒/分钟），为 None 时不检查
+            max_p99_slope: P99 允许的最大上升斜率（毫秒/分钟），为 None 时不检查
+            max_error_rate_slope: 错误率允许的最大上升斜率（每分钟），为 None 时不检查
+            **kwargs: 函数关键字参数
+        
+        Returns:
+            性能测试结果字典，额外包含快照信息、各指标斜率和劣化判定
+        """
+        if duration <= 0 or snapshot_interval <= 0:
+            raise ValueError(f"持续时间和快照间隔必须为正数: duration={duration}, interval={snapshot_interval}")
+        
+        snapshot_file = snapshot_file or os.path.join(REPORT_DIR, f"soak_{TimeUtils.get_timestamp()}.jsonl")
+        FileUtils.ensure_dir(os.path.dirname(snapshot_file) or ".")
+        
+        logger.info(f"开始耐久测试 - 虚拟用户数: {concurrency}, 持续时间: {duration}秒, "
+                    f"快照间隔: {snapshot_interval}秒, 快照文件: {snapshot_file}")
+        
+        recorder = IntervalRecorder()
+        overall = LatencyHistogram()
+        overall_outcomes = RequestOutcomes()
+        stop = threading.Event()
+        series = {"minute": [], "p50": [], "p99": [], "error_rate": []}
+        
+        def virtual_user():
+            while not stop.is_set():
+                # 调用结束时才把响应时间和结果一起记入当时的间隔，跨越快照边界的调用不会记到已写出的间隔
+                try:
+                    self._observed_execution(recorder, self._timed_execution, func, *args, **kwargs)
+                except Exception:
+                    stop.wait(SOAK_ERROR_BACKOFF_S)
+        
+        threads = [
+            threading.Thread(target=virtual_user, daemon=True, name=f"soak-user-{index}")
+            for index in range(concurrency)
+        ]
+        
+        start_time = time.perf_counter()
+        end_time = start_time + duration
+        interval_start = start_time
+        for thread in threads:
+            thread.start()
+        
+        with open(snapshot_file, 'w', encoding='utf-8') as f:
+            try:
+                while interval_start < end_time:
+                    boundary = min(interval_start + snapshot_interval, end_time)
+                    remaining = boundary - time.perf_counter()
+                    if remaining > 0:
+                        time.sleep(remaining)
+                    
+                    histogram, outcomes = recorder.rotate()
+                    now = time.perf_counter()
+                    outcomes.elapsed_s = now - interval_start
+                    snapshot = self._soak_snapshot(len(series["minute"]), interval_start - start_time,
+                                                   histogram, outcomes)
+                    f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+                    f.flush()
+                    
+                    overall.merge(histogram)
+                    overall_outcomes.merge(outcomes)
+                    series["minute"].append(((interval_start + now) / 2 - start_time) / 60)
+                    series["p50"].append(snapshot["p50_ms"])
+                    series["p99"].append(snapshot["p99_ms"])
+                    series["error_rate"].append(snapshot["error_rate"])
+                    
+                    logger.info(f"耐久测试快照 {snapshot['interval']} - 请求数: {snapshot['requests']}, "
+                                f"P50: {snapshot['p50_ms']:.2f}ms, P99: {snapshot['p99_ms']:.2f}ms, "
+                                f"错误率: {snapshot['error_rate']:.2%}")
+                    interval_start = now
+            finally:
+                stop.set()
+                for thread in threads:
+                    thread.join()
+        
+        # 停止信号发出后才返回的在途请求只计入总体统计
+        histogram, outcomes = recorder.rotate()
+        overall.merge(histogram)
+        outcomes.elapsed_s = time.perf_counter() - start_time
+        overall_outcomes.merge(outcomes)
+        
+        result = self._calculate_statistics(overall, concurrency, len(series["minute"]))
+        result.update({
+            "mode": "soak",
+            "duration_s": overall_outcomes.elapsed_s,
+            "snapshot_interval_s": snapshot_interval,
+            "snapshot_count": len(series["minute"]),
+            "snapshot_file": snapshot_file,
+        })
+        result.update(overall_outcomes.summary())
+        result.update(self._soak_trend(series, max_p50_slope, max_p99_slope, max_error_rate_slope))
+        result["log_sampling"] = self._log_sampling_stats()
+        
+        self._print_results(result)
+        
+        return result
+    
+    def _soak_snapshot(
+        self,
+        index: int,
+        offset: float,
+        histogram: LatencyHistogram,
+        outcomes: RequestOutcomes
+    ) -> Dict[str, Any]:
+        """
+        生成耐久测试的间隔快照
+        
+        Args:
+            index: 间隔序号
+            offset: 间隔开始时间距测试开始的秒数
+            histogram: 该间隔的响应时间直方图
+            outcomes: 该间隔的调用结果统计（elapsed_s 为间隔时长）
+        
+        Returns:
+            快照字典
+        """
+        summary = outcomes.summary()
+        return {
+            "interval": index + 1,
+            "timestamp": TimeUtils.get_datetime_str(),
+            "offset_s": round(offset, 3),
+            "length_s": round(outcomes.elapsed_s, 3),
+            "requests": outcomes.requests,
+            "errors": outcomes.failed,
+            "error_rate": outcomes.error_rate,
+            "errors_by_type": summary["errors_by_type"],
+            "errors_by_status": summary["errors_by_status"],
+            "throughput_rps": summary["throughput_rps"],
+            "goodput_rps": summary["goodput_rps"],
+            "bytes_per_second": summary["bytes_per_second"],
+            "avg_ms": histogram.mean,
+            "p50_ms": histogram.percentile(50),
+            "p90_ms": histogram.percentile(90),
+            "p99_ms": histogram.percentile(99),
+            "max_ms": histogram.max_ms,
+        }
+    
+    def _soak_trend(
+        self,
+        series: Dict[str, List[float]],
+        max_p50_slope: Optional[float],
+        max_p99_slope: Optional[float],
+        max_error_rate_slope: Optional[float]
+    ) -> Dict[str, Any]:
+        """
+        对各间隔的 P50、P99 和错误率做线性拟合并判断是否劣化
+        
+        Args:
+            series: 各间隔的时间点（分钟）及指标序列
+            max_p50_slope: P50 允许的最大斜率（毫秒/分钟）
+            max_p99_slope: P99 允许的最大斜率（毫秒/分钟）
+            max_error_rate_slope: 错误率允许的最大斜率（每分钟）
+        
+        Returns:
+            斜率及劣化判定字段
+        """
+        checks = [
+            ("p50", "p50_slope_ms_per_min", max_p50_slope),
+            ("p99", "p99_slope_ms_per_min", max_p99_slope),
+            ("error_rate", "error_rate_slope_per_min", max_error_rate_slope),
+        ]
+        trend = {"degradations": []}
+        
+        if len(series["minute"]) < 3:
+            logger.warning(f"快照数量不足 3 个（{len(series['minute'])} 个），跳过趋势判定")
+            for _, key, _ in checks:
+                trend[key] = None
+            trend["trend_passed"] = True
+            return trend
+        
+        for name, key, limit in checks:
+            fit = linear_trend(series["minute"], series[name])
+            slope = fit[0] if fit else 0.0
+            trend[key] = slope
+            if limit is not None and slope > limit:
+                trend["degradations"].append(f"{name} 斜率 {slope:.4f}/分钟 超过阈值 {limit}/分钟")
+        
+        trend["trend_passed"] = not trend["degradations"]
+        return trend
+    
+    def _observed_execution(
+        self,
+        outcomes: Union[RequestOutcomes, IntervalRecorder],
+        timer: Callable,
+        *args,
+        **kwargs
+    ) -> float:
+        """
+        追踪一次计时执行期间的HTTP响应，并将调用结果计入统计；
+        执行期间记录的日志按调用采样（见 LoadRunLogFilter），失败和进入最慢样本的调用总是保留日志
+        
+        Args:
+            outcomes: 调用结果统计（或耐久测试的间隔记录器）
+            timer: 计时执行函数（如 _timed_execution），其返回值原样返回
+            *args: 计时执行函数的位置参数
+            **kwargs: 计时执行函数的关键字参数
+        
+        Returns:
+            执行时间（毫秒）
+        """
+        begin_sampled_call()
+        request_trace.begin()
+        try:
+            with json_codec.decoding(self.decode_responses):
+                duration_ms = timer(*args, **kwargs)
+        except Exception as e:
+            outcomes.record(request_trace.end(), e)
+            end_sampled_call(True)
+            raise
+        end_sampled_call(outcomes.record(request_trace.end(), duration_ms=duration_ms))
+        return duration_ms
+    
     def _timed_execution(self, func: Callable, *args, **kwargs) -> float:
         """
         执行函数并测量时间
@@ -92,35 +758,43 @@ class PerformanceTest:
         Returns:
             执行时间（毫秒）
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             func(*args, **kwargs)
         except Exception as e:
-            logger.error(f"函数执行出错: {str(e)}")
+            logger.error("函数执行出错: %s", e)
             raise
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         duration_ms = (end_time - start_time) * 1000
         return duration_ms
     
     def _calculate_statistics(
         self, 
-        durations: List[float], 
+        durations: Union[LatencyHistogram, List[float]], 
         concurrency: int, 
-        iterations: int
+        iterations: int,
+        samples: Optional[List[float]] = None
     ) -> Dict[str, Any]:
         """
         计算统计数据
         
         Args:
-            durations: 响应时间列表（毫秒）
+            durations: 响应时间直方图，或响应时间列表（毫秒）
             concurrency: 并发数
             iterations: 迭代次数
+            samples: 原始样本列表，传入时结果中包含 all_durations
         
         Returns:
             统计结果字典
         """
-        if not durations:
+        if isinstance(durations, LatencyHistogram):
+            histogram = durations
+        else:
+            histogram = LatencyHistogram.from_values(durations)
+            samples = durations
+        
+        if histogram.total_count == 0:
             return {
                 "error": "没有可用的测试数据"
             }
@@ -128,48 +802,68 @@ class PerformanceTest:
         result = {
             "concurrency": concurrency,
             "iterations": iterations,
-            "total_requests": len(durations),
-            "min_time_ms": min(durations),
-            "max_time_ms": max(durations),
-            "avg_time_ms": statistics.mean(durations),
-            "median_time_ms": statistics.median(durations),
-            "std_dev_ms": statistics.stdev(durations) if len(durations) > 1 else 0,
-            "all_durations": durations
+            "total_requests": histogram.total_count,
+            "min_time_ms": histogram.min_ms,
+            "max_time_ms": histogram.max_ms,
+            "avg_time_ms": histogram.mean,
+            "median_time_ms": histogram.percentile(50),
+            "std_dev_ms": histogram.stdev
         }
         
+        if samples is not None:
+            result["all_durations"] = samples
+        
         # 计算百分位数
-        sorted_durations = sorted(durations)
-        result["p50_ms"] = self._percentile(sorted_durations, 50)
-        result["p90_ms"] = self._percentile(sorted_durations, 90)
-        result["p95_ms"] = self._percentile(sorted_durations, 95)
-        result["p99_ms"] = self._percentile(sorted_durations, 99)
+        result["p50_ms"] = result["median_time_ms"]
+        result["p90_ms"] = histogram.percentile(90)
+        result["p95_ms"] = histogram.percentile(95)
+        result["p99_ms"] = histogram.percentile(99)
         
         return result
     
-    def _percentile(self, data: List[float], percentile: int) -> float:
+    def _calculate_corrected_statistics(
+        self,
+        histogram: LatencyHistogram,
+        expected_interval_ms: float
+    ) -> Dict[str, Any]:
         """
-        计算百分位数
+        计算协调遗漏（coordinated omission）校正后的统计数据
+        
+        闭环测试中一次服务端停顿只会产生一个慢样本，而按期望间隔本应发出的请求都排在它后面。
+        与 HdrHistogram 的 recordValueWithExpectedInterval 一致，对超过期望间隔的样本
+        依次补录 value - interval、value - 2 * interval ... 直到不大于期望间隔。
         
         Args:
-            data: 已排序的数据列表
-            percentile: 百分位（0-100）
+            histogram: 原始响应时间直方图
+            expected_interval_ms: 期望请求间隔（毫秒）
         
         Returns:
-            百分位数值
+            以 corrected_ 为前缀的统计结果字典
         """
-        if not data:
-            return 0
+        if histogram.total_count == 0:
+            return {}
         
-        k = (len(data) - 1) * percentile / 100
-        f = int(k)
-        c = f + 1 if f < len(data) - 1 else f
+        corrected = histogram.corrected_copy(expected_interval_ms)
         
-        if f == c:
-            return data[f]
+        return {
+            "expected_interval_ms": expected_interval_ms,
+            "corrected_total_requests": corrected.total_count,
+            "corrected_max_time_ms": corrected.max_ms,
+            "corrected_avg_time_ms": corrected.mean,
+            "corrected_p50_ms": corrected.percentile(50),
+            "corrected_p90_ms": corrected.percentile(90),
+            "corrected_p95_ms": corrected.percentile(95),
+            "corrected_p99_ms": corrected.percentile(99),
+        }
+    
+    def _log_sampling_stats(self) -> Optional[Dict[str, int]]:
+        """
+        汇总并清零本次运行的日志采样统计，每次运行结束时调用一次
         
-        d0 = data[f] * (c - k)
-        d1 = data[c] * (k - f)
-        return d0 + d1
+        Returns:
+            包含 dropped_calls 和 suppressed 的字典，未启用 LOG_SAMPLING 时为 None
+        """
+        return report_suppressed_logs()
     
     def _print_results(self, result: Dict[str, Any]):
         """
@@ -193,6 +887,127 @@ class PerformanceTest:
         logger.info(f"P90: {result.get('p90_ms', 0):.2f} ms")
         logger.info(f"P95: {result.get('p95_ms', 0):.2f} ms")
         logger.info(f"P99: {result.get('p99_ms', 0):.2f} ms")
+        
+        if "throughput_rps" in result:
+            logger.info("-" * 80)
+            logger.info(f"总耗时: {result['wall_time_s']:.4f} 秒")
+            logger.info(f"吞吐量: {result['throughput_rps']:.2f} 请求/秒, "
+                        f"有效吞吐量: {result['goodput_rps']:.2f} 请求/秒")
+            logger.info(f"失败请求数: {result['failed_requests']}, 错误率: {result['error_rate']:.2%}")
+            for name, count in result["errors_by_type"].items():
+                logger.info(f"  - 异常 {name}: {count}")
+            for status, count in sorted(result["errors_by_status"].items()):
+                logger.info(f"  - HTTP {status}: {count}")
+            logger.info(f"接收速率: {result['bytes_per_second'] / 1024:.2f} KB/秒 "
+                        f"（共 {result['bytes_received']} 字节）")
+            transfer = result.get("transfer")
+            if transfer:
+                encodings = ", ".join(f"{name}: {count}" for name, count in transfer["content_encodings"].items())
+                logger.info(f"线上传输: 发送 {transfer['bytes_sent']} 字节, "
+                            f"接收 {transfer['wire_bytes_received']} 字节（响应头 {transfer['wire_header_bytes']}, "
+                            f"响应体 {transfer['wire_body_bytes']}）, "
+                            f"{transfer['wire_bytes_per_second'] / 1024:.2f} KB/秒")
+                logger.info(f"响应体压缩比: {transfer['compression_ratio']:.2f} "
+                            f"（解压后 {transfer['decoded_body_bytes']} 字节）, Content-Encoding: {encodings}")
+            if "new_connections" in result:
+                logger.info(f"新建连接: {result['new_connections']}, "
+                            f"复用连接: {result['reused_connections']}")
+            if "tls" in result:
+                tls = result["tls"]
+                logger.info(f"TLS 握手: {tls['handshakes']}（完整 {tls['full_handshakes']}, "
+                            f"恢复会话 {tls['resumed_handshakes']}）, 会话恢复率: {tls['resumption_ratio']:.2%}")
+        
+        if result.get("phases"):
+            logger.info("-" * 80)
+            logger.info("请求阶段耗时:")
+            logger.info(f"{'阶段':<12} {'平均(ms)':<12} {'P50(ms)':<12} {'P90(ms)':<12} "
+                        f"{'P99(ms)':<12} {'最大(ms)':<12}")
+            for name, stats in result["phases"].items():
+                logger.info(
+                    f"{request_trace.PHASES.get(name, name):<12} "
+                    f"{stats['avg_ms']:<12.3f} "
+                    f"{stats['p50_ms']:<12.3f} "
+                    f"{stats['p90_ms']:<12.3f} "
+                    f"{stats['p99_ms']:<12.3f} "
+                    f"{stats['max_ms']:<12.3f}"
+                )
+        
+        if "http_cache" in result:
+            cache = result["http_cache"]
+            logger.info("-" * 80)
+            logger.info(f"条件请求: {cache['conditional_requests']}/{cache['requests']}, "
+                        f"304: {cache['not_modified']} (命中率 {cache['hit_ratio']:.2%}), "
+                        f"内容已变化: {cache['modified']}")
+            logger.info(f"304 节省流量: {cache['bytes_saved']} 字节, 节省时间: {cache['time_saved_ms']:.2f}ms, "
+                        f"淘汰 LRU/TTL: {cache['lru_evictions']}/{cache['ttl_evictions']}")
+        
+        if "ports" in result:
+            ports = result["ports"]
+            logger.info("-" * 80)
+            logger.info(f"临时端口占用 基线/峰值: {ports['baseline_in_use']} / {ports['peak_in_use']} "
+                        f"（范围 {ports['ephemeral_range'][0]}-{ports['ephemeral_range'][1]}, "
+                        f"峰值占比 {ports['peak_usage_ratio']:.2%}）")
+            logger.info(f"TIME_WAIT 基线/峰值: {ports['baseline_time_wait']} / {ports['peak_time_wait']}")
+            if ports["exhaustion_warning"]:
+                logger.warning("测试期间临时端口占用超过警戒线，客户端本身可能成为瓶颈")
+        
+        if "tcp_info" in result:
+            tcp = result["tcp_info"]
+            logger.info("-" * 80)
+            logger.info(f"TCP_INFO 采样: {tcp['samples']}, 有重传的请求: {tcp['retransmit_samples']}, "
+                        f"RTT 平均/最大: {tcp['avg_rtt_ms']:.3f} / {tcp['max_rtt_ms']:.3f} ms")
+        
+        if result.get("slowest_samples"):
+            logger.info("-" * 80)
+            logger.info("最慢样本:")
+            for sample in result["slowest_samples"]:
+                for request in sample["requests"]:
+                    details = [f"HTTP {request['status']}"]
+                    if "request_id" in request:
+                        details.append(f"请求ID {request['request_id']}")
+                    tcp = request.get("tcp_info")
+                    if tcp:
+                        details.append(f"RTT {tcp['rtt_ms']:.3f}±{tcp['rttvar_ms']:.3f} ms, "
+                                       f"新增重传 {tcp['retrans_delta']}, 拥塞窗口 {tcp['snd_cwnd']}")
+                    logger.info(f"  {sample['duration_ms']:.2f} ms - {', '.join(details)}")
+        
+        if "send_spread_max_ms" in result:
+            logger.info(f"发送时间差 平均/最大: {result['send_spread_avg_ms']:.3f} / "
+                        f"{result['send_spread_max_ms']:.3f} ms")
+        
+        if "expected_interval_ms" in result:
+            logger.info("-" * 80)
+            logger.info(f"协调遗漏校正（期望间隔 {result['expected_interval_ms']:.2f} ms）:")
+            logger.info(f"{'指标':<10} {'原始(ms)':<12} {'校正后(ms)':<12}")
+            for label, key in [("平均", "avg_time_ms"), ("最大", "max_time_ms"), ("P50", "p50_ms"),
+                               ("P90", "p90_ms"), ("P95", "p95_ms"), ("P99", "p99_ms")]:
+                logger.info(
+                    f"{label:<10} "
+                    f"{result.get(key, 0):<12.2f} "
+                    f"{result.get('corrected_' + key, 0):<12.2f}"
+                )
+            logger.info(f"校正后样本数: {result['corrected_total_requests']}")
+        
+        if result.get("mode") == "open_loop":
+            logger.info("-" * 80)
+            logger.info(f"目标速率: {result['target_rate']:.2f} 请求/秒")
+            logger.info(f"实际速率: {result['achieved_rate']:.2f} 请求/秒")
+            logger.info(f"已发送: {result['sent_requests']}")
+            logger.info(f"发送延迟 平均/P99/最大: {result['send_lag_avg_ms']:.2f} / "
+                        f"{result['send_lag_p99_ms']:.2f} / {result['send_lag_max_ms']:.2f} ms")
+        
+        if result.get("mode") == "soak":
+            logger.info("-" * 80)
+            logger.info(f"持续时间: {result['duration_s']:.1f} 秒, 快照数: {result['snapshot_count']}")
+            logger.info(f"快照文件: {result['snapshot_file']}")
+            if result["p50_slope_ms_per_min"] is not None:
+                logger.info(f"趋势斜率 P50/P99: {result['p50_slope_ms_per_min']:.4f} / "
+                            f"{result['p99_slope_ms_per_min']:.4f} ms/分钟, "
+                            f"错误率: {result['error_rate_slope_per_min']:.6f}/分钟")
+            logger.info(f"趋势判定: {'✓ 通过' if result['trend_passed'] else '✗ 性能随时间劣化'}")
+            for degradation in result["degradations"]:
+                logger.info(f"  - {degradation}")
+        
         logger.info("=" * 80)
     
     def batch_concurrent_test(
@@ -201,6 +1016,7 @@ class PerformanceTest:
         concurrency_levels: List[int],
         iterations: int = 10,
         *args,
+        expected_interval_ms: Optional[float] = None,
         **kwargs
     ) -> Dict[int, Dict[str, Any]]:
         """
@@ -211,6 +1027,7 @@ class PerformanceTest:
             concurrency_levels: 并发级别列表
             iterations: 每个级别的迭代次数
             *args: 函数位置参数
+            expected_interval_ms: 期望请求间隔（毫秒），指定后各级别均计算协调遗漏校正
             **kwargs: 函数关键字参数
         
         Returns:
@@ -225,6 +1042,7 @@ class PerformanceTest:
                 concurrency=concurrency, 
                 iterations=iterations,
                 *args, 
+                expected_interval_ms=expected_interval_ms,
                 **kwargs
             )
             results[concurrency] = result
@@ -237,27 +1055,438 @@ class PerformanceTest:
         
         return results
     
-    def _print_comparison(self, results: Dict[int, Dict[str, Any]]):
+    def keep_alive_comparison(
+        self,
+        func: Callable,
+        concurrency: int = 1,
+        iterations: int = 10,
+        *args,
+        **kwargs
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        打印不同并发级别的对比结果
+        长连接与每请求新建连接（连接抖动）的对比测试
+        
+        在同一负载下先后用长连接和关闭长连接（每个请求都新建连接，模拟不复用连接的代理）的客户端副本
+        各执行一次并发测试，两次测试都监控本机 TIME_WAIT 套接字数和临时端口占用。
         
         Args:
-            results: 测试结果字典
+            func: 要测试的函数，必须是 HttpClient 或持有 client 属性的对象（如 BaseTest）的绑定方法
+            concurrency: 并发数
+            iterations: 迭代次数
+            *args: 函数位置参数
+            **kwargs: 函数关键字参数（也可以是 concurrent_test 的关键字参数）
+        
+        Returns:
+            {"keep-alive": 长连接结果, "churn": 每请求新建连接结果}
+        """
+        variants = [
+            ("keep-alive", "长连接", {"keep_alive": True}),
+            ("churn", "每请求新建连接", {"keep_alive": False}),
+        ]
+        results = self._compare_client_variants(
+            func, variants, concurrency, iterations, args, dict(kwargs, monitor_ports=True)
+        )
+        for mode, result in results.items():
+            ports = result.get("ports", {})
+            logger.info(
+                f"{mode:<12} 新建连接: {result.get('new_connections', 'N/A')}, "
+                f"峰值 TIME_WAIT: {ports.get('peak_time_wait', 'N/A')}, "
+                f"峰值临时端口占用: {ports.get('peak_in_use', 'N/A')}/{ports.get('range_size', 'N/A')}"
+            )
+        
+        return results
+    
+    def compression_comparison(
+        self,
+        func: Callable,
+        concurrency: int = 1,
+        iterations: int = 10,
+        *args,
+        **kwargs
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        响应压缩开启与关闭的对比测试
+        
+        在同一负载下先后用请求压缩（Accept-Encoding: gzip, deflate）和不请求压缩（identity）的客户端副本
+        各执行一次并发测试，对比线上传输的字节数、压缩比、首字节时间（含服务器压缩耗时）、
+        读取响应体耗时和本进程每请求消耗的 CPU 时间（含客户端解压；替身服务器在本进程内运行时也包含其压缩耗时）。
+        
+        Args:
+            func: 要测试的函数，必须是 HttpClient 或持有 client 属性的对象（如 BaseTest）的绑定方法
+            concurrency: 并发数
+            iterations: 迭代次数
+            *args: 函数位置参数
+            **kwargs: 函数关键字参数（也可以是 concurrent_test 的关键字参数）
+        
+        Returns:
+            {"compressed": 请求压缩的结果, "uncompressed": 不请求压缩的结果}
+        """
+        variants = [
+            ("compressed", "请求压缩响应", {"compression": True}),
+            ("uncompressed", "不请求压缩响应", {"compression": False}),
+        ]
+        results = self._compare_client_variants(func, variants, concurrency, iterations, args, kwargs)
+        for mode, result in results.items():
+            transfer = result.get("transfer", {})
+            requests_count = transfer.get("requests") or 1
+            phases = result.get("phases", {})
+            logger.info(
+                f"{mode:<12} 每请求线上接收: {transfer.get('wire_bytes_received', 0) / requests_count:.0f} 字节, "
+                f"压缩比: {transfer.get('compression_ratio', 1.0):.2f}, "
+                f"首字节 P50: {phases.get('ttfb', {}).get('p50_ms', 0):.3f} ms, "
+                f"读取响应体 P50: {phases.get('body', {}).get('p50_ms', 0):.3f} ms, "
+                f"每请求 CPU: {result['client_cpu_ms_per_request']:.3f} ms"
+            )
+        
+        return results
+    
+    def tls_handshake_comparison(
+        self,
+        func: Callable,
+        concurrency: int = 1,
+        iterations: int = 10,
+        *args,
+        **kwargs
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        TLS 握手成本对比测试（目标必须是 HTTPS）
+        
+        在同一负载下先后用三种客户端副本各执行一次并发测试：长连接（几乎不握手）、
+        每请求新建连接并恢复 TLS 会话（简化握手）、每请求新建连接且不恢复会话（强制每个请求完整握手），
+        对比吞吐量、响应时间和 TLS 握手阶段耗时。
+        
+        Args:
+            func: 要测试的函数，必须是 HttpClient 或持有 client 属性的对象（如 BaseTest）的绑定方法
+            concurrency: 并发数
+            iterations: 迭代次数
+            *args: 函数位置参数
+            **kwargs: 函数关键字参数（也可以是 concurrent_test 的关键字参数）
+        
+        Returns:
+            {"keep-alive": 长连接结果, "resumed": 恢复会话结果, "full": 完整握手结果}
+        """
+        variants = [
+            ("keep-alive", "长连接", {"keep_alive": True, "tls_resumption": True}),
+            ("resumed", "每请求新建连接（恢复 TLS 会话）", {"keep_alive": False, "tls_resumption": True}),
+            ("full", "每请求新建连接（完整 TLS 握手）", {"keep_alive": False, "tls_resumption": False}),
+        ]
+        results = self._compare_client_variants(func, variants, concurrency, iterations, args, kwargs)
+        for mode, result in results.items():
+            tls = result.get("tls", {})
+            phase = result.get("phases", {}).get("tls", {})
+            logger.info(
+                f"{mode:<12} TLS 握手: {tls.get('handshakes', 0)}（恢复会话 {tls.get('resumed_handshakes', 0)}）, "
+                f"握手耗时 P50: {phase.get('p50_ms', 0):.3f} ms, P99: {phase.get('p99_ms', 0):.3f} ms, "
+                f"每请求 CPU: {result['client_cpu_ms_per_request']:.3f} ms"
+            )
+        
+        return results
+    
+    def _compare_client_variants(
+        self,
+        func: Callable,
+        variants: List[Tuple[str, str, Dict[str, Any]]],
+        concurrency: int,
+        iterations: int,
+        args: tuple,
+        kwargs: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        用被测函数所用客户端的不同配置副本依次执行同一并发测试
+        
+        Args:
+            func: 要测试的函数，必须是 HttpClient 或持有 client 属性的对象的绑定方法
+            variants: (结果名称, 说明, HttpClient.clone 参数) 列表
+            concurrency: 并发数
+            iterations: 迭代次数
+            args: 函数位置参数
+            kwargs: 函数关键字参数（也可以是 concurrent_test 的关键字参数）
+        
+        Returns:
+            结果名称 -> 测试结果，每个结果另含 client_cpu_ms_per_request（本进程每请求消耗的 CPU 时间）
+        """
+        client = find_http_client(func)
+        if client is None:
+            raise TypeError(f"客户端配置对比测试需要 HttpClient 或持有 client 的对象的绑定方法: {func!r}")
+        
+        results = {}
+        for mode, description, options in variants:
+            logger.info(f"\n开始{description}测试")
+            variant = client.clone(**options)
+            cpu_start = time.process_time()
+            try:
+                result = self.concurrent_test(
+                    rebind_http_client(func, variant), concurrency, iterations, *args, **kwargs
+                )
+            finally:
+                variant.close()
+            cpu_ms = (time.process_time() - cpu_start) * 1000
+            result["client_cpu_ms_per_request"] = cpu_ms / max(result.get("total_requests", 0), 1)
+            results[mode] = result
+        
+        self._print_comparison(results)
+        return results
+    
+    def scalability_analysis(
+        self,
+        results: Dict[int, Dict[str, Any]],
+        predict_at: Optional[List[int]] = None,
+        latency_key: str = "p95_ms"
+    ) -> Dict[str, Any]:
+        """
+        可扩展性分析：对 batch_concurrent_test 的结果拟合 Amdahl 定律和 USL，
+        给出争用系数 σ、一致性系数 κ、吞吐量峰值所在并发数、响应时间拐点以及未测试级别的吞吐量预测
+        
+        Args:
+            results: batch_concurrent_test 返回的结果
+            predict_at: 需要预测吞吐量的并发数列表
+            latency_key: 用于拐点检测的响应时间指标
+        
+        Returns:
+            分析结果字典
+        """
+        analysis = analyze_scalability(results, predict_at or [], latency_key)
+        self._print_scalability(analysis)
+        return analysis
+    
+    def _print_scalability(self, analysis: Dict[str, Any]):
+        """
+        打印可扩展性分析结果
+        
+        Args:
+            analysis: 分析结果字典
+        """
+        logger.info("\n" + "=" * 80)
+        logger.info("可扩展性分析:")
+        logger.info("=" * 80)
+        
+        for label, key in [("Amdahl", "amdahl"), ("USL", "usl")]:
+            model = analysis[key]
+            if model is None:
+                logger.info(f"{label}: 测量点不足，无法拟合")
+                continue
+            line = (f"{label}: λ={model['lambda_rps']:.2f}/秒, σ={model['sigma']:.5f}, "
+                    f"κ={model['kappa']:.6f}, R²={model['r_squared']:.4f}")
+            if model["peak_concurrency"]:
+                line += (f", 峰值并发≈{model['peak_concurrency']:.1f} "
+                         f"(吞吐量≈{model['peak_throughput_rps']:.2f}/秒)")
+            logger.info(line)
+        
+        knee = analysis["knee_concurrency"]
+        logger.info(f"响应时间拐点（{analysis['latency_key']}）: {knee if knee is not None else '未检测到'}")
+        
+        if analysis["predictions"]:
+            logger.info("-" * 80)
+            logger.info(f"{'并发数':<10} {'Amdahl预测(/s)':<16} {'USL预测(/s)':<16}")
+            for level, prediction in sorted(analysis["predictions"].items()):
+                amdahl = prediction["amdahl_rps"]
+                usl = prediction["usl_rps"]
+                logger.info(
+                    f"{level:<10} "
+                    f"{(f'{amdahl:.2f}' if amdahl is not None else 'N/A'):<16} "
+                    f"{(f'{usl:.2f}' if usl is not None else 'N/A'):<16}"
+                )
+        
+        logger.info("=" * 80)
+    
+    def capacity_search(
+        self,
+        func: Callable,
+        *args,
+        mode: str = "concurrency",
+        start: float = 1,
+        limit: float = CAPACITY_SEARCH_LIMIT,
+        resolution: float = 1,
+        max_p95_time_ms: float = MAX_WAIT_TIME_MS,
+        max_error_rate: float = CAPACITY_MAX_ERROR_RATE,
+        iterations: int = 10,
+        duration: float = 10,
+        confirm_trials: int = CAPACITY_CONFIRM_TRIALS,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        容量搜索：寻找满足 SLO（P95 响应时间和错误率）的最高并发数或到达率
+        
+        详见 CapacitySearch。
+        
+        Args:
+            func: 要测试的函数
+            *args: 函数位置参数
+            mode: 搜索维度，"concurrency"（并发数）或 "rate"（到达率）
+            start: 起始级别
+            limit: 级别上限
+            resolution: 二分查找的精度
+            max_p95_time_ms: P95 响应时间上限（毫秒）
+            max_error_rate: 错误率上限（0-1，错误率须严格小于该值）
+            iterations: 并发模式下每个级别的迭代次数
+            duration: 到达率模式下每个级别的持续时间（秒）
+            confirm_trials: 边界级别的重复测试次数
+            **kwargs: 函数关键字参数
+        
+        Returns:
+            搜索结果字典，包含容量（capacity）和测量曲线（curve）
+        """
+        search = CapacitySearch(
+            self,
+            mode=mode,
+            max_p95_time_ms=max_p95_time_ms,
+            max_error_rate=max_error_rate,
+            iterations=iterations,
+            duration=duration,
+            confirm_trials=confirm_trials
+        )
+        return search.search(func, *args, start=start, limit=limit, resolution=resolution, **kwargs)
+    
+    def profile_test(
+        self,
+        func: Callable,
+        profile: LoadProfile,
+        *args,
+        **kwargs
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        按负载曲线执行测试（爬坡、阶梯、尖峰、平台）
+        
+        虚拟用户在整条曲线执行期间常驻，阶段之间不重建、不停顿；
+        每个样本按请求开始时所处的阶段分别统计。
+        
+        Args:
+            func: 要测试的函数
+            profile: 负载曲线
+            *args: 函数位置参数
+            **kwargs: 函数关键字参数
+        
+        Returns:
+            按阶段名称索引的测试结果（顺序与曲线中的阶段一致）
+        """
+        if not profile.stages:
+            raise ValueError("负载曲线中没有任何阶段")
+        
+        logger.info(f"开始负载曲线测试 - 阶段数: {len(profile.stages)}, "
+                    f"总时长: {profile.total_duration:.1f}秒, 最大虚拟用户数: {profile.max_users}")
+        
+        histograms, outcomes = self._run_profile(func, profile, args, kwargs)
+        results = self._build_profile_results(profile, histograms, outcomes)
+        # 日志采样统计按整次运行汇总，各阶段结果中是同一份
+        log_sampling = self._log_sampling_stats()
+        for result in results.values():
+            result["log_sampling"] = log_sampling
+        
+        # 打印各阶段对比结果
+        self._print_comparison(results)
+        
+        return results
+    
+    def _run_profile(
+        self,
+        func: Callable,
+        profile: LoadProfile,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        slot: int = 0,
+        stride: int = 1
+    ) -> Tuple[Dict[str, LatencyHistogram], Dict[str, RequestOutcomes]]:
+        """
+        使用常驻虚拟用户线程池执行负载曲线
+        
+        Args:
+            func: 要测试的函数
+            profile: 负载曲线
+            args: 函数位置参数
+            kwargs: 函数关键字参数
+            slot: 本次负责的虚拟用户编号余数（多进程分片时使用）
+            stride: 虚拟用户编号的步长
+        
+        Returns:
+            (各阶段响应时间直方图, 各阶段调用结果统计)
+        """
+        pool = VirtualUserPool(
+            profile,
+            lambda outcomes: self._observed_execution(outcomes, self._timed_execution, func, *args, **kwargs),
+            slot=slot,
+            stride=stride
+        )
+        return pool.run()
+    
+    def _build_profile_results(
+        self,
+        profile: LoadProfile,
+        histograms: Dict[str, LatencyHistogram],
+        outcomes: Dict[str, RequestOutcomes]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        汇总负载曲线各阶段的测试结果
+        
+        Args:
+            profile: 负载曲线
+            histograms: 各阶段响应时间直方图
+            outcomes: 各阶段调用结果统计（elapsed_s 为阶段时长）
+        
+        Returns:
+            按阶段名称索引的测试结果
+        """
+        results = {}
+        for stage in profile.stages:
+            histogram = histograms[stage.name]
+            result = self._calculate_statistics(histogram, stage.max_users, 1)
+            result.update({
+                "stage": stage.name,
+                "stage_kind": stage.kind,
+                "duration_s": stage.duration,
+                "start_users": stage.start_users,
+                "end_users": stage.end_users,
+            })
+            result.update(outcomes[stage.name].summary())
+            results[stage.name] = result
+        return results
+    
+    def _print_comparison(self, results: Dict[Union[int, str], Dict[str, Any]]):
+        """
+        打印不同并发级别（或负载曲线各阶段）的对比结果
+        
+        Args:
+            results: 测试结果字典，键为并发数或阶段名称
         """
         logger.info("\n" + "=" * 80)
         logger.info("并发测试对比结果:")
         logger.info("=" * 80)
-        logger.info(f"{'并发数':<10} {'平均(ms)':<12} {'最大(ms)':<12} {'P95(ms)':<12} {'P99(ms)':<12}")
+        corrected = any("expected_interval_ms" in result for result in results.values())
+        throughput = any("throughput_rps" in result for result in results.values())
+        error_rate = any("error_rate" in result for result in results.values())
+        by_stage = any(isinstance(key, str) for key in results)
+        
+        # 并发级别按数值排序，负载曲线阶段保持执行顺序
+        items = list(results.items()) if by_stage else sorted(results.items())
+        key_width = max([10] + [len(str(key)) + 2 for key in results])
+        
+        header = f"{'阶段' if by_stage else '并发数':<{key_width}} {'平均(ms)':<12} {'最大(ms)':<12} {'P95(ms)':<12} {'P99(ms)':<12}"
+        if throughput:
+            header += f" {'吞吐量(/s)':<12}"
+        if error_rate:
+            header += f" {'错误率':<10}"
+        if corrected:
+            header += f" {'校正P95(ms)':<12} {'校正P99(ms)':<12}"
+        logger.info(header)
         logger.info("-" * 80)
         
-        for concurrency, result in sorted(results.items()):
-            logger.info(
-                f"{concurrency:<10} "
+        for key, result in items:
+            line = (
+                f"{key:<{key_width}} "
                 f"{result.get('avg_time_ms', 0):<12.2f} "
                 f"{result.get('max_time_ms', 0):<12.2f} "
                 f"{result.get('p95_ms', 0):<12.2f} "
                 f"{result.get('p99_ms', 0):<12.2f}"
             )
+            if throughput:
+                line += f" {result.get('throughput_rps', 0):<12.2f}"
+            if error_rate:
+                line += f" {result.get('error_rate', 0):<10.2%}"
+            if corrected:
+                line += (
+                    f" {result.get('corrected_p95_ms', 0):<12.2f}"
+                    f" {result.get('corrected_p99_ms', 0):<12.2f}"
+                )
+            logger.info(line)
         
         logger.info("=" * 80)
     
@@ -266,7 +1495,10 @@ class PerformanceTest:
         result: Dict[str, Any],
         max_avg_time_ms: float = 5000,
         max_p95_time_ms: float = 5000,
-        max_p99_time_ms: float = 5000
+        max_p99_time_ms: float = 5000,
+        use_corrected: bool = False,
+        min_throughput_rps: Optional[float] = None,
+        max_error_rate: Optional[float] = None
     ) -> bool:
         """
         验证性能是否满足要求
@@ -276,27 +1508,48 @@ class PerformanceTest:
             max_avg_time_ms: 平均响应时间要求（毫秒）
             max_p95_time_ms: P95响应时间要求（毫秒）
             max_p99_time_ms: P99响应时间要求（毫秒）
+            use_corrected: 是否使用协调遗漏校正后的统计数据进行验证
+            min_throughput_rps: 最低吞吐量要求（请求/秒），为 None 时不检查
+            max_error_rate: 最高错误率要求（0-1），为 None 时不检查
         
         Returns:
             是否满足要求
         """
-        avg_time = result.get('avg_time_ms', float('inf'))
-        p95_time = result.get('p95_ms', float('inf'))
-        p99_time = result.get('p99_ms', float('inf'))
+        prefix = "corrected_" if use_corrected else ""
+        if use_corrected and "expected_interval_ms" not in result:
+            logger.warning("测试结果中没有协调遗漏校正数据，请在测试时指定 expected_interval_ms")
+        
+        avg_time = result.get(f'{prefix}avg_time_ms', float('inf'))
+        p95_time = result.get(f'{prefix}p95_ms', float('inf'))
+        p99_time = result.get(f'{prefix}p99_ms', float('inf'))
+        
+        throughput = result.get('throughput_rps', 0)
+        error_rate = result.get('error_rate', 1)
+        throughput_ok = min_throughput_rps is None or throughput >= min_throughput_rps
+        error_rate_ok = max_error_rate is None or error_rate <= max_error_rate
         
         passed = (
             avg_time <= max_avg_time_ms and
             p95_time <= max_p95_time_ms and
-            p99_time <= max_p99_time_ms
+            p99_time <= max_p99_time_ms and
+            throughput_ok and
+            error_rate_ok
         )
         
-        logger.info(f"\n性能要求验证: {'✓ 通过' if passed else '✗ 失败'}")
+        logger.info(f"\n性能要求验证{'（协调遗漏校正后）' if use_corrected else ''}: "
+                    f"{'✓ 通过' if passed else '✗ 失败'}")
         logger.info(f"平均响应时间: {avg_time:.2f}ms <= {max_avg_time_ms}ms ? "
                    f"{'✓' if avg_time <= max_avg_time_ms else '✗'}")
         logger.info(f"P95响应时间: {p95_time:.2f}ms <= {max_p95_time_ms}ms ? "
                    f"{'✓' if p95_time <= max_p95_time_ms else '✗'}")
         logger.info(f"P99响应时间: {p99_time:.2f}ms <= {max_p99_time_ms}ms ? "
                    f"{'✓' if p99_time <= max_p99_time_ms else '✗'}")
+        if min_throughput_rps is not None:
+            logger.info(f"吞吐量: {throughput:.2f}/秒 >= {min_throughput_rps}/秒 ? "
+                       f"{'✓' if throughput_ok else '✗'}")
+        if max_error_rate is not None:
+            logger.info(f"错误率: {error_rate:.2%} <= {max_error_rate:.2%} ? "
+                       f"{'✓' if error_rate_ok else '✗'}")
         
         return passed
 
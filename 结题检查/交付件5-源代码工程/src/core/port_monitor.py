@@ -0,0 +1,172 @@
+"""
+临时端口监控
+测试期间定期读取 /proc/net/tcp 和 /proc/net/tcp6，统计本机处于 TIME_WAIT 的套接字数和临时端口占用，
+用于判断压测客户端自身是否即将耗尽临时端口（仅 Linux，其他平台不采样）
+"""
+
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+from config import PORT_MONITOR_INTERVAL_S, PORT_EXHAUSTION_WARN_RATIO
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+PROC_NET_TCP_FILES = ("/proc/net/tcp", "/proc/net/tcp6")
+PORT_RANGE_FILE = "/proc/sys/net/ipv4/ip_local_port_range"
+
+# /proc/net/tcp 中的连接状态编码（include/net/tcp_states.h）
+TCP_STATE_TIME_WAIT = 0x06
+TCP_STATE_LISTEN = 0x0A
+
+
+def read_port_range(path: str = PORT_RANGE_FILE) -> Optional[Tuple[int, int]]:
+    """
+    读取系统的临时端口范围
+
+    Args:
+        path: ip_local_port_range 文件路径
+
+    Returns:
+        (最小端口, 最大端口)，读取失败时返回 None
+    """
+    try:
+        with open(path) as f:
+            low, high = f.read().split()[:2]
+        return int(low), int(high)
+    except (OSError, ValueError):
+        return None
+
+
+def count_sockets(lines: Iterable[str], port_range: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    统计 /proc/net/tcp 格式的套接字列表
+
+    Args:
+        lines: 文件内容的各行（首行为表头）
+        port_range: 临时端口范围
+
+    Returns:
+        (本地端口在临时端口范围内的非监听套接字数, 其中处于 TIME_WAIT 的套接字数)
+    """
+    low, high = port_range
+    in_use, time_wait = 0, 0
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 4 or not fields[0].endswith(":"):
+            continue
+        state = int(fields[3], 16)
+        if state == TCP_STATE_LISTEN:
+            continue
+        local_port = int(fields[1].rsplit(":", 1)[1], 16)
+        if low <= local_port <= high:
+            in_use += 1
+            if state == TCP_STATE_TIME_WAIT:
+                time_wait += 1
+    return in_use, time_wait
+
+
+class EphemeralPortMonitor:
+    """临时端口占用监控
+
+    作为上下文管理器使用：进入时采样一次基线并启动后台采样线程，退出时再采样一次。
+    占用比例（占用数 / 临时端口范围大小）首次超过 PORT_EXHAUSTION_WARN_RATIO 时输出警告。
+    """
+
+    def __init__(self, interval_s: float = PORT_MONITOR_INTERVAL_S, enabled: bool = True):
+        """
+        初始化监控
+
+        Args:
+            interval_s: 采样间隔（秒）
+            enabled: 是否启用，未启用或平台不支持时不采样，summary() 返回空字典
+        """
+        self.interval_s = interval_s
+        self.port_range = read_port_range() if enabled else None
+        self.enabled = self.port_range is not None and os.path.exists(PROC_NET_TCP_FILES[0])
+        if enabled and not self.enabled:
+            logger.warning("当前平台无法读取 /proc/net/tcp，不监控临时端口占用")
+
+        self.samples = 0
+        self.baseline_in_use = 0
+        self.baseline_time_wait = 0
+        self.peak_in_use = 0
+        self.peak_time_wait = 0
+        self.warned = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def range_size(self) -> int:
+        """临时端口范围大小"""
+        return self.port_range[1] - self.port_range[0] + 1 if self.port_range else 0
+
+    def sample(self) -> Tuple[int, int]:
+        """
+        采样一次并更新峰值
+
+        Returns:
+            (临时端口占用数, TIME_WAIT 套接字数)
+        """
+        in_use, time_wait = 0, 0
+        for path in PROC_NET_TCP_FILES:
+            try:
+                with open(path) as f:
+                    counts = count_sockets(f, self.port_range)
+            except OSError:
+                continue
+            in_use += counts[0]
+            time_wait += counts[1]
+
+        self.samples += 1
+        self.peak_in_use = max(self.peak_in_use, in_use)
+        self.peak_time_wait = max(self.peak_time_wait, time_wait)
+
+        if not self.warned and in_use >= self.range_size * PORT_EXHAUSTION_WARN_RATIO:
+            self.warned = True
+            logger.warning(f"临时端口即将耗尽: 已占用 {in_use}/{self.range_size}，"
+                           f"其中 TIME_WAIT {time_wait}，压测客户端本身可能成为瓶颈")
+        return in_use, time_wait
+
+    def _run(self):
+        """后台采样线程"""
+        while not self._stop.wait(self.interval_s):
+            self.sample()
+
+    def __enter__(self) -> "EphemeralPortMonitor":
+        if self.enabled:
+            self.baseline_in_use, self.baseline_time_wait = self.sample()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="port-monitor")
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.sample()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        生成结果字段
+
+        Returns:
+            包含 ports（临时端口范围、基线与峰值占用、峰值 TIME_WAIT 数、峰值占用比例）的字典，
+            未启用时为空字典
+        """
+        if not self.enabled:
+            return {}
+        return {
+            "ports": {
+                "ephemeral_range": list(self.port_range),
+                "range_size": self.range_size,
+                "samples": self.samples,
+                "baseline_in_use": self.baseline_in_use,
+                "baseline_time_wait": self.baseline_time_wait,
+                "peak_in_use": self.peak_in_use,
+                "peak_time_wait": self.peak_time_wait,
+                "peak_usage_ratio": self.peak_in_use / self.range_size if self.range_size else 0,
+                "exhaustion_warning": self.warned,
+            }
+        }
@@ -0,0 +1,411 @@
+"""
+多进程性能测试工具
+将虚拟用户分片到多个工作进程中执行，绕开 GIL 对单进程压测能力的限制
+"""
+
+import os
+import time
+import queue as queue_module
+import multiprocessing
+from typing import Callable, Dict, Any, Optional, List, Tuple
+from performance_test import PerformanceTest
+from histogram import LatencyHistogram
+from load_profile import LoadProfile
+from request_trace import RequestOutcomes
+from port_monitor import EphemeralPortMonitor
+from utils import find_http_client
+from logger import get_logger, flush_logs, report_suppressed_logs
+from config import PROCESS_WORKER_POLL_S, PERF_DECODE_RESPONSES
+
+logger = get_logger(__name__)
+
+
+def _isolate_client(func: Callable):
+    """
+    为工作进程中的被测函数换用独立的HTTP会话
+
+    被测函数通常是 BaseTest 或 HttpClient 的绑定方法，fork 出的子进程会继承父进程
+    连接池中的套接字，这里重建会话，保证每个进程使用自己的连接。
+
+    Args:
+        func: 被测函数
+    """
+    client = find_http_client(func)
+    if client is not None:
+        client.reset_session()
+
+
+def _prepare_process(func: Callable, cpu: Optional[int]):
+    """
+    工作进程的公共准备工作：绑定CPU并隔离HTTP会话
+
+    Args:
+        func: 被测函数
+        cpu: 绑定的CPU编号，为空时不绑定
+    """
+    if cpu is not None:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, {cpu})
+        else:
+            logger.warning("当前平台不支持设置CPU亲和性，忽略 cpu_affinity 配置")
+
+    _isolate_client(func)
+
+
+def _process_worker(
+    index: int,
+    concurrency: int,
+    iterations: int,
+    func: Callable,
+    args: tuple,
+    kwargs: Dict[str, Any],
+    cpu: Optional[int],
+    barrier,
+    queue,
+    keep_samples: bool = False,
+    warm_up: bool = False,
+    isolate_sessions: bool = False,
+    decode_responses: bool = PERF_DECODE_RESPONSES
+):
+    """
+    工作进程入口：执行分配到的虚拟用户并回传原始数据
+
+    Args:
+        index: 工作进程序号
+        concurrency: 分配到本进程的并发数
+        iterations: 迭代次数
+        func: 被测函数
+        args: 函数位置参数
+        kwargs: 函数关键字参数
+        cpu: 绑定的CPU编号，为空时不绑定
+        barrier: 用于对齐各进程开始时间的屏障
+        queue: 回传结果的队列
+        keep_samples: 是否回传全部原始样本
+        warm_up: 是否在测量窗口开始前预建连接
+        isolate_sessions: 是否为每个工作线程使用独立的 HttpClient
+        decode_responses: 被测函数调用 BaseTest 辅助方法时是否立即解码响应（同父进程实例的设置）
+    """
+    try:
+        _prepare_process(func, cpu)
+
+        # 等待所有进程就绪后同时开始，进程启动时间不计入测试窗口
+        barrier.wait()
+
+        start_time = time.perf_counter()
+        histogram, samples, burst_stats, outcomes = PerformanceTest(decode_responses)._run_closed_loop(
+            func, concurrency, iterations, args, kwargs, keep_samples, warm_up, isolate_sessions
+        )
+        outcomes.elapsed_s = time.perf_counter() - start_time
+
+        # 工作进程的日志采样统计随结果回传，由父进程汇总到测试结果中
+        burst_stats["log_sampling"] = report_suppressed_logs()
+        queue.put((index, histogram, samples, burst_stats, outcomes, None))
+    except Exception as e:
+        barrier.abort()
+        report_suppressed_logs()
+        queue.put((index, None, None, None, None, f"{type(e).__name__}: {e}"))
+    finally:
+        # 工作进程以 os._exit 退出，不执行 atexit，需在退出前写完队列中的日志
+        flush_logs()
+
+
+def _profile_worker(
+    index: int,
+    workers: int,
+    func: Callable,
+    profile: LoadProfile,
+    args: tuple,
+    kwargs: Dict[str, Any],
+    cpu: Optional[int],
+    barrier,
+    queue,
+    decode_responses: bool = PERF_DECODE_RESPONSES
+):
+    """
+    工作进程入口：按负载曲线执行编号满足 user_index % workers == index 的虚拟用户
+
+    Args:
+        index: 工作进程序号
+        workers: 工作进程总数
+        func: 被测函数
+        profile: 负载曲线
+        args: 函数位置参数
+        kwargs: 函数关键字参数
+        cpu: 绑定的CPU编号，为空时不绑定
+        barrier: 用于对齐各进程开始时间的屏障
+        queue: 回传结果的队列
+        decode_responses: 被测函数调用 BaseTest 辅助方法时是否立即解码响应（同父进程实例的设置）
+    """
+    try:
+        _prepare_process(func, cpu)
+        barrier.wait()
+
+        histograms, outcomes = PerformanceTest(decode_responses)._run_profile(func, profile, args, kwargs, index, workers)
+        queue.put((index, histograms, outcomes, report_suppressed_logs(), None))
+    except Exception as e:
+        barrier.abort()
+        report_suppressed_logs()
+        queue.put((index, None, None, None, f"{type(e).__name__}: {e}"))
+    finally:
+        flush_logs()
+
+
+def _collect_results(
+    processes: List,
+    queue,
+    barrier,
+    poll_s: float = PROCESS_WORKER_POLL_S
+) -> Tuple[Dict[int, tuple], int]:
+    """
+    取回各工作进程回传的结果，并发现未回传结果就退出的进程
+
+    被信号杀死（如 OOM）或崩溃的进程不会向队列回传任何内容，只阻塞等待队列会让父进程永远挂起。
+    这里按间隔检查进程状态：进程已退出且在随后的一个间隔内仍没有结果时判定为失败，
+    并中止屏障，避免其他还在屏障处等待的进程一直阻塞。
+
+    Args:
+        processes: 工作进程列表（序号与回传结果中的序号一致）
+        queue: 回传结果的队列，结果的第一项为进程序号、最后一项为错误信息
+        barrier: 对齐各进程开始时间的屏障
+        poll_s: 检查进程状态的间隔（秒）
+
+    Returns:
+        (进程序号 -> 成功回传的结果, 失败的工作进程数)
+    """
+    results = {}
+    failed = set()
+    exited_unreported = set()
+    while len(results) + len(failed) < len(processes):
+        try:
+            item = queue.get(timeout=poll_s)
+        except queue_module.Empty:
+            # 上一次检查时已退出的进程在这段时间内仍未回传结果，判定为异常退出
+            for index in exited_unreported - failed - set(results):
+                logger.error(f"工作进程 {index} 异常退出（退出码 {processes[index].exitcode}），未回传结果")
+                failed.add(index)
+                barrier.abort()
+            exited_unreported = {
+                index for index, process in enumerate(processes)
+                if process.exitcode is not None and index not in results and index not in failed
+            }
+            continue
+        index, error = item[0], item[-1]
+        if error:
+            logger.error(f"工作进程 {index} 执行失败: {error}")
+            failed.add(index)
+        else:
+            results[index] = item
+    return results, len(failed)
+
+
+class ProcessPerformanceTest(PerformanceTest):
+    """多进程性能测试工具类
+
+    调用方式与 PerformanceTest 相同。并发数按工作进程数均匀分片，各进程独立运行闭环测试，
+    结束后将各进程的响应时间直方图精确合并，再按原有格式计算统计数据。
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cpu_affinity: Optional[List[int]] = None,
+        decode_responses: bool = PERF_DECODE_RESPONSES
+    ):
+        """
+        初始化多进程性能测试工具
+
+        Args:
+            workers: 工作进程数，默认为CPU核数
+            cpu_affinity: 可选的CPU编号列表，第 i 个工作进程绑定到 cpu_affinity[i % len(cpu_affinity)]
+            decode_responses: 被测函数调用 BaseTest 辅助方法时是否立即解码响应，传给每个工作进程
+        """
+        super().__init__(decode_responses)
+        self.workers = workers or os.cpu_count() or 1
+        self.cpu_affinity = cpu_affinity
+        self._failed_workers = 0
+        self._worker_log_sampling = []
+
+    def concurrent_test(
+        self,
+        func: Callable,
+        concurrency: int = 1,
+        iterations: int = 1,
+        *args,
+        expected_interval_ms: Optional[float] = None,
+        keep_samples: bool = False,
+        warm_up: bool = False,
+        isolate_sessions: bool = False,
+        monitor_ports: bool = False,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        多进程并发测试
+
+        Args:
+            func: 要测试的函数（需可被 pickle，spawn 启动方式下会复制到子进程）
+            concurrency: 总并发数
+            iterations: 每次测试的迭代次数（取平均值）
+            *args: 函数位置参数
+            expected_interval_ms: 期望请求间隔（毫秒），指定后额外计算协调遗漏校正后的统计数据
+            keep_samples: 是否保留全部原始样本（结果中的 all_durations），默认只记录直方图
+            warm_up: 是否在测量窗口开始前为每个进程的 HttpClient 预建与分片并发数相同的连接
+            isolate_sessions: 是否为每个工作线程复制独立的 HttpClient
+            monitor_ports: 是否在测试期间监控本机 TIME_WAIT 套接字数和临时端口占用
+            **kwargs: 函数关键字参数
+
+        Returns:
+            性能测试结果字典，额外包含工作进程数、失败的工作进程数（failed_workers）、总耗时和吞吐量；
+            有工作进程失败时，结果只包含其余进程的负载，completed_concurrency 为这些进程的并发数之和
+        """
+        shards = self._shard(concurrency, self.workers)
+        logger.info(f"开始多进程并发测试 - 并发数: {concurrency}, 迭代次数: {iterations}, "
+                    f"工作进程: {len(shards)}, 分片: {shards}")
+
+        # 临时端口监控覆盖所有工作进程的整个生命周期
+        with EphemeralPortMonitor(enabled=monitor_ports) as ports:
+            context = multiprocessing.get_context()
+            barrier = context.Barrier(len(shards))
+            queue = context.Queue()
+
+            processes = []
+            for index, shard in enumerate(shards):
+                cpu = self.cpu_affinity[index % len(self.cpu_affinity)] if self.cpu_affinity else None
+                process = context.Process(
+                    target=_process_worker,
+                    args=(
+                        index, shard, iterations, func, args, kwargs, cpu, barrier, queue,
+                        keep_samples, warm_up, isolate_sessions, self.decode_responses
+                    ),
+                    daemon=True
+                )
+                process.start()
+                processes.append(process)
+
+            # 先取回结果再等待进程退出，避免队列缓冲区写满导致子进程阻塞
+            merged = LatencyHistogram()
+            merged_outcomes = RequestOutcomes()
+            all_samples = [] if keep_samples else None
+            spreads = []
+            results, failed_workers = _collect_results(processes, queue, barrier)
+            for index, histogram, samples, burst_stats, outcomes, _ in results.values():
+                merged.merge(histogram)
+                # 各进程并行执行，合并后的耗时取最慢的进程
+                merged_outcomes.merge(outcomes)
+                if all_samples is not None:
+                    all_samples.extend(samples)
+                spreads.append(burst_stats)
+            self._worker_log_sampling = [item["log_sampling"] for item in spreads]
+
+            for process in processes:
+                process.join()
+
+        logger.info(f"多进程并发测试完成 - 总耗时: {merged_outcomes.elapsed_s:.4f}秒")
+
+        extra = {"workers": len(shards), "failed_workers": failed_workers}
+        if failed_workers:
+            extra["completed_concurrency"] = sum(shards[index] for index in results)
+            logger.error(f"{failed_workers} 个工作进程失败，"
+                         f"结果只包含 {extra['completed_concurrency']}/{concurrency} 个并发的负载")
+        extra.update(merged_outcomes.summary())
+        extra.update(ports.summary())
+        if spreads:
+            # 各进程内部的发送时间差（进程之间只在开始时对齐一次）
+            extra["send_spread_avg_ms"] = sum(item["send_spread_avg_ms"] for item in spreads) / len(spreads)
+            extra["send_spread_max_ms"] = max(item["send_spread_max_ms"] for item in spreads)
+            # 每个进程有各自的连接池，连接池缺口和预热的连接数按进程累加
+            for key in ("pool_shortfall", "warmed_connections"):
+                if any(key in item for item in spreads):
+                    extra[key] = sum(item.get(key, 0) for item in spreads)
+
+        return self._build_result(merged, concurrency, iterations, expected_interval_ms, all_samples, extra)
+
+    def _run_profile(
+        self,
+        func: Callable,
+        profile: LoadProfile,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        slot: int = 0,
+        stride: int = 1
+    ) -> Tuple[Dict[str, LatencyHistogram], Dict[str, RequestOutcomes]]:
+        """
+        将负载曲线的虚拟用户按编号轮流分配到各工作进程执行，并合并各阶段直方图
+
+        Args:
+            func: 要测试的函数（需可被 pickle）
+            profile: 负载曲线
+            args: 函数位置参数
+            kwargs: 函数关键字参数
+            slot: 未使用，与父类签名保持一致
+            stride: 未使用，与父类签名保持一致
+
+        Returns:
+            (各阶段响应时间直方图, 各阶段调用结果统计)
+        """
+        workers = max(1, min(self.workers, profile.max_users))
+        logger.info(f"负载曲线分配到 {workers} 个工作进程")
+
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(workers)
+        queue = context.Queue()
+
+        processes = []
+        for index in range(workers):
+            cpu = self.cpu_affinity[index % len(self.cpu_affinity)] if self.cpu_affinity else None
+            process = context.Process(
+                target=_profile_worker,
+                args=(index, workers, func, profile, args, kwargs, cpu, barrier, queue, self.decode_responses),
+                daemon=True
+            )
+            process.start()
+            processes.append(process)
+
+        histograms = {stage.name: LatencyHistogram() for stage in profile.stages}
+        outcomes = {stage.name: RequestOutcomes() for stage in profile.stages}
+        results, self._failed_workers = _collect_results(processes, queue, barrier)
+        if self._failed_workers:
+            logger.error(f"{self._failed_workers} 个工作进程失败，结果缺少这些进程负责的虚拟用户")
+        self._worker_log_sampling = []
+        for index, worker_histograms, worker_outcomes, log_sampling, _ in results.values():
+            for name, histogram in worker_histograms.items():
+                histograms[name].merge(histogram)
+                outcomes[name].merge(worker_outcomes[name])
+            self._worker_log_sampling.append(log_sampling)
+
+        for process in processes:
+            process.join()
+
+        return histograms, outcomes
+
+    def _build_profile_results(
+        self,
+        profile: LoadProfile,
+        histograms: Dict[str, LatencyHistogram],
+        outcomes: Dict[str, RequestOutcomes]
+    ) -> Dict[str, Dict[str, Any]]:
+        """汇总负载曲线各阶段的测试结果，每个阶段额外包含失败的工作进程数（failed_workers）"""
+        results = super()._build_profile_results(profile, histograms, outcomes)
+        for result in results.values():
+            result["failed_workers"] = self._failed_workers
+        return results
+
+    def _log_sampling_stats(self) -> Optional[Dict[str, int]]:
+        """汇总父进程和本次运行各工作进程回传的日志采样统计"""
+        worker_stats, self._worker_log_sampling = self._worker_log_sampling, []
+        return report_suppressed_logs(*worker_stats)
+
+    @staticmethod
+    def _shard(concurrency: int, workers: int) -> List[int]:
+        """
+        将并发数尽量均匀地分配到各工作进程
+
+        Args:
+            concurrency: 总并发数
+            workers: 工作进程数
+
+        Returns:
+            各工作进程分配到的并发数（不含为 0 的分片）
+        """
+        workers = max(1, min(workers, concurrency))
+        base, remainder = divmod(concurrency, workers)
+        return [base + (1 if i < remainder else 0) for i in range(workers)]
@@ -0,0 +1,533 @@
+"""
+低开销 HTTP/1.1 传输
+直接在长连接套接字上收发 HTTP/1.1 报文，只实现压测需要的最小子集（Content-Length 和 chunked 响应体、
+gzip/deflate 解压、长连接复用、可选的流水线、TLS 会话恢复），绕开 requests/urllib3 每个请求数十微秒的 Python 开销。
+仅供性能测试引擎在高 RPS 场景下使用，不处理重定向、代理和认证
+"""
+
+import json
+import socket
+import ssl
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+from config import REQUEST_TIMEOUT, HTTP_POOL_MAXSIZE
+from tls_session import ResumableSSLContext, client_context
+import request_trace
+
+# 状态行和单个响应头的最大长度
+_MAX_LINE = 65536
+
+
+class RawResponse:
+    """最小响应对象，提供与 requests.Response 相同的常用属性"""
+
+    def __init__(self, url: str, status_code: int, reason: str, headers: List[Tuple[str, str]], content: bytes):
+        """
+        初始化响应
+
+        Args:
+            url: 请求URL
+            status_code: 状态码
+            reason: 状态描述
+            headers: 按原始顺序排列的响应头
+            content: 响应体
+        """
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.raw_headers = headers
+        self.headers = CaseInsensitiveDict()
+        for name, value in headers:
+            self.headers[name] = f"{self.headers[name]}, {value}" if name in self.headers else value
+        self.content = content
+        # 线上传输的字节数，由连接在读取响应时填写
+        self.request_bytes = 0
+        self.wire_header_bytes = 0
+        self.wire_body_bytes = len(content)
+
+    @property
+    def ok(self) -> bool:
+        """状态码是否小于 400"""
+        return self.status_code < 400
+
+    @property
+    def encoding(self) -> str:
+        """响应体编码（取 Content-Type 的 charset，默认 UTF-8）"""
+        for param in self.headers.get("Content-Type", "").split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf-8"
+
+    @property
+    def text(self) -> str:
+        """按响应编码解码的响应体"""
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self, **kwargs) -> Any:
+        """将响应体解析为 JSON"""
+        return json.loads(self.content, **kwargs)
+
+    def raise_for_status(self):
+        """状态码 >= 400 时抛出 requests.HTTPError"""
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} {self.reason} for url: {self.url}", response=self)
+
+    def __repr__(self) -> str:
+        return f"<RawResponse [{self.status_code}]>"
+
+
+class RawHTTPConnection:
+    """单个 HTTP/1.1 长连接"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        tls: bool = False,
+        timeout: float = REQUEST_TIMEOUT,
+        tls_context: Optional[ssl.SSLContext] = None
+    ):
+        """
+        初始化连接（不立即建立）
+
+        Args:
+            host: 主机名
+            port: 端口
+            tls: 是否使用 TLS
+            timeout: 连接和读写超时（秒）
+            tls_context: TLS 连接使用的 SSLContext，默认为 ssl.create_default_context()
+        """
+        self.host = host
+        self.port = port
+        self.tls = tls
+        self.timeout = timeout
+        self.tls_context = tls_context
+        self.session_saved = True
+        self.sock = None
+        self.reader = None
+        self.requests_sent = 0
+        self.bytes_read = 0
+
+    @property
+    def is_closed(self) -> bool:
+        """连接是否未建立或已关闭"""
+        return self.sock is None
+
+    def connect(self):
+        """解析域名并建立连接，分别记录DNS解析、TCP连接和TLS握手耗时"""
+        start = time.perf_counter_ns()
+        family, socktype, proto, _, address = socket.getaddrinfo(
+            self.host, self.port, 0, socket.SOCK_STREAM
+        )[0]
+        resolved = time.perf_counter_ns()
+
+        sock = socket.socket(family, socktype, proto)
+        try:
+            sock.settimeout(self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.connect(address)
+            connected = time.perf_counter_ns()
+            if self.tls:
+                context = self.tls_context or ssl.create_default_context()
+                sock = context.wrap_socket(sock, server_hostname=self.host)
+                request_trace.record_phase("tls", time.perf_counter_ns() - connected)
+                self.session_saved = False
+        except BaseException:
+            sock.close()
+            raise
+
+        request_trace.record_phase("dns", resolved - start)
+        request_trace.record_phase("connect", connected - resolved)
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+        self.requests_sent = 0
+
+    def close(self):
+        """关闭连接"""
+        if self.sock is not None:
+            self.reader.close()
+            self.sock.close()
+            self.sock = None
+            self.reader = None
+
+    def send(self, data: bytes):
+        """
+        发送已编码的请求报文（可以是多个请求拼接成的流水线）
+
+        Args:
+            data: 请求报文
+        """
+        start = time.perf_counter_ns()
+        self.sock.sendall(data)
+        request_trace.record_phase("send", time.perf_counter_ns() - start)
+
+    def _readline(self) -> bytes:
+        line = self.reader.readline(_MAX_LINE + 1)
+        self.bytes_read += len(line)
+        if len(line) > _MAX_LINE:
+            raise requests.exceptions.ConnectionError("响应行过长")
+        return line
+
+    def read_response(self, method: str, url: str) -> Tuple[RawResponse, bool]:
+        """
+        读取一个响应
+
+        Args:
+            method: 对应请求的方法（HEAD 请求没有响应体）
+            url: 对应请求的URL
+
+        Returns:
+            (响应, 响应后是否必须关闭连接)
+        """
+        self.bytes_read = 0
+        start = time.perf_counter_ns()
+        status_line = self._readline()
+        if not status_line:
+            raise requests.exceptions.ConnectionError("服务器在返回响应前关闭了连接")
+        first_byte = time.perf_counter_ns()
+        request_trace.record_phase("ttfb", first_byte - start)
+
+        version, _, rest = status_line.decode("latin-1").rstrip("\r\n").partition(" ")
+        code, _, reason = rest.partition(" ")
+        if not version.startswith("HTTP/") or not code.isdigit():
+            raise requests.exceptions.ConnectionError(f"无法解析的状态行: {status_line!r}")
+        status_code = int(code)
+
+        headers = []
+        while True:
+            line = self._readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.append((name.strip(), value.strip()))
+        header_bytes = self.bytes_read
+
+        fields = {name.lower(): value for name, value in headers}
+        connection = fields.get("connection", "").lower()
+        will_close = connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive")
+
+        if method == "HEAD" or status_code in (204, 304) or 100 <= status_code < 200:
+            content = b""
+        elif "chunked" in fields.get("transfer-encoding", "").lower():
+            content = self._read_chunked()
+        elif "content-length" in fields:
+            content = self._read_exact(int(fields["content-length"]))
+        else:
+            # 既没有长度也没有分块时，响应体持续到连接关闭
+            content = self.reader.read()
+            self.bytes_read += len(content)
+            will_close = True
+        body_bytes = self.bytes_read - header_bytes
+        content = _decompress(content, fields.get("content-encoding", ""))
+
+        request_trace.record_phase("body", time.perf_counter_ns() - first_byte)
+        response = RawResponse(url, status_code, reason, headers, content)
+        response.wire_header_bytes = header_bytes
+        response.wire_body_bytes = body_bytes
+        return response, will_close
+
+    def _read_exact(self, length: int) -> bytes:
+        data = self.reader.read(length)
+        self.bytes_read += len(data)
+        if len(data) < length:
+            raise requests.exceptions.ConnectionError(f"响应体不完整: 期望 {length} 字节，收到 {len(data)} 字节")
+        return data
+
+    def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int(self._readline().split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # 跳过尾部字段直到空行
+                while self._readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(self._read_exact(size))
+            self._readline()
+
+
+def _decompress(content: bytes, encoding: str) -> bytes:
+    """
+    按 Content-Encoding 解压响应体（支持 gzip 和 deflate，其他编码原样返回）
+
+    Args:
+        content: 线上传输的响应体
+        encoding: Content-Encoding
+
+    Returns:
+        解压后的响应体
+    """
+    encoding = encoding.strip().lower()
+    if not content or encoding in ("", "identity"):
+        return content
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            return zlib.decompress(content, 16 + zlib.MAX_WBITS)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(content)
+            except zlib.error:
+                # 部分服务器发送不带 zlib 头的原始 deflate 数据
+                return zlib.decompress(content, -zlib.MAX_WBITS)
+    except zlib.error as e:
+        raise requests.exceptions.ContentDecodingError(f"响应体解压失败: {e}") from e
+    return content
+
+
+def encode_request(method: str, target: str, host: str, headers: Dict[str, str], body: Optional[bytes]) -> bytes:
+    """
+    编码 HTTP/1.1 请求报文
+
+    Args:
+        method: 请求方法
+        target: 请求路径（含查询字符串）
+        host: Host 头的值
+        headers: 请求头
+        body: 请求体，没有时为 None
+
+    Returns:
+        请求报文
+    """
+    lines = [f"{method} {target} HTTP/1.1", f"Host: {host}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items() if name.lower() != "host")
+    if body is not None or method in ("POST", "PUT", "PATCH"):
+        lines.append(f"Content-Length: {len(body) if body else 0}")
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    return head + body if body else head
+
+
+class RawTransport:
+    """按主机维护 RawHTTPConnection 连接池的传输层
+
+    与 requests 的连接池一样，空闲连接按后进先出复用，超过 pool_size 的空闲连接直接关闭。
+    复用的连接在发送前被服务器关闭（空闲超时）时，自动新建连接重试一次。
+    同一主机的 TLS 连接共用一个 SSLContext，开启会话恢复时新建连接复用之前握手得到的 TLS 会话。
+    """
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_MAXSIZE,
+        timeout: float = REQUEST_TIMEOUT,
+        verify: Any = True,
+        tls_resumption: bool = True
+    ):
+        """
+        初始化传输层
+
+        Args:
+            pool_size: 每个主机保留的空闲连接数
+            timeout: 默认超时（秒）
+            verify: 证书校验设置（同 requests 的 verify 参数）
+            tls_resumption: 新建 TLS 连接时是否恢复之前的 TLS 会话（否则每次都是完整握手）
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.verify = verify
+        self.tls_resumption = tls_resumption
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str, int], List[RawHTTPConnection]] = {}
+        self._tls_contexts: Dict[Tuple[str, str, int], ResumableSSLContext] = {}
+        self.num_requests = 0
+        self.num_connects = 0
+
+    @staticmethod
+    def _origin(url: str) -> Tuple[Tuple[str, str, int], str]:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise requests.exceptions.InvalidSchema(f"不支持的协议: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        return (parts.scheme, parts.hostname, port), target
+
+    def _get_conn(self, key: Tuple[str, str, int], timeout: float) -> RawHTTPConnection:
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            scheme, host, port = key
+            context = None
+            if scheme == "https":
+                with self._lock:
+                    context = self._tls_contexts.get(key)
+                    if context is None:
+                        context = self._tls_contexts[key] = client_context(self.verify)
+            conn = RawHTTPConnection(host, port, scheme == "https", timeout, context)
+        conn.timeout = timeout
+        if conn.is_closed:
+            try:
+                conn.connect()
+            except socket.timeout as e:
+                raise requests.exceptions.ConnectTimeout(str(e)) from e
+            except OSError as e:
+                raise requests.exceptions.ConnectionError(str(e)) from e
+            with self._lock:
+                self.num_connects += 1
+        else:
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def _put_conn(self, key: Tuple[str, str, int], conn: RawHTTPConnection):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _exchange(
+        self,
+        key: Tuple[str, str, int],
+        data: bytes,
+        calls: List[Tuple[str, str, int]],
+        timeout: float
+    ) -> List[RawResponse]:
+        """在一个连接上发送请求报文并按顺序读取 len(calls) 个响应，calls 为 (请求方法, URL, 请求报文字节数)"""
+        for attempt in (0, 1):
+            conn = self._get_conn(key, timeout)
+            reused = conn.requests_sent > 0
+            responses = []
+            try:
+                conn.send(data)
+                conn.requests_sent += len(calls)
+                will_close = False
+                for method, url, request_bytes in calls:
+                    if will_close:
+                        raise requests.exceptions.ConnectionError("服务器在流水线请求全部响应前关闭了连接")
+                    response, will_close = conn.read_response(method, url)
+                    response.request_bytes = request_bytes
+                    responses.append(response)
+            except socket.timeout as e:
+                conn.close()
+                raise requests.exceptions.ReadTimeout(str(e)) from e
+            except (OSError, ValueError, requests.exceptions.ConnectionError) as e:
+                conn.close()
+                # 只在复用的连接尚未收到任何响应时重试，此时请求不可能已被处理
+                if attempt == 0 and reused and not responses:
+                    continue
+                if isinstance(e, requests.exceptions.ConnectionError):
+                    raise
+                raise requests.exceptions.ConnectionError(str(e)) from e
+
+            # TLS 1.3 的会话票据在握手后才到达，收到第一个响应后再保存会话
+            if not conn.session_saved:
+                conn.session_saved = True
+                if self.tls_resumption:
+                    conn.tls_context.save_session(conn.sock)
+            if will_close:
+                conn.close()
+            self._put_conn(key, conn)
+            with self._lock:
+                self.num_requests += len(calls)
+            return responses
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[bytes] = None,
+        timeout: Optional[float] = None
+    ) -> RawResponse:
+        """
+        发送一个请求
+
+        Args:
+            method: 请求方法
+            url: 完整URL
+            headers: 请求头
+            body: 请求体
+            timeout: 超时（秒），默认使用传输层的超时
+
+        Returns:
+            响应
+        """
+        key, target = self._origin(url)
+        data = encode_request(method, target, self._host_header(key), headers, body)
+        return self._exchange(key, data, [(method, url, len(data))], timeout or self.timeout)[0]
+
+    def pipeline(
+        self,
+        calls: List[Tuple[str, str, Dict[str, str], Optional[bytes]]],
+        timeout: Optional[float] = None
+    ) -> List[RawResponse]:
+        """
+        在同一个连接上一次性发出多个请求（HTTP/1.1 流水线），再按顺序读取响应
+
+        Args:
+            calls: (请求方法, 完整URL, 请求头, 请求体) 列表，必须属于同一主机
+            timeout: 超时（秒），默认使用传输层的超时
+
+        Returns:
+            与请求顺序一致的响应列表
+        """
+        if not calls:
+            return []
+        keys, data = set(), []
+        for method, url, headers, body in calls:
+            key, target = self._origin(url)
+            keys.add(key)
+            data.append(encode_request(method, target, self._host_header(key), headers, body))
+        if len(keys) > 1:
+            raise ValueError("流水线中的请求必须属于同一主机")
+
+        sizes = [(call[0], call[1], len(message)) for call, message in zip(calls, data)]
+        return self._exchange(keys.pop(), b"".join(data), sizes, timeout or self.timeout)
+
+    @staticmethod
+    def _host_header(key: Tuple[str, str, int]) -> str:
+        scheme, host, port = key
+        if ":" in host:
+            host = f"[{host}]"
+        return host if port == (443 if scheme == "https" else 80) else f"{host}:{port}"
+
+    def warm_up(self, url: str, connections: int) -> int:
+        """
+        预先建立连接并放入连接池
+
+        Args:
+            url: 目标URL
+            connections: 需要预建的连接数（超过连接池大小的部分会被丢弃）
+
+        Returns:
+            实际放入连接池的连接数
+        """
+        key, _ = self._origin(url)
+        opened = []
+        try:
+            for _ in range(min(connections, self.pool_size)):
+                opened.append(self._get_conn(key, self.timeout))
+        finally:
+            for conn in opened:
+                self._put_conn(key, conn)
+        return len(opened)
+
+    def tls_stats(self) -> Dict[str, int]:
+        """
+        汇总各主机的 TLS 握手统计
+
+        Returns:
+            包含 tls_handshakes 和 tls_resumed 的字典，没有建立过 TLS 连接时为空字典
+        """
+        with self._lock:
+            contexts = list(self._tls_contexts.values())
+        stats = {}
+        for context in contexts:
+            for name, value in context.stats().items():
+                stats[name] = stats.get(name, 0) + value
+        return stats
+
+    def close(self):
+        """关闭所有空闲连接"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
@@ -0,0 +1,488 @@
+"""
+请求追踪
+在一次被测函数调用期间收集 HTTP 客户端发出的每个请求的状态码、响应字节数、各阶段耗时、附加信息
+（如 TCP_INFO）和传输字节统计，并按调用结果累计吞吐量、有效吞吐量（goodput）、错误分类、分阶段耗时分布、
+线上传输字节数与压缩情况和最慢样本。
+每个请求带有唯一的请求ID（见 tag_request），最慢样本中保留请求ID，可据此在服务器访问日志中找到对应记录
+"""
+
+import heapq
+import itertools
+import os
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+from histogram import LatencyHistogram
+from config import SLOWEST_SAMPLE_COUNT, REQUEST_ID_HEADER
+
+# 请求阶段及其显示名称（按发生顺序）
+PHASES = {
+    "dns": "DNS解析",
+    "connect": "TCP连接",
+    "tls": "TLS握手",
+    "send": "发送请求",
+    "ttfb": "等待首字节",
+    "body": "读取响应体",
+}
+
+# 一个请求的记录：(状态码, 解码后的响应字节数, 各阶段耗时, 附加信息, 传输字节统计)
+TraceEntry = Tuple[int, int, Optional[Dict[str, int]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# 当前调用的请求记录。使用 ContextVar 而不是 threading.local，
+# 同一线程中并发执行的协程（异步引擎）也各自拥有独立的记录
+_current_trace: ContextVar[Optional[List[TraceEntry]]] = ContextVar("request_trace", default=None)
+
+# 正在发送的单个 HTTP 请求的各阶段耗时（纳秒）和附加信息
+_current_phases: ContextVar[Optional[Dict[str, int]]] = ContextVar("request_phases", default=None)
+_current_details: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_details", default=None)
+
+# 最慢样本堆的插入序号，耗时相同时用于排序
+_sample_sequence = itertools.count()
+
+# 请求ID由进程前缀（8 位十六进制随机数）和进程内序号组成，fork 出的子进程重新生成前缀，避免与父进程重复
+_request_id_prefix = os.urandom(4).hex()
+_request_id_counter = itertools.count(1)
+
+
+def _reset_request_ids():
+    global _request_id_prefix, _request_id_counter
+    _request_id_prefix = os.urandom(4).hex()
+    _request_id_counter = itertools.count(1)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_request_ids)
+
+
+def new_request_id() -> str:
+    """
+    生成紧凑的唯一请求ID，如 "3f9a1c2e-1b"
+
+    Returns:
+        请求ID
+    """
+    return f"{_request_id_prefix}-{next(_request_id_counter):x}"
+
+
+def tag_request(
+    headers: Optional[Dict[str, str]],
+    header: Optional[str] = REQUEST_ID_HEADER
+) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+    """
+    为请求加上请求ID头
+
+    Args:
+        headers: 调用方指定的请求头（不会被修改）
+        header: 请求ID头的名称，为空时不加
+
+    Returns:
+        (加上请求ID后的请求头, 请求ID)；header 为空时返回 (headers, None)，
+        调用方已指定该请求头时沿用其值
+    """
+    if not header:
+        return headers, None
+    if not headers:
+        request_id = new_request_id()
+        return {header: request_id}, request_id
+    headers = dict(headers)
+    name = header.lower()
+    request_id = next((value for key, value in headers.items() if key.lower() == name), None)
+    if request_id is None:
+        request_id = headers[header] = new_request_id()
+    return headers, request_id
+
+
+def begin():
+    """开始追踪当前线程（或协程）中的请求"""
+    _current_trace.set([])
+
+
+def end() -> List[TraceEntry]:
+    """
+    结束追踪
+
+    Returns:
+        追踪期间记录的 (状态码, 响应字节数, 各阶段耗时, 附加信息, 传输字节统计) 列表
+    """
+    trace = _current_trace.get()
+    _current_trace.set(None)
+    return trace or []
+
+
+def begin_request():
+    """开始记录单个 HTTP 请求的各阶段耗时和附加信息，由 HTTP 客户端在发送请求前调用"""
+    _current_phases.set({})
+    _current_details.set({})
+
+
+def record_phase(name: str, elapsed_ns: int):
+    """
+    累加当前请求某一阶段的耗时（跟随重定向时同一阶段可能出现多次）；未开始记录时不做任何事
+
+    Args:
+        name: 阶段名称（见 PHASES）
+        elapsed_ns: 耗时（纳秒）
+    """
+    phases = _current_phases.get()
+    if phases is not None:
+        phases[name] = phases.get(name, 0) + elapsed_ns
+
+
+def record_detail(name: str, value: Any):
+    """
+    记录当前请求的一项附加信息（跟随重定向时以最后一次为准）；未开始记录时不做任何事
+
+    Args:
+        name: 信息名称（如 tcp_info）
+        value: 信息内容
+    """
+    details = _current_details.get()
+    if details is not None:
+        details[name] = value
+
+
+def end_request() -> Tuple[Dict[str, int], Dict[str, Any]]:
+    """
+    结束记录当前请求的各阶段耗时和附加信息
+
+    Returns:
+        (阶段名称 -> 耗时（纳秒）, 附加信息)
+    """
+    phases = _current_phases.get()
+    details = _current_details.get()
+    _current_phases.set(None)
+    _current_details.set(None)
+    return phases or {}, details or {}
+
+
+def record_response(
+    status_code: int,
+    content_length: int,
+    phases: Optional[Dict[str, int]] = None,
+    details: Optional[Dict[str, Any]] = None,
+    transfer: Optional[Dict[str, Any]] = None
+):
+    """
+    记录一个响应，由 HTTP 客户端在收到响应后调用；未开始追踪时不做任何事
+
+    Args:
+        status_code: HTTP 状态码
+        content_length: 响应体字节数
+        phases: 各阶段耗时（纳秒），客户端未记录时为 None
+        details: 附加信息，没有时为 None
+        transfer: 传输字节统计，包含 request_bytes（请求报文字节数）、header_bytes（响应头字节数）、
+            body_bytes（线上传输的响应体字节数，压缩时为压缩后的大小）和 encoding（Content-Encoding），
+            客户端未统计时为 None
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.append((status_code, content_length, phases, details or None, transfer))
+
+
+class RequestOutcomes:
+    """被测函数调用结果统计
+
+    每次调用计为一个请求：抛出异常按异常类型计为失败；未抛异常但有响应状态码 >= 400
+    按第一个错误状态码计为失败；其余计为成功。可跨线程共享，也可跨进程合并。
+
+    能找到被测函数使用的 HttpClient 时，还记录测量窗口内的新建连接数和复用连接的请求数。
+    客户端记录了请求各阶段耗时时，按阶段累计到各自的直方图（首次出现时创建）。
+    请求带有附加信息（如 TCP_INFO）时，保留耗时最长的若干次调用及其附加信息，用于分析慢请求的原因。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.succeeded = 0
+        self.errors_by_type: Dict[str, int] = {}
+        self.errors_by_status: Dict[int, int] = {}
+        self.bytes_received = 0
+        self.transfer_samples = 0
+        self.bytes_sent = 0
+        self.wire_header_bytes = 0
+        self.wire_body_bytes = 0
+        self.decoded_body_bytes = 0
+        self.content_encodings: Dict[str, int] = {}
+        self.elapsed_s = 0.0
+        self.new_connections: Optional[int] = None
+        self.reused_connections: Optional[int] = None
+        self.tls_handshakes: Optional[int] = None
+        self.tls_resumed: Optional[int] = None
+        self.http_cache: Optional[Dict[str, float]] = None
+        self.phases: Dict[str, LatencyHistogram] = {}
+        self.slowest: List[Tuple[float, int, Dict[str, Any]]] = []
+        self.tcp_samples = 0
+        self.tcp_retransmit_samples = 0
+        self.tcp_rtt_total_ms = 0.0
+        self.tcp_rtt_max_ms = 0.0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def failed(self) -> int:
+        """失败调用数"""
+        return self.requests - self.succeeded
+
+    @property
+    def error_rate(self) -> float:
+        """错误率（0-1）"""
+        return self.failed / self.requests if self.requests else 0
+
+    def record(
+        self,
+        trace: List[TraceEntry],
+        error: Optional[BaseException] = None,
+        duration_ms: Optional[float] = None
+    ) -> bool:
+        """
+        记录一次调用的结果
+
+        Args:
+            trace: 调用期间的 (状态码, 响应字节数, 各阶段耗时, 附加信息, 传输字节统计) 列表
+            error: 调用抛出的异常，成功时为 None
+            duration_ms: 调用耗时（毫秒），提供且请求带有附加信息时参与最慢样本排名
+
+        Returns:
+            调用是否失败或进入了最慢样本（这样的调用总是保留日志）
+        """
+        notable = False
+        error_status = next((status for status, _, _, _, _ in trace if status >= 400), None)
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += sum(length for _, length, _, _, _ in trace)
+            for _, length, phases, details, transfer in trace:
+                for name, elapsed_ns in (phases or {}).items():
+                    self._phase_histogram(name).record(elapsed_ns / 1e6)
+                if transfer:
+                    self._record_transfer(length, transfer)
+                if details and "tcp_info" in details:
+                    self._record_tcp_info(details["tcp_info"])
+            # 每个请求都带有请求ID，只为可能进入最慢样本的调用整理附加信息
+            if duration_ms is not None and (
+                len(self.slowest) < SLOWEST_SAMPLE_COUNT or duration_ms >= self.slowest[0][0]
+            ):
+                requests = [dict(details, status=status) for status, _, _, details, _ in trace if details]
+                if requests:
+                    self._push_slowest((duration_ms, next(_sample_sequence), {
+                        "duration_ms": duration_ms,
+                        "requests": requests,
+                    }))
+                    notable = True
+            if error is not None:
+                name = type(error).__name__
+                self.errors_by_type[name] = self.errors_by_type.get(name, 0) + 1
+                notable = True
+            elif error_status is not None:
+                self.errors_by_status[error_status] = self.errors_by_status.get(error_status, 0) + 1
+                notable = True
+            else:
+                self.succeeded += 1
+        return notable
+
+    def _phase_histogram(self, name: str) -> LatencyHistogram:
+        """获取（必要时创建）某一阶段的耗时直方图"""
+        histogram = self.phases.get(name)
+        if histogram is None:
+            histogram = self.phases[name] = LatencyHistogram()
+        return histogram
+
+    def _record_transfer(self, length: int, transfer: Dict[str, Any]):
+        """累计一个请求的传输字节统计（调用方持有锁）"""
+        self.transfer_samples += 1
+        self.bytes_sent += transfer["request_bytes"]
+        self.wire_header_bytes += transfer["header_bytes"]
+        self.wire_body_bytes += transfer["body_bytes"]
+        self.decoded_body_bytes += length
+        encoding = transfer.get("encoding") or "identity"
+        self.content_encodings[encoding] = self.content_encodings.get(encoding, 0) + 1
+
+    def _record_tcp_info(self, info: Dict[str, Any]):
+        """累计 TCP_INFO 样本（调用方持有锁）"""
+        self.tcp_samples += 1
+        if info.get("retrans_delta", 0) > 0 or info["retransmits"] > 0:
+            self.tcp_retransmit_samples += 1
+        self.tcp_rtt_total_ms += info["rtt_ms"]
+        self.tcp_rtt_max_ms = max(self.tcp_rtt_max_ms, info["rtt_ms"])
+
+    def _push_slowest(self, entry: Tuple[float, int, Dict[str, Any]]):
+        """将样本加入最慢样本小顶堆，超出数量时淘汰最快的（调用方持有锁）"""
+        if len(self.slowest) < SLOWEST_SAMPLE_COUNT:
+            heapq.heappush(self.slowest, entry)
+        elif entry[:2] > self.slowest[0][:2]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def record_connections(self, before: Dict[str, int], after: Dict[str, int]):
+        """
+        根据测量窗口前后的连接池统计记录新建连接数、复用连接数和 TLS 握手次数
+
+        Args:
+            before: 测量窗口开始前的 HttpClient.connection_stats()
+            after: 测量窗口结束后的 HttpClient.connection_stats()
+        """
+        requests = after["requests"] - before["requests"]
+        new_connections = after["new_connections"] - before["new_connections"]
+        with self._lock:
+            self.new_connections = (self.new_connections or 0) + new_connections
+            self.reused_connections = (self.reused_connections or 0) + max(requests - new_connections, 0)
+            if "tls_handshakes" in after:
+                self.tls_handshakes = (
+                    (self.tls_handshakes or 0) + after["tls_handshakes"] - before.get("tls_handshakes", 0)
+                )
+                self.tls_resumed = (self.tls_resumed or 0) + after["tls_resumed"] - before.get("tls_resumed", 0)
+
+    def record_cache(self, before: Dict[str, float], after: Dict[str, float]):
+        """
+        根据测量窗口前后的条件请求缓存统计记录窗口内的缓存计数
+
+        Args:
+            before: 测量窗口开始前的 ConditionalCache.stats()
+            after: 测量窗口结束后的 ConditionalCache.stats()
+        """
+        with self._lock:
+            self._add_cache_stats({name: after[name] - before[name] for name in after})
+
+    def _add_cache_stats(self, stats: Dict[str, float]):
+        if self.http_cache is None:
+            self.http_cache = dict.fromkeys(stats, 0)
+        for name, value in stats.items():
+            self.http_cache[name] = self.http_cache.get(name, 0) + value
+
+    def merge(self, other: "RequestOutcomes") -> "RequestOutcomes":
+        """
+        合并另一份统计（并行执行的多个进程，耗时取最大值）
+
+        Args:
+            other: 另一份统计
+
+        Returns:
+            当前统计
+        """
+        with self._lock:
+            self.requests += other.requests
+            self.succeeded += other.succeeded
+            self.bytes_received += other.bytes_received
+            self.transfer_samples += other.transfer_samples
+            self.bytes_sent += other.bytes_sent
+            self.wire_header_bytes += other.wire_header_bytes
+            self.wire_body_bytes += other.wire_body_bytes
+            self.decoded_body_bytes += other.decoded_body_bytes
+            for encoding, count in other.content_encodings.items():
+                self.content_encodings[encoding] = self.content_encodings.get(encoding, 0) + count
+            for name, count in other.errors_by_type.items():
+                self.errors_by_type[name] = self.errors_by_type.get(name, 0) + count
+            for status, count in other.errors_by_status.items():
+                self.errors_by_status[status] = self.errors_by_status.get(status, 0) + count
+            self.elapsed_s = max(self.elapsed_s, other.elapsed_s)
+            if other.new_connections is not None:
+                self.new_connections = (self.new_connections or 0) + other.new_connections
+                self.reused_connections = (self.reused_connections or 0) + other.reused_connections
+            if other.tls_handshakes is not None:
+                self.tls_handshakes = (self.tls_handshakes or 0) + other.tls_handshakes
+                self.tls_resumed = (self.tls_resumed or 0) + other.tls_resumed
+            if other.http_cache is not None:
+                self._add_cache_stats(other.http_cache)
+            for name, histogram in other.phases.items():
+                self._phase_histogram(name).merge(histogram)
+            for entry in other.slowest:
+                self._push_slowest(entry)
+            self.tcp_samples += other.tcp_samples
+            self.tcp_retransmit_samples += other.tcp_retransmit_samples
+            self.tcp_rtt_total_ms += other.tcp_rtt_total_ms
+            self.tcp_rtt_max_ms = max(self.tcp_rtt_max_ms, other.tcp_rtt_max_ms)
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        生成结果字段
+
+        Returns:
+            吞吐量、有效吞吐量、错误率、错误分类和传输速率，记录了连接统计时还包含新建/复用连接数，
+            建立过 HTTPS 连接时还包含 tls（握手次数、完整握手和恢复会话的握手次数、会话恢复率），
+            客户端统计了传输字节时还包含 transfer（发送和线上接收的字节数、响应体压缩比、Content-Encoding 分布），
+            记录了条件请求缓存统计时还包含 http_cache（条件请求数、304 数及命中率、节省的字节数和时间），
+            记录了阶段耗时时还包含 phases（阶段名称 -> 样本数、平均值、百分位数和最大值），
+            采样了 TCP_INFO 时还包含 tcp_info 汇总，有附加信息时还包含按耗时降序的 slowest_samples
+            及其中各请求的请求ID列表 slowest_request_ids
+        """
+        elapsed = self.elapsed_s
+        summary = {
+            "wall_time_s": elapsed,
+            "failed_requests": self.failed,
+            "error_rate": self.error_rate,
+            "errors_by_type": dict(self.errors_by_type),
+            "errors_by_status": dict(self.errors_by_status),
+            "throughput_rps": self.requests / elapsed if elapsed > 0 else 0,
+            "goodput_rps": self.succeeded / elapsed if elapsed > 0 else 0,
+            "bytes_received": self.bytes_received,
+            "bytes_per_second": self.bytes_received / elapsed if elapsed > 0 else 0,
+        }
+        if self.transfer_samples:
+            wire_bytes = self.wire_header_bytes + self.wire_body_bytes
+            summary["transfer"] = {
+                "requests": self.transfer_samples,
+                "bytes_sent": self.bytes_sent,
+                "wire_bytes_received": wire_bytes,
+                "wire_header_bytes": self.wire_header_bytes,
+                "wire_body_bytes": self.wire_body_bytes,
+                "decoded_body_bytes": self.decoded_body_bytes,
+                "compression_ratio": self.decoded_body_bytes / self.wire_body_bytes if self.wire_body_bytes else 1.0,
+                "content_encodings": dict(self.content_encodings),
+                "sent_bytes_per_second": self.bytes_sent / elapsed if elapsed > 0 else 0,
+                "wire_bytes_per_second": wire_bytes / elapsed if elapsed > 0 else 0,
+            }
+        if self.new_connections is not None:
+            summary["new_connections"] = self.new_connections
+            summary["reused_connections"] = self.reused_connections
+        if self.tls_handshakes is not None:
+            summary["tls"] = {
+                "handshakes": self.tls_handshakes,
+                "full_handshakes": self.tls_handshakes - self.tls_resumed,
+                "resumed_handshakes": self.tls_resumed,
+                "resumption_ratio": self.tls_resumed / self.tls_handshakes if self.tls_handshakes else 0,
+            }
+        if self.http_cache is not None:
+            conditional = self.http_cache.get("conditional_requests", 0)
+            summary["http_cache"] = dict(
+                self.http_cache,
+                hit_ratio=self.http_cache.get("not_modified", 0) / conditional if conditional else 0
+            )
+        if self.phases:
+            order = list(PHASES)
+            summary["phases"] = {
+                name: {
+                    "count": len(histogram),
+                    "avg_ms": histogram.mean,
+                    "p50_ms": histogram.percentile(50),
+                    "p90_ms": histogram.percentile(90),
+                    "p95_ms": histogram.percentile(95),
+                    "p99_ms": histogram.percentile(99),
+                    "max_ms": histogram.max_ms,
+                }
+                for name, histogram in sorted(
+                    self.phases.items(),
+                    key=lambda item: order.index(item[0]) if item[0] in order else len(order)
+                )
+            }
+        if self.tcp_samples:
+            summary["tcp_info"] = {
+                "samples": self.tcp_samples,
+                "retransmit_samples": self.tcp_retransmit_samples,
+                "avg_rtt_ms": self.tcp_rtt_total_ms / self.tcp_samples,
+                "max_rtt_ms": self.tcp_rtt_max_ms,
+            }
+        if self.slowest:
+            summary["slowest_samples"] = [
+                entry[2] for entry in sorted(self.slowest, key=lambda entry: entry[:2], reverse=True)
+            ]
+            summary["slowest_request_ids"] = [
+                request["request_id"] for sample in summary["slowest_samples"]
+                for request in sample["requests"] if "request_id" in request
+            ]
+        return summary
@@ -0,0 +1,279 @@
+"""
+可扩展性分析
+对不同并发级别下测得的吞吐量拟合 Amdahl 定律和通用可扩展性定律（USL），
+求出争用系数和一致性系数，检测响应时间的拐点，并预测未测试级别的吞吐量
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _solve_linear(matrix: List[List[float]], vector: List[float]) -> Optional[List[float]]:
+    """
+    高斯消元（列主元）求解线性方程组
+
+    Args:
+        matrix: 系数矩阵
+        vector: 常数向量
+
+    Returns:
+        解向量，矩阵奇异时返回 None
+    """
+    size = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(size)]
+
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(rows[row][column]))
+        if abs(rows[pivot][column]) < 1e-12:
+            return None
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for row in range(column + 1, size):
+            factor = rows[row][column] / rows[column][column]
+            for k in range(column, size + 1):
+                rows[row][k] -= factor * rows[column][k]
+
+    solution = [0.0] * size
+    for row in range(size - 1, -1, -1):
+        remainder = rows[row][size] - sum(rows[row][k] * solution[k] for k in range(row + 1, size))
+        solution[row] = remainder / rows[row][row]
+    return solution
+
+
+def _least_squares(features: List[List[float]], targets: List[float]) -> Optional[List[float]]:
+    """
+    普通最小二乘（求解正规方程）
+
+    Args:
+        features: 每个样本的特征向量
+        targets: 每个样本的目标值
+
+    Returns:
+        系数向量，无法求解时返回 None
+    """
+    width = len(features[0])
+    normal = [[sum(row[i] * row[j] for row in features) for j in range(width)] for i in range(width)]
+    moment = [sum(row[i] * target for row, target in zip(features, targets)) for i in range(width)]
+    return _solve_linear(normal, moment)
+
+
+class ScalabilityModel:
+    """可扩展性模型 X(N) = λN / (1 + σ(N - 1) + κN(N - 1))
+
+    κ 为 0 时即 Amdahl 定律。λ 为单个并发的吞吐量，σ 为争用（串行化）系数，
+    κ 为一致性（串扰）系数。
+    """
+
+    def __init__(self, name: str, lam: float, sigma: float, kappa: float = 0.0):
+        """
+        初始化模型
+
+        Args:
+            name: 模型名称（amdahl / usl）
+            lam: 单并发吞吐量 λ（请求/秒）
+            sigma: 争用系数 σ
+            kappa: 一致性系数 κ
+        """
+        self.name = name
+        self.lam = lam
+        self.sigma = sigma
+        self.kappa = kappa
+        self.r_squared = 0.0
+
+    def predict(self, concurrency: float) -> float:
+        """
+        预测指定并发数下的吞吐量
+
+        Args:
+            concurrency: 并发数
+
+        Returns:
+            吞吐量（请求/秒）
+        """
+        n = concurrency
+        return self.lam * n / (1 + self.sigma * (n - 1) + self.kappa * n * (n - 1))
+
+    @property
+    def peak_concurrency(self) -> Optional[float]:
+        """吞吐量达到峰值的并发数 sqrt((1 - σ) / κ)，κ 为 0 时吞吐量单调上升，返回 None"""
+        if self.kappa <= 0 or self.sigma >= 1:
+            return None
+        return math.sqrt((1 - self.sigma) / self.kappa)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为结果字典
+
+        Returns:
+            模型参数字典
+        """
+        peak = self.peak_concurrency
+        return {
+            "lambda_rps": self.lam,
+            "sigma": self.sigma,
+            "kappa": self.kappa,
+            "r_squared": self.r_squared,
+            "peak_concurrency": peak,
+            "peak_throughput_rps": self.predict(peak) if peak else None,
+        }
+
+
+def _fit(name: str, points: List[Tuple[float, float]], with_kappa: bool) -> Optional[ScalabilityModel]:
+    """
+    拟合可扩展性模型
+
+    模型可改写为 N / X = α + β(N - 1) + γN(N - 1)，其中 α = 1/λ、β = σ/λ、γ = κ/λ，
+    对其做线性最小二乘即可，不要求测量过 N = 1。系数为负时按 0 处理并去掉该项重新拟合。
+    模型与数据明显不符导致截距 α 不为正时，改用并发数最小的测量点的 N / X 作为 α 再拟合其余系数。
+
+    Args:
+        name: 模型名称
+        points: (并发数, 吞吐量) 列表
+        with_kappa: 是否包含一致性项（USL）
+
+    Returns:
+        拟合得到的模型，数据不足时返回 None
+    """
+    if len(points) < (3 if with_kappa else 2):
+        return None
+
+    points = sorted(points)
+    targets = [n / x for n, x in points]
+    basis = {"alpha": lambda n: 1.0, "sigma": lambda n: n - 1, "kappa": lambda n: n * (n - 1)}
+    terms = {"sigma": True, "kappa": with_kappa}
+    fixed_alpha = None
+
+    while True:
+        columns = ([] if fixed_alpha else ["alpha"]) + [term for term, used in terms.items() if used]
+        coefficients = {"alpha": fixed_alpha or 0.0, "sigma": 0.0, "kappa": 0.0}
+        if columns:
+            solution = _least_squares(
+                [[basis[column](n) for column in columns] for n, _ in points],
+                [target - (fixed_alpha or 0.0) for target in targets]
+            )
+            if solution is None:
+                return None
+            coefficients.update(zip(columns, solution))
+
+        if coefficients["alpha"] <= 0:
+            if fixed_alpha:
+                return None
+            fixed_alpha = targets[0]
+            terms = {"sigma": True, "kappa": with_kappa}
+            continue
+
+        negative = [term for term in ("kappa", "sigma") if terms[term] and coefficients[term] < 0]
+        if not negative:
+            break
+        terms[negative[0]] = False
+
+    alpha, beta, gamma = coefficients["alpha"], coefficients["sigma"], coefficients["kappa"]
+    model = ScalabilityModel(name, 1 / alpha, beta / alpha, gamma / alpha)
+
+    mean = sum(x for _, x in points) / len(points)
+    total = sum((x - mean) ** 2 for _, x in points)
+    residual = sum((x - model.predict(n)) ** 2 for n, x in points)
+    model.r_squared = 1 - residual / total if total > 0 else 1.0
+    return model
+
+
+def fit_amdahl(points: List[Tuple[float, float]]) -> Optional[ScalabilityModel]:
+    """
+    拟合 Amdahl 定律 X(N) = λN / (1 + σ(N - 1))
+
+    Args:
+        points: (并发数, 吞吐量) 列表，至少 2 个点
+
+    Returns:
+        拟合得到的模型，数据不足时返回 None
+    """
+    return _fit("amdahl", points, with_kappa=False)
+
+
+def fit_usl(points: List[Tuple[float, float]]) -> Optional[ScalabilityModel]:
+    """
+    拟合通用可扩展性定律 X(N) = λN / (1 + σ(N - 1) + κN(N - 1))
+
+    Args:
+        points: (并发数, 吞吐量) 列表，至少 3 个点
+
+    Returns:
+        拟合得到的模型，数据不足时返回 None
+    """
+    return _fit("usl", points, with_kappa=True)
+
+
+def find_knee(xs: List[float], ys: List[float]) -> Optional[float]:
+    """
+    查找递增曲线的拐点（Kneedle 方法）
+
+    将两轴归一化到 [0, 1] 后，取曲线位于首尾连线下方最远的点，即响应时间开始急剧上升之前的位置。
+
+    Args:
+        xs: 升序排列的自变量（并发数）
+        ys: 因变量（响应时间）
+
+    Returns:
+        拐点处的自变量，点数不足 3 个或曲线不呈上凹时返回 None
+    """
+    if len(xs) < 3:
+        return None
+
+    x_span = xs[-1] - xs[0]
+    y_span = max(ys) - min(ys)
+    if x_span <= 0 or y_span <= 0:
+        return None
+
+    best, best_gap = None, 0.0
+    for x, y in zip(xs, ys):
+        normalized_x = (x - xs[0]) / x_span
+        normalized_y = (y - min(ys)) / y_span
+        gap = normalized_x - normalized_y
+        if gap > best_gap:
+            best, best_gap = x, gap
+    return best
+
+
+def analyze_scalability(
+    results: Dict[int, Dict[str, Any]],
+    predict_at: Iterable[float] = (),
+    latency_key: str = "p95_ms"
+) -> Dict[str, Any]:
+    """
+    分析不同并发级别的测试结果
+
+    Args:
+        results: batch_concurrent_test 返回的结果（并发数 -> 结果字典，需包含 throughput_rps）
+        predict_at: 需要预测吞吐量的并发数
+        latency_key: 用于拐点检测的响应时间指标
+
+    Returns:
+        分析结果字典，包含测量点、两个模型的参数、响应时间拐点和预测值
+    """
+    levels = sorted(
+        level for level, result in results.items()
+        if result.get("throughput_rps", 0) > 0
+    )
+    points = [(level, results[level]["throughput_rps"]) for level in levels]
+
+    amdahl = fit_amdahl(points)
+    usl = fit_usl(points)
+
+    predictions = {}
+    for level in predict_at:
+        predictions[level] = {
+            "amdahl_rps": amdahl.predict(level) if amdahl else None,
+            "usl_rps": usl.predict(level) if usl else None,
+        }
+
+    return {
+        "points": [
+            {"concurrency": level, "throughput_rps": results[level]["throughput_rps"],
+             latency_key: results[level].get(latency_key, 0)}
+            for level in levels
+        ],
+        "amdahl": amdahl.to_dict() if amdahl else None,
+        "usl": usl.to_dict() if usl else None,
+        "latency_key": latency_key,
+        "knee_concurrency": find_knee(levels, [results[level].get(latency_key, 0) for level in levels]),
+        "predictions": predictions,
+    }
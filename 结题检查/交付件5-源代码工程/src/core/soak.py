@@ -0,0 +1,88 @@
+"""
+耐久（浸泡）测试辅助工具
+按时间间隔轮换的样本记录器，以及用于判断性能是否随时间劣化的最小二乘趋势拟合
+"""
+
+import threading
+from typing import List, Optional, Tuple
+from histogram import LatencyHistogram
+from request_trace import RequestOutcomes, TraceEntry
+
+
+def linear_trend(xs: List[float], ys: List[float]) -> Optional[Tuple[float, float]]:
+    """
+    最小二乘拟合直线 y = slope * x + intercept
+
+    Args:
+        xs: 自变量序列
+        ys: 因变量序列
+
+    Returns:
+        (斜率, 截距)，样本少于 2 个或自变量全部相同时返回 None
+    """
+    n = len(xs)
+    if n < 2 or n != len(ys):
+        return None
+
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return None
+
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    slope = sxy / sxx
+    return slope, mean_y - slope * mean_x
+
+
+class IntervalRecorder:
+    """按时间间隔轮换的样本记录器
+
+    内部只保留两个直方图交替使用：当前间隔写入其中一个，轮换时交出它并切换到另一个，
+    因此无论测试运行多久，内存占用都保持不变。调用结果统计（outcomes）每个间隔新建一份。
+    每次调用在结束时把响应时间和调用结果一起记入当时的间隔，跨越间隔边界的调用整体计入结束时所在的间隔。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = LatencyHistogram()
+        self._spare = LatencyHistogram()
+        self.outcomes = RequestOutcomes()
+
+    def record(
+        self,
+        trace: List[TraceEntry],
+        error: Optional[BaseException] = None,
+        duration_ms: Optional[float] = None
+    ) -> bool:
+        """
+        记录一次调用的结果（参数和返回值与 RequestOutcomes.record 相同）
+
+        Args:
+            trace: 调用期间的追踪记录
+            error: 调用抛出的异常，成功时为 None
+            duration_ms: 调用耗时（毫秒），调用抛出异常时为 None，不计入响应时间
+
+        Returns:
+            调用是否失败或进入了最慢样本
+        """
+        with self._lock:
+            if duration_ms is not None:
+                self._active.record(duration_ms)
+            return self.outcomes.record(trace, error, duration_ms)
+
+    def rotate(self) -> Tuple[LatencyHistogram, RequestOutcomes]:
+        """
+        结束当前间隔并开始新的间隔
+
+        返回的直方图会在下一次轮换时被清空复用，调用方需要在此之前用完。
+
+        Returns:
+            (刚结束间隔的响应时间直方图, 刚结束间隔的调用结果统计)
+        """
+        self._spare.reset()
+        with self._lock:
+            finished, self._active = self._active, self._spare
+            outcomes, self.outcomes = self.outcomes, RequestOutcomes()
+        self._spare = finished
+        return finished, outcomes
@@ -0,0 +1,329 @@
+"""
+本地替身服务器
+模拟 White Jotter 后端的部分接口，用于在没有真实后端时离线验证测试引擎；
+可选使用自签名证书提供 HTTPS（需要 openssl 命令行工具），用于离线测量 TLS 握手和会话恢复
+"""
+
+import gzip
+import hashlib
+import ipaddress
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# 启用压缩时，小于该字节数的响应体不压缩
+COMPRESSION_MIN_BYTES = 256
+
+
+# 替身服务器返回的图书数据
+STAND_IN_BOOKS = [
+    {"id": i, "title": f"测试图书{i}", "author": "测试作者", "cid": i % 6 + 1}
+    for i in range(1, 19)
+]
+
+# 替身服务器返回的图书分类
+STAND_IN_CATEGORIES = [{"id": i, "name": f"分类{i}"} for i in range(1, 7)]
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """替身服务器请求处理器"""
+
+    # 使用 HTTP/1.1 以支持长连接
+    protocol_version = "HTTP/1.1"
+
+    # 响应头和响应体分两次写出，关闭 Nagle 算法以免与客户端的延迟确认叠加出 40ms 等待
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        """HTTPS 时在处理线程中完成 TLS 握手，避免握手阻塞接受新连接的主线程"""
+        if isinstance(self.request, ssl.SSLSocket):
+            self.request.do_handshake()
+        super().setup()
+
+    def do_GET(self):
+        """处理GET请求"""
+        self._handle("GET")
+
+    def do_POST(self):
+        """处理POST请求"""
+        self._handle("POST")
+
+    def do_PUT(self):
+        """处理PUT请求"""
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        """处理DELETE请求"""
+        self._handle("DELETE")
+
+    def _handle(self, method: str):
+        """
+        按路由分发请求
+
+        Args:
+            method: 请求方法
+        """
+        self._started = time.perf_counter()
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        delay_ms = self.server.delay_ms
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+
+        if method == "GET" and parsed.path == "/api/books":
+            self._send_json(200, STAND_IN_BOOKS)
+        elif method == "GET" and parsed.path == "/api/books/search":
+            keyword = query.get("keyword", [""])[0]
+            self._send_json(200, [book for book in STAND_IN_BOOKS if keyword in book["title"]])
+        elif method == "GET" and parsed.path.startswith("/api/books/"):
+            self._handle_book(parsed.path.rsplit("/", 1)[1])
+        elif method == "GET" and parsed.path == "/api/categories":
+            self._send_json(200, STAND_IN_CATEGORIES)
+        elif method == "POST" and parsed.path == "/api/login":
+            self._handle_login(body)
+        else:
+            self._send_json(404, {"code": 404, "message": "Not Found"})
+
+    def _handle_book(self, book_id: str):
+        """
+        按编号返回单本图书
+
+        Args:
+            book_id: 图书编号
+        """
+        book = next((book for book in STAND_IN_BOOKS if str(book["id"]) == book_id), None)
+        if book is None:
+            self._send_json(404, {"code": 404, "message": "Not Found"})
+        else:
+            self._send_json(200, book)
+
+    def _handle_login(self, body: bytes):
+        """
+        处理登录请求，用户名和密码非空即视为登录成功
+
+        Args:
+            body: 请求体
+        """
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            data = {}
+
+        if data.get("username") and data.get("password"):
+            self._send_json(200, {"code": 200, "result": data["username"]},
+                            {"Set-Cookie": f"JSESSIONID=stand-in-{data['username']}; Path=/"})
+        else:
+            self._send_json(400, {"code": 400, "message": "账号或密码错误"})
+
+    def _send_json(self, status: int, data, headers=None):
+        """
+        发送JSON响应
+
+        Args:
+            status: 响应状态码
+            data: 响应数据
+            headers: 额外的响应头
+        """
+        content = json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+        # 支持条件请求时，GET 的成功响应带上 ETag，客户端的 If-None-Match 与之相同时返回 304
+        if self.server.conditional and self.command == "GET" and status == 200:
+            etag = f'"{hashlib.sha1(content).hexdigest()[:16]}"'
+            headers = dict(headers or {}, ETag=etag)
+            if self.headers.get("If-None-Match") == etag:
+                status, content = 304, b""
+
+        # 启用压缩且客户端接受 gzip 时压缩较大的响应体（ETag 按压缩前的内容计算）
+        if (self.server.compression and len(content) >= COMPRESSION_MIN_BYTES
+                and "gzip" in self.headers.get("Accept-Encoding", "")):
+            content = gzip.compress(content)
+            headers = dict(headers or {}, **{"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", "application/json;charset=UTF-8")
+            self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+        self.server.write_access_log(self, status, len(content))
+
+    def log_message(self, format, *args):
+        """关闭默认的访问日志输出"""
+        pass
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    """替身HTTP服务器（每个连接一个线程）"""
+
+    daemon_threads = True
+
+    # 加大监听队列，避免高并发测试时连接被拒绝
+    request_queue_size = 1024
+
+    # 访问日志文件，为 None 时不记录
+    access_log = None
+
+    def write_access_log(self, handler: StandInRequestHandler, status: int, size: int):
+        """
+        按 Tomcat AccessLogValve 的 '%h - - %t "%r" %s %b %{X-Request-ID}i %D' 格式写一行访问日志
+        （%D 为处理耗时，单位毫秒，保留 3 位小数）
+
+        Args:
+            handler: 请求处理器
+            status: 响应状态码
+            size: 响应体字节数
+        """
+        if self.access_log is None:
+            return
+        elapsed_ms = (time.perf_counter() - handler._started) * 1000
+        request_id = handler.headers.get("X-Request-ID") or "-"
+        line = (f'{handler.client_address[0]} - - [{handler.log_date_time_string()}] "{handler.requestline}" '
+                f'{status} {size or "-"} {request_id} {elapsed_ms:.3f}\n')
+        with self.access_log_lock:
+            self.access_log.write(line)
+            self.access_log.flush()
+
+    def handle_error(self, request, client_address):
+        """客户端在 TLS 握手或请求过程中断开属于正常情况，不输出异常堆栈"""
+        logger.debug(f"替身服务器连接异常: {client_address}", exc_info=True)
+
+
+def generate_self_signed_cert(directory: str, host: str = "127.0.0.1") -> tuple:
+    """
+    用 openssl 命令行工具生成自签名证书（ECDSA P-256，有效期 1 天）
+
+    Args:
+        directory: 证书和私钥的保存目录
+        host: 证书的主机名或 IP 地址（同时写入 subjectAltName，另外包含 localhost）
+
+    Returns:
+        (证书文件路径, 私钥文件路径)；证书同时作为客户端校验用的 CA 证书
+
+    Raises:
+        RuntimeError: 找不到 openssl 或生成失败
+    """
+    openssl = shutil.which("openssl")
+    if openssl is None:
+        raise RuntimeError("生成自签名证书需要 openssl 命令行工具")
+
+    try:
+        ipaddress.ip_address(host)
+        alt_names = f"IP:{host},DNS:localhost"
+    except ValueError:
+        alt_names = f"DNS:{host},DNS:localhost"
+    cert_file = os.path.join(directory, "stand_in_cert.pem")
+    key_file = os.path.join(directory, "stand_in_key.pem")
+    result = subprocess.run(
+        [
+            openssl, "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1",
+            "-nodes", "-days", "1", "-subj", f"/CN={host}", "-addext", f"subjectAltName={alt_names}",
+            "-keyout", key_file, "-out", cert_file,
+        ],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"生成自签名证书失败: {result.stderr.strip()}")
+    return cert_file, key_file
+
+
+class StandInServer:
+    """本地替身服务器，可作为上下文管理器使用"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        delay_ms: float = 0,
+        conditional: bool = True,
+        compression: bool = False,
+        tls: bool = False,
+        access_log: Optional[str] = None
+    ):
+        """
+        初始化替身服务器
+
+        Args:
+            host: 监听地址
+            port: 监听端口（0 表示自动分配）
+            delay_ms: 每个请求的模拟处理时间（毫秒）
+            conditional: 是否支持条件请求（ETag / If-None-Match）
+            compression: 客户端接受 gzip 时是否压缩响应体（不小于 COMPRESSION_MIN_BYTES 的）
+            tls: 是否使用自签名证书提供 HTTPS，客户端需以 ca_file 作为 CA 证书校验（如 HttpClient(verify=server.ca_file)）
+            access_log: 访问日志文件路径（Tomcat 格式，带 X-Request-ID 和处理耗时，可用 log_join 与测试结果关联）
+        """
+        self.host = host
+        self.port = port
+        self.delay_ms = delay_ms
+        self.conditional = conditional
+        self.compression = compression
+        self.tls = tls
+        self.access_log = access_log
+        self.ca_file = None
+        self._cert_dir = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """服务器基础URL"""
+        return f"{'https' if self.tls else 'http'}://{self.host}:{self.port}"
+
+    def start(self):
+        """启动服务器（在后台线程中运行）"""
+        self._server = StandInHTTPServer((self.host, self.port), StandInRequestHandler)
+        self._server.delay_ms = self.delay_ms
+        self._server.conditional = self.conditional
+        self._server.compression = self.compression
+        if self.access_log:
+            self._server.access_log = open(self.access_log, "a", encoding="utf-8")
+            self._server.access_log_lock = threading.Lock()
+        self.port = self._server.server_address[1]
+        if self.tls:
+            self._cert_dir = tempfile.mkdtemp(prefix="stand_in_tls_")
+            self.ca_file, key_file = generate_self_signed_cert(self._cert_dir, self.host)
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.ca_file, key_file)
+            self._server.socket = context.wrap_socket(
+                self._server.socket, server_side=True, do_handshake_on_connect=False
+            )
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"替身服务器已启动: {self.base_url}")
+
+    def stop(self):
+        """停止服务器"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if self._server.access_log is not None:
+                self._server.access_log.close()
+            self._server = None
+            logger.info(f"替身服务器已停止: {self.base_url}")
+        if self._cert_dir is not None:
+            shutil.rmtree(self._cert_dir, ignore_errors=True)
+            self._cert_dir = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,63 @@
+"""
+TCP_INFO 采样
+在 Linux 上通过 getsockopt(TCP_INFO) 读取连接的内核统计（RTT、RTT 方差、重传次数、拥塞窗口），
+用于区分慢请求是网络（丢包重传、RTT 抖动）还是服务端造成的
+"""
+
+import socket
+import struct
+from typing import Any, Dict, Optional
+
+# struct tcp_info 的前 104 字节（Linux 2.6 起稳定的部分）：
+# 8 个 u8（state, ca_state, retransmits, probes, backoff, options, wscale, 标志位），
+# 之后 24 个 u32（rto, ato, snd_mss, rcv_mss, unacked, sacked, lost, retrans, fackets,
+# last_data_sent, last_ack_sent, last_data_recv, last_ack_recv, pmtu, rcv_ssthresh,
+# rtt, rttvar, snd_ssthresh, snd_cwnd, advmss, reordering, rcv_rtt, rcv_space, total_retrans）
+_TCP_INFO_FORMAT = "8B24I"
+_TCP_INFO_SIZE = struct.calcsize(_TCP_INFO_FORMAT)
+
+_U8_COUNT = 8
+_RETRANSMITS = 2
+_LOST = _U8_COUNT + 6
+_RTT = _U8_COUNT + 15
+_RTTVAR = _U8_COUNT + 16
+_SND_CWND = _U8_COUNT + 18
+_TOTAL_RETRANS = _U8_COUNT + 23
+
+
+def is_supported() -> bool:
+    """当前平台是否支持读取 TCP_INFO（仅 Linux）"""
+    return hasattr(socket, "TCP_INFO")
+
+
+def read_tcp_info(sock) -> Optional[Dict[str, Any]]:
+    """
+    读取套接字的 TCP_INFO
+
+    Args:
+        sock: 已连接的套接字（也可以是 ssl.SSLSocket）
+
+    Returns:
+        包含 rtt_ms、rttvar_ms、retransmits（当前未确认段的重传次数）、lost、
+        total_retrans（连接累计重传段数）和 snd_cwnd（拥塞窗口，单位为段）的字典；
+        平台不支持、套接字已关闭或读取失败时返回 None
+    """
+    if sock is None or not is_supported():
+        return None
+
+    try:
+        raw = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, _TCP_INFO_SIZE)
+    except (OSError, ValueError):
+        return None
+    if len(raw) < _TCP_INFO_SIZE:
+        return None
+
+    fields = struct.unpack(_TCP_INFO_FORMAT, raw[:_TCP_INFO_SIZE])
+    return {
+        "rtt_ms": fields[_RTT] / 1000,
+        "rttvar_ms": fields[_RTTVAR] / 1000,
+        "retransmits": fields[_RETRANSMITS],
+        "lost": fields[_LOST],
+        "total_retrans": fields[_TOTAL_RETRANS],
+        "snd_cwnd": fields[_SND_CWND],
+    }
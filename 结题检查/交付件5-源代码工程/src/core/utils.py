@@ -4,36 +4,205 @@
 """
 
 import os
+import copy
 import time
 import json
+import threading
 from datetime import datetime
-from typing import Dict, Any, Optional
+from string import Formatter
+from typing import Callable, Dict, Any, List, Optional
+from urllib.parse import quote, urlencode, urlsplit
 import requests
+from requests.structures import CaseInsensitiveDict
 from config import (
     BASE_URL, API_BASE_URL, REQUEST_TIMEOUT, 
-    SCREENSHOT_DIR, AUTO_SCREENSHOT
+    SCREENSHOT_DIR, AUTO_SCREENSHOT,
+    HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK, HTTP_KEEP_ALIVE, TCP_INFO_SAMPLING, HTTP_TRANSPORT,
+    HTTP_CACHE_ENABLED, HTTP_COMPRESSION, TLS_VERIFY, TLS_SESSION_RESUMPTION, REQUEST_ID_HEADER
 )
 from logger import get_logger
+from connection_pool import PooledHTTPAdapter
+from raw_transport import RawResponse, RawTransport
+from http_cache import ConditionalCache
+from tcp_info import is_supported as tcp_info_supported
+import request_trace
 
 logger = get_logger(__name__)
 
 
+def _request_wire_size(request: requests.PreparedRequest) -> int:
+    """
+    估算请求报文的字节数（请求行、请求头、urllib3 补充的 Host 头和请求体）
+    
+    Args:
+        request: 已发送的请求
+    
+    Returns:
+        请求报文字节数
+    """
+    size = len(f"{request.method} {request.path_url} HTTP/1.1\r\n".encode("utf-8"))
+    size += sum(len(name) + len(str(value)) + 4 for name, value in request.headers.items())
+    if "Host" not in request.headers:
+        size += len(f"Host: {urlsplit(request.url).netloc}\r\n")
+    size += 2
+    if isinstance(request.body, (bytes, str)):
+        size += len(request.body.encode("utf-8") if isinstance(request.body, str) else request.body)
+    return size
+
+
+def _declared_length(response) -> int:
+    """响应头中的 Content-Length（没有或无效时为 0），用于调用方流式读取、响应体尚未读取的响应"""
+    try:
+        return max(int(response.headers.get("Content-Length", 0)), 0)
+    except ValueError:
+        return 0
+
+
+def _transfer_stats(response, body_read: bool = True) -> Dict[str, Any]:
+    """
+    统计一次调用在线上传输的字节数（包括被跟随的重定向）
+    
+    requests 传输层的响应头字节数由状态行和响应头重新计算，响应体字节数取自 urllib3 已读取的原始字节数，
+    两者都不含分块编码的分隔行；raw 传输层由连接在读取时计数。
+    
+    Args:
+        response: requests.Response 或 RawResponse
+        body_read: 最终响应的响应体是否已读取；未读取（调用方流式读取）时取 Content-Length，不读取响应体
+    
+    Returns:
+        包含 request_bytes、header_bytes、body_bytes 和 encoding 的字典
+    """
+    if isinstance(response, RawResponse):
+        return {
+            "request_bytes": response.request_bytes,
+            "header_bytes": response.wire_header_bytes,
+            "body_bytes": response.wire_body_bytes,
+            "encoding": response.headers.get("Content-Encoding", "identity").lower(),
+        }
+    
+    stats = {"request_bytes": 0, "header_bytes": 0, "body_bytes": 0}
+    for hop in response.history + [response]:
+        raw = hop.raw
+        stats["request_bytes"] += _request_wire_size(hop.request)
+        stats["header_bytes"] += len(f"HTTP/1.1 {hop.status_code} {hop.reason}\r\n".encode("utf-8")) + 2
+        headers = raw.headers.items() if raw is not None else hop.headers.items()
+        stats["header_bytes"] += sum(len(name) + len(value.encode("utf-8")) + 4 for name, value in headers)
+        read = raw.tell() if raw is not None and hasattr(raw, "tell") else 0
+        if not read:
+            read = len(hop.content) if body_read or hop is not response else _declared_length(hop)
+        stats["body_bytes"] += read
+    stats["encoding"] = response.headers.get("Content-Encoding", "identity").lower()
+    return stats
+
+
 class HttpClient:
     """HTTP客户端封装"""
     
-    def __init__(self, base_url=API_BASE_URL, timeout=REQUEST_TIMEOUT):
+    def __init__(
+        self,
+        base_url=API_BASE_URL,
+        timeout=REQUEST_TIMEOUT,
+        pool_size: int = HTTP_POOL_MAXSIZE,
+        pool_block: bool = HTTP_POOL_BLOCK,
+        keep_alive: bool = HTTP_KEEP_ALIVE,
+        tcp_info: bool = TCP_INFO_SAMPLING,
+        transport: str = HTTP_TRANSPORT,
+        cache: Any = HTTP_CACHE_ENABLED,
+        compression: Optional[bool] = HTTP_COMPRESSION,
+        verify: Any = TLS_VERIFY,
+        tls_resumption: bool = TLS_SESSION_RESUMPTION,
+        request_id_header: Optional[str] = REQUEST_ID_HEADER
+    ):
         """
         初始化HTTP客户端
         
         Args:
             base_url: 基础URL
             timeout: 请求超时时间
+            pool_size: 每个主机保留的连接数，应不小于并发数，否则多出的连接用完即被丢弃
+            pool_block: 连接用尽时是否阻塞等待空闲连接（否则临时新建连接）
+            keep_alive: 是否使用长连接，为 False 时每个请求都发送 Connection: close
+            tcp_info: 是否在每个请求收到响应后读取连接的 TCP_INFO（RTT、重传、拥塞窗口，仅 Linux），
+                结果附加到该请求上，性能测试结果的最慢样本中会带上这些信息
+            transport: 传输层，"requests" 或 "raw"。raw 直接在长连接套接字上收发 HTTP/1.1 报文，
+                每个请求的客户端开销远低于 requests，但只支持 params、json、data、headers 和 timeout 参数，
+                不跟随重定向，返回 RawResponse；另外支持 pipeline() 流水线请求。仅供性能测试引擎使用
+            cache: 是否为 GET 请求启用条件请求缓存（ETag/Last-Modified），也可以传入 ConditionalCache
+                以指定容量和有效期或在多个客户端之间共享；复制出的客户端共享同一个缓存
+            compression: 是否请求压缩的响应体（gzip、deflate），None 时保持传输层的默认行为
+                （requests 请求压缩，raw 不请求压缩）。两种传输层都会解压响应体，
+                性能测试结果的 transfer 中可以对比线上传输的字节数和解压后的字节数
+            verify: HTTPS 证书校验，True 按 requests 的默认规则（会话设置和 REQUESTS_CA_BUNDLE 等环境变量），
+                也可以是 CA 证书路径（如自签名的替身服务器证书）或 False
+            tls_resumption: 新建 HTTPS 连接时是否恢复之前握手得到的 TLS 会话。
+                与 keep_alive=False 一起设为 False 时每个请求都进行一次完整的 TLS 握手
+            request_id_header: 携带请求ID的请求头名称，每个请求生成一个唯一ID，随请求结果记录，
+                性能测试结果的最慢样本中带有请求ID，可用 log_join 与服务器访问日志关联；为空时不发送
         """
+        if transport not in ("requests", "raw"):
+            raise ValueError(f"未知的传输层: {transport}")
         self.base_url = base_url
         self.timeout = timeout
-        self.session = requests.Session()
+        self.pool_size = pool_size
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.tcp_info = tcp_info
+        self.transport = transport
+        self.compression = compression
+        self.verify = verify
+        self.tls_resumption = tls_resumption
+        self.request_id_header = request_id_header
+        if tcp_info and not tcp_info_supported():
+            logger.warning("当前平台不支持读取 TCP_INFO，tcp_info 采样不会产生数据")
+        self.session = self._new_session()
+        self.raw = self._new_raw_transport()
+        if isinstance(cache, ConditionalCache):
+            self.cache = cache
+        else:
+            self.cache = ConditionalCache() if cache else None
         self.cookies = {}
     
+    def _new_session(self) -> requests.Session:
+        """
+        按连接池配置创建会话
+        
+        Returns:
+            新的会话
+        """
+        session = requests.Session()
+        adapter = PooledHTTPAdapter(
+            pool_maxsize=self.pool_size, pool_block=self.pool_block, tcp_info=self.tcp_info,
+            tls_resumption=self.tls_resumption
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        if self.compression is not None:
+            session.headers["Accept-Encoding"] = "gzip, deflate" if self.compression else "identity"
+        return session
+    
+    def _new_raw_transport(self) -> Optional[RawTransport]:
+        """
+        按传输层配置创建低开销传输
+        
+        Returns:
+            使用 raw 传输层时为新的 RawTransport，否则为 None
+        """
+        if self.transport != "raw":
+            return None
+        verify = self.session.merge_environment_settings(self.base_url, {}, None, self._verify_setting(), None)["verify"]
+        return RawTransport(self.pool_size, self.timeout, verify, self.tls_resumption)
+    
+    def _verify_setting(self) -> Any:
+        """
+        每个请求传给 requests 的 verify 参数
+        
+        Returns:
+            verify 为 True 时返回 None（由 requests 合并会话设置和环境变量），否则返回 verify
+        """
+        return None if self.verify is True else self.verify
+    
     def set_cookies(self, cookies: Dict[str, str]):
         """
         设置cookies
@@ -48,16 +217,152 @@ class HttpClient:
         """
         获取当前cookies
         
+        同名cookie可能同时以服务器设置的域和 set_cookies 设置的空域存在（如 login 保存cookies后），
+        此时取后设置的值，不按 requests 的规则抛出 CookieConflictError
+        
         Returns:
             cookies字典
         """
-        return dict(self.session.cookies)
+        return self.session.cookies.get_dict()
     
     def clear_cookies(self):
         """清除cookies"""
         self.session.cookies.clear()
         self.cookies = {}
     
+    def reset_session(self):
+        """
+        重建底层会话（保留当前cookies）
+        
+        用于多进程测试：fork 出的子进程会继承父进程连接池中的套接字，必须换用新的会话
+        """
+        cookies = self.get_cookies()
+        self.session = self._new_session()
+        self.session.cookies.update(cookies)
+        self.raw = self._new_raw_transport()
+    
+    def clone(
+        self,
+        keep_alive: Optional[bool] = None,
+        compression: Optional[bool] = None,
+        tls_resumption: Optional[bool] = None
+    ) -> "HttpClient":
+        """
+        复制一个使用独立会话的客户端，复制当前的请求头、cookies 和认证信息（即登录状态）
+        
+        Args:
+            keep_alive: 新客户端是否使用长连接，为 None 时与当前客户端相同
+            compression: 新客户端是否请求压缩的响应体，为 None 时与当前客户端相同
+            tls_resumption: 新客户端新建 HTTPS 连接时是否恢复 TLS 会话，为 None 时与当前客户端相同
+        
+        Returns:
+            新的HTTP客户端，与当前客户端不共享连接池和 cookie 容器
+        """
+        client = copy.copy(self)
+        if keep_alive is not None:
+            client.keep_alive = keep_alive
+        if compression is not None:
+            client.compression = compression
+        if tls_resumption is not None:
+            client.tls_resumption = tls_resumption
+        client.session = client._new_session()
+        client.raw = client._new_raw_transport()
+        # Connection 头由长连接设置决定，指定了压缩设置时 Accept-Encoding 头也不从当前会话复制
+        skipped = {"connection"} if compression is None else {"connection", "accept-encoding"}
+        client.session.headers.update(
+            (name, value) for name, value in self.session.headers.items() if name.lower() not in skipped
+        )
+        client.session.cookies.update(self.session.cookies)
+        client.session.auth = self.session.auth
+        client.session.verify = self.session.verify
+        client.session.cert = self.session.cert
+        client.session.proxies.update(self.session.proxies)
+        client.cookies = dict(self.cookies)
+        return client
+    
+    def close(self):
+        """关闭底层会话及其连接池中的连接"""
+        self.session.close()
+        if self.raw is not None:
+            self.raw.close()
+    
+    def _connection_pool(self, url: Optional[str] = None):
+        """
+        获取指定URL所在主机的连接池（与实际发送请求时使用的是同一个连接池）
+        
+        Args:
+            url: 目标URL，默认为基础URL
+        
+        Returns:
+            urllib3 连接池
+        """
+        request = requests.Request("GET", url or self.base_url).prepare()
+        # 连接池按 TLS 校验、代理等参数区分，需与 Session.request 一样合并环境变量中的设置
+        settings = self.session.merge_environment_settings(request.url, {}, None, self._verify_setting(), None)
+        adapter = self.session.get_adapter(request.url)
+        return adapter.get_connection_with_tls_context(
+            request, settings["verify"], settings["proxies"], settings["cert"]
+        )
+    
+    def warm_up(self, connections: int, url: Optional[str] = None) -> int:
+        """
+        预先建立连接并放入连接池，使测量窗口内的请求直接复用已建立的连接
+        
+        Args:
+            connections: 需要预建的连接数（超过连接池大小的部分会被丢弃）
+            url: 目标URL，默认为基础URL
+        
+        Returns:
+            实际放入连接池的连接数
+        """
+        if self.raw is not None:
+            opened = self.raw.warm_up(url or self.base_url, connections)
+            logger.debug(f"连接池预热完成: {opened} 个连接")
+            return opened
+        
+        pool = self._connection_pool(url)
+        connections = min(connections, self.pool_size)
+        
+        # 先全部取出再统一放回，保证取到的是不同的连接
+        opened = []
+        try:
+            for _ in range(connections):
+                conn = pool._get_conn()
+                if conn.is_closed:
+                    conn.connect()
+                opened.append(conn)
+        finally:
+            for conn in opened:
+                pool._put_conn(conn)
+        
+        logger.debug(f"连接池预热完成: {len(opened)} 个连接")
+        return len(opened)
+    
+    def connection_stats(self) -> Dict[str, int]:
+        """
+        获取连接池累计的请求数、新建连接数和 TLS 握手次数
+        
+        Returns:
+            包含 requests（请求数）和 new_connections（新建连接数）的字典，
+            建立过 HTTPS 连接时还包含 tls_handshakes（握手次数）和 tls_resumed（恢复会话的握手次数）
+        """
+        stats = {"requests": 0, "new_connections": 0}
+        for adapter in set(self.session.adapters.values()):
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is not None:
+                    stats["requests"] += pool.num_requests
+                    stats["new_connections"] += getattr(pool, "num_connects", pool.num_connections)
+                    tls_context = getattr(pool, "tls_context", None)
+                    for name, value in (tls_context.stats() if tls_context is not None else {}).items():
+                        stats[name] = stats.get(name, 0) + value
+        if self.raw is not None:
+            stats["requests"] += self.raw.num_requests
+            stats["new_connections"] += self.raw.num_connects
+            for name, value in self.raw.tls_stats().items():
+                stats[name] = stats.get(name, 0) + value
+        return stats
+    
     def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
         """
         发送HTTP请求
@@ -65,7 +370,7 @@ class HttpClient:
         Args:
             method: 请求方法（GET, POST, PUT, DELETE等）
             endpoint: API端点
-            **kwargs: 其他请求参数
+            **kwargs: 其他请求参数；启用了条件请求缓存时，可用 cache=False 跳过缓存
         
         Returns:
             requests.Response: 响应对象
@@ -75,18 +380,230 @@ class HttpClient:
         # 设置默认超时
         if 'timeout' not in kwargs:
             kwargs['timeout'] = self.timeout
+        # raw 传输层在创建时已按 verify 设置 SSLContext
+        if self.verify is not True and self.raw is None:
+            kwargs.setdefault('verify', self.verify)
+        
+        kwargs['headers'], request_id = request_trace.tag_request(kwargs.get('headers'), self.request_id_header)
+        
+        use_cache = kwargs.pop('cache', True)
+        if self.cache is not None and use_cache and method.upper() == 'GET' and not kwargs.get('stream'):
+            key = self.cache.key(url, kwargs.get('params'), self._credential_headers(kwargs))
+            kwargs['headers'] = self.cache.conditional_headers(key, kwargs.get('headers'))
+            start = time.perf_counter()
+            response = self._dispatch(method, url, kwargs, request_id)
+            return self.cache.update(key, response, (time.perf_counter() - start) * 1000)
+        return self._dispatch(method, url, kwargs, request_id)
+    
+    def _credential_headers(self, kwargs: Dict[str, Any]) -> CaseInsensitiveDict:
+        """
+        一次请求实际携带的请求头中与用户相关的部分（会话和本次请求的请求头，以及 cookies 合成的 Cookie 请求头），
+        用于条件请求缓存按用户区分缓存项
         
-        logger.debug(f"发送 {method} 请求: {url}")
+        Args:
+            kwargs: 请求参数
+        
+        Returns:
+            请求头
+        """
+        headers = CaseInsensitiveDict(self.session.headers)
+        headers.update(kwargs.get('headers') or {})
+        cookies = dict(self.session.cookies.get_dict(), **(kwargs.get('cookies') or {}))
+        if cookies and 'Cookie' not in headers:
+            headers['Cookie'] = "; ".join(f"{name}={value}" for name, value in sorted(cookies.items()))
+        return headers
+    
+    def _dispatch(
+        self,
+        method: str,
+        url: str,
+        kwargs: Dict[str, Any],
+        request_id: Optional[str] = None
+    ) -> requests.Response:
+        """
+        通过当前传输层发送请求
+        
+        Args:
+            method: 请求方法
+            url: 请求URL
+            kwargs: 请求参数（已设置超时）
+            request_id: 请求ID（已加入请求头）
+        
+        Returns:
+            requests.Response: 响应对象
+        """
+        logger.debug("发送 %s 请求: %s", method, url)
         if 'json' in kwargs:
-            logger.debug(f"请求数据: {kwargs['json']}")
+            logger.debug("请求数据: %s", kwargs['json'])
+        
+        if self.raw is not None:
+            headers, body, url = self._raw_request_parts(url, kwargs)
+            timeout = kwargs['timeout']
+            if isinstance(timeout, tuple):
+                timeout = max(value for value in timeout if value)
+            # 响应体已由传输层读取并计时
+            return self._send_traced(
+                url, lambda: self._raw_send(method, url, headers, body, timeout), stream=True, request_id=request_id
+            )
+        
+        # 以流式方式发送，收到响应头后再单独计时读取响应体；连接各阶段由连接池中的连接对象记录
+        stream = kwargs.get('stream', False)
+        kwargs['stream'] = True
+        return self._send_traced(url, lambda: self.session.request(method, url, **kwargs), stream, request_id)
+    
+    def _raw_request_parts(self, url: str, kwargs: Dict[str, Any]) -> tuple:
+        """
+        按 requests 的规则把请求参数转换为 raw 传输层的请求头、请求体和URL
+        
+        Args:
+            url: 请求URL
+            kwargs: 请求参数
+        
+        Returns:
+            (请求头, 请求体, 带查询字符串的URL)
+        """
+        unsupported = set(kwargs) - {"params", "json", "data", "headers", "timeout", "stream"}
+        if unsupported:
+            raise TypeError(f"raw 传输层不支持参数: {', '.join(sorted(unsupported))}")
+        
+        headers = dict(self.session.headers)
+        # raw 传输层只能解压 gzip 和 deflate，未指定压缩设置时请求不压缩的响应，省去解压开销
+        if self.compression is None:
+            headers["Accept-Encoding"] = "identity"
+        headers.update(kwargs.get("headers") or {})
+        if self.session.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.session.cookies.items())
+        
+        if kwargs.get("params"):
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(kwargs['params'], doseq=True)}"
+        
+        body = kwargs.get("data")
+        if isinstance(body, dict):
+            body = urlencode(body, doseq=True)
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        elif body is None and kwargs.get("json") is not None:
+            body = RequestTemplate.encode_json(kwargs["json"])
+            headers.setdefault("Content-Type", "application/json")
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        return headers, body, url
+    
+    def _raw_send(self, method: str, url: str, headers: Dict[str, str], body: Optional[bytes], timeout) -> RawResponse:
+        """
+        通过 raw 传输层发送请求，并把响应中的 Set-Cookie 写入会话
+        
+        Returns:
+            RawResponse: 响应对象
+        """
+        response = self.raw.request(method, url, headers, body, timeout)
+        self._store_raw_cookies(response)
+        return response
+    
+    def _store_raw_cookies(self, response: RawResponse):
+        """
+        把 raw 响应的 Set-Cookie 写入会话（只保留名称和值，不处理域、路径和过期时间）
+        
+        Args:
+            response: raw 响应
+        """
+        for name, value in response.raw_headers:
+            if name.lower() == "set-cookie":
+                cookie_name, _, cookie_value = value.split(";", 1)[0].partition("=")
+                self.session.cookies.set(cookie_name.strip(), cookie_value.strip())
+    
+    def pipeline(self, method: str, endpoints: List[str], **kwargs) -> List[RawResponse]:
+        """
+        在同一个连接上以 HTTP/1.1 流水线方式发送多个请求（仅 raw 传输层）
+        
+        整组请求作为一次调用计时，每个响应分别计入请求结果统计，不记录分阶段耗时。
+        
+        Args:
+            method: 请求方法
+            endpoints: API端点列表（必须属于同一主机）
+            **kwargs: 每个请求共用的参数（同 request）
+        
+        Returns:
+            与端点顺序一致的响应列表
+        """
+        if self.raw is None:
+            raise RuntimeError("流水线请求需要使用 raw 传输层（transport=\"raw\"）")
         
+        kwargs.setdefault('timeout', self.timeout)
+        calls = []
+        request_ids = []
+        for endpoint in endpoints:
+            url = f"{self.base_url}{endpoint}" if not endpoint.startswith('http') else endpoint
+            headers, request_id = request_trace.tag_request(kwargs.get('headers'), self.request_id_header)
+            headers, body, url = self._raw_request_parts(url, dict(kwargs, headers=headers))
+            calls.append((method, url, headers, body))
+            request_ids.append(request_id)
+        
+        logger.debug("流水线发送 %d 个 %s 请求", len(calls), method)
+        try:
+            responses = self.raw.pipeline(calls, kwargs['timeout'])
+        except requests.exceptions.RequestException as e:
+            logger.error("请求失败: %s", e)
+            raise
+        
+        for response, request_id in zip(responses, request_ids):
+            self._store_raw_cookies(response)
+            request_trace.record_response(
+                response.status_code, len(response.content),
+                details={"request_id": request_id} if request_id else None, transfer=_transfer_stats(response)
+            )
+        return responses
+    
+    def _send_traced(
+        self,
+        url: str,
+        send: Callable[[], requests.Response],
+        stream: bool = False,
+        request_id: Optional[str] = None
+    ) -> requests.Response:
+        """
+        发送请求并记录各阶段耗时和响应结果
+        
+        Args:
+            url: 请求URL
+            send: 以流式方式发送请求并返回响应的函数
+            stream: 调用方是否要求流式读取响应体（否则在这里读取并计时）；流式读取时不读取响应体，
+                响应体字节数取自 Content-Length（分块传输时为 0，压缩时为压缩后的大小）
+            request_id: 请求ID，提供时与请求的客户端总耗时一起记入附加信息
+        
+        Returns:
+            requests.Response: 响应对象
+        """
+        request_trace.begin_request()
+        sent_at = time.perf_counter_ns()
         try:
-            response = self.session.request(method, url, **kwargs)
-            logger.debug(f"响应状态码: {response.status_code}")
-            return response
+            response = send()
+            if not stream:
+                start = time.perf_counter_ns()
+                response.content
+                request_trace.record_phase("body", time.perf_counter_ns() - start)
         except requests.exceptions.RequestException as e:
-            logger.error(f"请求失败: {str(e)}")
+            request_trace.end_request()
+            logger.error("请求失败: %s", e)
             raise
+        
+        # raw 传输层的响应体总是已由传输层读取
+        body_read = not stream or isinstance(response, RawResponse)
+        length = len(response.content) if body_read else _declared_length(response)
+        if request_id:
+            request_trace.record_detail("request_id", request_id)
+            request_trace.record_detail("elapsed_ms", (time.perf_counter_ns() - sent_at) / 1e6)
+        phases, details = request_trace.end_request()
+        # 复用连接时没有连接阶段，按 0 计入，使各阶段的样本数一致
+        for phase in ("dns", "connect"):
+            phases.setdefault(phase, 0)
+        if url.startswith("https"):
+            phases.setdefault("tls", 0)
+        
+        logger.debug("响应状态码: %d", response.status_code)
+        request_trace.record_response(
+            response.status_code, length, phases, details, _transfer_stats(response, body_read)
+        )
+        return response
     
     def get(self, endpoint: str, **kwargs) -> requests.Response:
         """GET请求"""
@@ -103,6 +620,349 @@ class HttpClient:
     def delete(self, endpoint: str, **kwargs) -> requests.Response:
         """DELETE请求"""
         return self.request('DELETE', endpoint, **kwargs)
+    
+    def template(self, method: str, endpoint: str, **kwargs) -> "RequestTemplate":
+        """
+        创建请求模板，请求只准备一次，之后可多次发送
+        
+        例如 client.template("GET", "/api/books/{id}").send(id=3)
+        
+        Args:
+            method: 请求方法
+            endpoint: API端点，可包含 {name} 形式的路径参数
+            **kwargs: 固定的请求参数（headers、params、json、data 等，同 requests.Request）
+        
+        Returns:
+            请求模板
+        """
+        return RequestTemplate(self, method, endpoint, **kwargs)
+
+
+class RequestTemplate:
+    """预先准备好的请求
+    
+    创建时完成一次 URL 拼接、会话请求头和 cookies 合并、请求体编码和环境变量设置合并，
+    每次发送只复制准备好的请求并替换变化的部分（路径参数、查询参数、请求头、请求体），
+    省去 requests 每次调用的完整准备流程。
+    
+    会话的请求头和 cookies 在创建时确定，登录状态变化后需重新创建模板。
+    请求通过客户端的传输层发送（raw 传输层时同样使用 raw），客户端启用了条件请求缓存时 GET 请求同样经过缓存。
+    持有 client 属性，send 可直接作为被测函数，也可配合 worker_local 为每个工作线程使用独立会话。
+    """
+    
+    def __init__(self, client: HttpClient, method: str, endpoint: str, **kwargs):
+        """
+        初始化请求模板
+        
+        Args:
+            client: HTTP客户端
+            method: 请求方法
+            endpoint: API端点，可包含 {name} 形式的路径参数
+            **kwargs: 固定的请求参数（headers、params、json、data 等，同 requests.Request），
+                另可指定 timeout 和 allow_redirects
+        """
+        self.client = client
+        self.method = method.upper()
+        self.timeout = kwargs.pop("timeout", client.timeout)
+        self.allow_redirects = kwargs.pop("allow_redirects", True)
+        self.fields = [field for _, field, _, _ in Formatter().parse(endpoint) if field]
+        
+        url = f"{client.base_url}{endpoint}" if not endpoint.startswith('http') else endpoint
+        self.prepared = client.session.prepare_request(requests.Request(self.method, url, **kwargs))
+        # 与 HttpClient 的 raw 请求相同：未指定压缩设置时请求不压缩的响应
+        explicit_encoding = "Accept-Encoding" in (kwargs.get("headers") or {})
+        if client.raw is not None and client.compression is None and not explicit_encoding:
+            self.prepared.headers["Accept-Encoding"] = "identity"
+        # 路径参数的花括号在准备时被编码，还原后每次发送时按参数格式化
+        self.url = self.prepared.url.replace("%7B", "{").replace("%7D", "}") if self.fields else self.prepared.url
+        settings = client.session.merge_environment_settings(
+            self.prepared.url, {}, None, client._verify_setting(), None
+        )
+        self.send_kwargs = {
+            "timeout": self.timeout,
+            "allow_redirects": self.allow_redirects,
+            "verify": settings["verify"],
+            "proxies": settings["proxies"],
+            "cert": settings["cert"],
+        }
+    
+    @staticmethod
+    def encode_json(data: Any) -> bytes:
+        """
+        按 requests 的方式将数据编码为 JSON 请求体，用于预先编码需要多次发送的请求体
+        
+        Args:
+            data: 要编码的数据
+        
+        Returns:
+            UTF-8 编码的 JSON
+        """
+        return json.dumps(data, allow_nan=False).encode("utf-8")
+    
+    def prepare(
+        self,
+        params: Optional[Dict[str, Any]] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        **path_params
+    ) -> requests.PreparedRequest:
+        """
+        基于模板生成一个待发送的请求
+        
+        Args:
+            params: 追加的查询参数
+            body: 替换的请求体，bytes 和 str 原样发送，其他类型按 JSON 编码
+            headers: 追加或覆盖的请求头
+            **path_params: 路径参数
+        
+        Returns:
+            准备好的请求
+        """
+        request = self.prepared.copy()
+        if self.fields:
+            request.url = self.url.format(**{
+                name: quote(str(value), safe="") for name, value in path_params.items()
+            })
+        if params:
+            request.url = f"{request.url}{'&' if '?' in request.url else '?'}{urlencode(params, doseq=True)}"
+        if headers:
+            request.headers.update(headers)
+        if body is not None:
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            elif not isinstance(body, bytes):
+                body = self.encode_json(body)
+                request.headers.setdefault("Content-Type", "application/json")
+            request.body = body
+            request.headers["Content-Length"] = str(len(body))
+        return request
+    
+    def send(
+        self,
+        params: Optional[Dict[str, Any]] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        **path_params
+    ) -> requests.Response:
+        """
+        发送一次模板请求，参数同 prepare
+        
+        Returns:
+            requests.Response: 响应对象
+        """
+        request = self.prepare(params, body, headers, **path_params)
+        request_id = None
+        header = self.client.request_id_header
+        if header:
+            request_id = request.headers.get(header) or request_trace.new_request_id()
+            request.headers[header] = request_id
+        logger.debug("发送 %s 请求: %s", self.method, request.url)
+        
+        cache = self.client.cache
+        if cache is None or self.method != "GET":
+            return self._dispatch(request, request_id)
+        # 准备好的请求已包含会话的请求头和 cookies
+        key = cache.key(request.url, headers=request.headers)
+        request.headers.update(cache.conditional_headers(key))
+        start = time.perf_counter()
+        response = self._dispatch(request, request_id)
+        return cache.update(key, response, (time.perf_counter() - start) * 1000)
+    
+    def _dispatch(self, request: requests.PreparedRequest, request_id: Optional[str]) -> requests.Response:
+        """
+        通过客户端当前的传输层发送准备好的请求
+        
+        Args:
+            request: 准备好的请求
+            request_id: 请求ID（已加入请求头）
+        
+        Returns:
+            requests.Response: 响应对象（raw 传输层时为 RawResponse）
+        """
+        client = self.client
+        if client.raw is not None:
+            timeout = self.timeout
+            if isinstance(timeout, tuple):
+                timeout = max(value for value in timeout if value)
+            body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+            headers = dict(request.headers)
+            # 响应体已由传输层读取并计时
+            return client._send_traced(
+                request.url, lambda: client._raw_send(self.method, request.url, headers, body, timeout),
+                stream=True, request_id=request_id
+            )
+        session = client.session
+        return client._send_traced(
+            request.url, lambda: session.send(request, stream=True, **self.send_kwargs), request_id=request_id
+        )
+
+
+def find_http_client(func: Callable) -> Optional[HttpClient]:
+    """
+    查找被测函数使用的HTTP客户端
+
+    被测函数通常是 HttpClient 或持有 client 属性的对象（如 BaseTest）的绑定方法，
+    也可以是引用了 HttpClient 的闭包。
+
+    Args:
+        func: 被测函数
+
+    Returns:
+        HTTP客户端，找不到时返回 None
+    """
+    owner = getattr(func, "__self__", None)
+    client = owner if isinstance(owner, HttpClient) else getattr(owner, "client", None)
+    if isinstance(client, HttpClient):
+        return client
+
+    for cell in getattr(func, "__closure__", None) or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            continue
+        if isinstance(value, HttpClient):
+            return value
+    return None
+
+
+def rebind_http_client(func: Callable, client: HttpClient) -> Callable:
+    """
+    将使用 HttpClient 的绑定方法重新绑定到另一个客户端
+    
+    方法属于 HttpClient 时直接绑定到新客户端；属于持有 client 属性的对象（如 BaseTest）时，
+    绑定到该对象的浅拷贝，拷贝的 client 替换为新客户端，原对象不受影响。
+    
+    Args:
+        func: HttpClient 或持有 client 属性的对象的绑定方法
+        client: 新的HTTP客户端
+    
+    Returns:
+        使用新客户端的绑定方法
+    """
+    owner = getattr(func, "__self__", None)
+    if owner is None or find_http_client(func) is None:
+        raise TypeError(f"被测函数不是 HttpClient 或持有 client 的对象的绑定方法: {func!r}")
+    
+    if isinstance(owner, HttpClient):
+        target = client
+    else:
+        target = copy.copy(owner)
+        target.client = client
+    return func.__func__.__get__(target, type(target))
+
+
+class WorkerLocal:
+    """工作线程独立会话的被测函数
+    
+    包装使用共享 HttpClient 的绑定方法（如 BaseTest.get_books 或 HttpClient.get）：
+    每个线程第一次调用时复制一份客户端（保留 cookies 和登录状态），并把方法重新绑定到
+    持有该副本的对象上，此后该线程的所有调用都复用这份会话。
+    """
+    
+    def __init__(self, func: Callable):
+        """
+        初始化
+        
+        Args:
+            func: 被测函数，必须是 HttpClient 或持有 client 属性的对象的绑定方法
+        """
+        owner = getattr(func, "__self__", None)
+        client = find_http_client(func)
+        if owner is None or client is None:
+            raise TypeError(f"无法为被测函数创建线程独立会话，需要 HttpClient 或持有 client 的对象的绑定方法: {func!r}")
+        
+        self.func = func
+        self.owner = owner
+        self.client = client
+        self.clients: List[HttpClient] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # 线程本地状态和已创建的副本不跨进程传递，子进程中重新创建
+        return {"func": self.func, "owner": self.owner, "client": self.client}
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.clients = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def attach(self) -> Callable:
+        """
+        为当前线程创建（或取回已创建的）独立会话
+        
+        Returns:
+            绑定到当前线程独立会话的方法
+        """
+        bound = getattr(self._local, "bound", None)
+        if bound is None:
+            client = self.client.clone()
+            bound = rebind_http_client(self.func, client)
+            self._local.bound = bound
+            with self._lock:
+                self.clients.append(client)
+        return bound
+    
+    def __call__(self, *args, **kwargs):
+        return self.attach()(*args, **kwargs)
+    
+    @property
+    def cache(self) -> Optional[ConditionalCache]:
+        """条件请求缓存（各线程的独立会话共享原客户端的缓存）"""
+        return self.client.cache
+    
+    def warm_up(self, connections: int = 1) -> int:
+        """
+        为已创建的每个独立会话预建连接
+        
+        Args:
+            connections: 每个会话预建的连接数
+        
+        Returns:
+            实际预建的连接总数
+        """
+        with self._lock:
+            clients = list(self.clients)
+        return sum(client.warm_up(connections) for client in clients)
+    
+    def connection_stats(self) -> Dict[str, int]:
+        """
+        汇总所有独立会话的连接池统计
+        
+        Returns:
+            包含 requests 和 new_connections 的字典
+        """
+        stats = {"requests": 0, "new_connections": 0}
+        with self._lock:
+            clients = list(self.clients)
+        for client in clients:
+            for key, value in client.connection_stats().items():
+                stats[key] = stats.get(key, 0) + value
+        return stats
+    
+    def close(self):
+        """关闭所有独立会话，之后再调用会重新创建"""
+        with self._lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            client.close()
+        self._local = threading.local()
+
+
+def worker_local(func: Callable) -> WorkerLocal:
+    """
+    将使用共享 HttpClient 的绑定方法转换为每个工作线程使用独立会话的可调用对象
+    
+    例如 perf.concurrent_test(worker_local(self.get_books), 11, 5)
+    
+    Args:
+        func: HttpClient 或持有 client 属性的对象（如 BaseTest）的绑定方法
+    
+    Returns:
+        工作线程独立会话的被测函数
+    """
+    return func if isinstance(func, WorkerLocal) else WorkerLocal(func)
 
 
 class TimeUtils:
@@ -243,9 +1103,9 @@ class AssertUtils:
             AssertionError: 如果断言失败
         """
         passed = actual == expected
-        logger.info(f"断言相等 {'✓' if passed else '✗'} - 期望: {expected}, 实际: {actual}")
+        logger.info("断言相等 %s - 期望: %s, 实际: %s", '✓' if passed else '✗', expected, actual)
         if message:
-            logger.info(f"断言消息: {message}")
+            logger.info("断言消息: %s", message)
         
         if not passed:
             raise AssertionError(f"{message} - 期望: {expected}, 实际: {actual}")
@@ -262,9 +1122,9 @@ class AssertUtils:
         Raises:
             AssertionError: 如果断言失败
         """
-        logger.info(f"断言为真 {'✓' if condition else '✗'}")
+        logger.info("断言为真 %s", '✓' if condition else '✗')
         if message:
-            logger.info(f"断言消息: {message}")
+            logger.info("断言消息: %s", message)
         
         if not condition:
             raise AssertionError(f"{message} - 条件为假")
@@ -281,9 +1141,9 @@ class AssertUtils:
         Raises:
             AssertionError: 如果断言失败
         """
-        logger.info(f"断言为假 {'✓' if not condition else '✗'}")
+        logger.info("断言为假 %s", '✓' if not condition else '✗')
         if message:
-            logger.info(f"断言消息: {message}")
+            logger.info("断言消息: %s", message)
         
         if condition:
             raise AssertionError(f"{message} - 条件为真")
@@ -302,9 +1162,9 @@ class AssertUtils:
             AssertionError: 如果断言失败
         """
         passed = item in collection
-        logger.info(f"断言包含 {'✓' if passed else '✗'} - 元素: {item}")
+        logger.info("断言包含 %s - 元素: %s", '✓' if passed else '✗', item)
         if message:
-            logger.info(f"断言消息: {message}")
+            logger.info("断言消息: %s", message)
         
         if not passed:
             raise AssertionError(f"{message} - {item} 不在集合中")
@@ -324,9 +1184,9 @@ class AssertUtils:
         """
         actual_code = response.status_code
         passed = actual_code == expected_code
-        logger.info(f"断言状态码 {'✓' if passed else '✗'} - 期望: {expected_code}, 实际: {actual_code}")
+        logger.info("断言状态码 %s - 期望: %d, 实际: %d", '✓' if passed else '✗', expected_code, actual_code)
         if message:
-            logger.info(f"断言消息: {message}")
+            logger.info("断言消息: %s", message)
         
         if not passed:
             raise AssertionError(f"{message} - 期望状态码: {expected_code}, 实际: {actual_code}")
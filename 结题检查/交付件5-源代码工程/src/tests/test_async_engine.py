@@ -0,0 +1,65 @@
+"""
+异步性能测试引擎测试
+使用本地替身服务器验证异步引擎的结果格式与线程引擎一致，以及异步客户端跟随同步客户端的登录状态
+"""
+
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from async_performance_test import AsyncPerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+# 只有线程引擎才有的字段：每轮发送时间差（常驻工作线程）和 HttpClient 的连接复用、传输字节统计
+THREAD_ENGINE_ONLY = {"send_spread_avg_ms", "send_spread_max_ms", "new_connections", "reused_connections", "transfer"}
+
+
+class TestAsyncEngine(BaseTest):
+    """异步性能测试引擎测试类"""
+
+    @pytest.mark.performance
+    def test_result_shape_matches_thread_engine(self):
+        """异步引擎的结果应包含线程引擎的全部通用字段，请求数和失败数一致"""
+        self.log_test_case("PERF-ASYNC-02", "异步引擎结果格式")
+
+        with StandInServer(delay_ms=5) as server:
+            self.client = HttpClient(server.base_url)
+            async_result = AsyncPerformanceTest().concurrent_test(self.async_get_books, 4, 5)
+            thread_result = PerformanceTest().concurrent_test(self.get_books, 4, 5)
+
+        self.log_step(f"线程引擎独有字段: {sorted(set(thread_result) - set(async_result))}")
+
+        self.assert_utils.assert_equals(
+            set(async_result), set(thread_result) - THREAD_ENGINE_ONLY, "异步引擎应返回与线程引擎相同的结果字段"
+        )
+        for key in ("concurrency", "iterations", "total_requests", "failed_requests"):
+            self.assert_utils.assert_equals(async_result[key], thread_result[key], f"{key} 应一致")
+        self.assert_utils.assert_equals(async_result["total_requests"], 20, "全部请求都应记录")
+        self.assert_utils.assert_true(async_result["p95_ms"] >= 5, "响应时间应包含服务器延迟")
+
+    @pytest.mark.performance
+    def test_async_client_follows_sync_login(self):
+        """通过同步辅助方法登录、切换用户或清除cookies后，异步客户端应使用同步客户端当前的会话"""
+        self.log_test_case("PERF-ASYNC-03", "异步客户端会话同步")
+
+        with StandInServer() as server:
+            self.client = HttpClient(server.base_url)
+            self.assert_utils.assert_equals(self.async_client.get_cookies(), {}, "登录前不应有会话")
+
+            self.login("alice", "secret")
+            self.assert_utils.assert_equals(
+                self.async_client.get_cookies(), {"JSESSIONID": "stand-in-alice"}, "同步登录后异步客户端应使用新会话"
+            )
+
+            self.client.clear_cookies()
+            self.login("bob", "secret")
+            self.assert_utils.assert_equals(
+                self.async_client.get_cookies(), {"JSESSIONID": "stand-in-bob"}, "切换用户后异步客户端应使用新会话"
+            )
+
+            self.client.clear_cookies()
+            self.assert_utils.assert_equals(self.async_client.get_cookies(), {}, "清除cookies后异步客户端也应清除")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
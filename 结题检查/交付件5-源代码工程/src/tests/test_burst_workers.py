@@ -0,0 +1,83 @@
+"""
+常驻突发工作线程测试
+使用本地替身服务器验证并发测试的工作线程在各轮迭代间复用、每轮请求在屏障处被同时释放、
+每个线程写入自己的缓冲区（样本无丢失），以及结果报告每轮的发送时间差
+"""
+
+import threading
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+class CallRecorder:
+    """记录每次调用所在的线程，再发出请求"""
+
+    def __init__(self, client: HttpClient):
+        self.client = client
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str):
+        with self._lock:
+            self.calls.append((threading.get_ident(), threading.current_thread().name))
+        return self.client.get(endpoint)
+
+
+class TestBurstWorkers(BaseTest):
+    """常驻突发工作线程测试类"""
+
+    @pytest.mark.performance
+    def test_workers_reused_across_bursts(self):
+        """同一组工作线程执行全部迭代，每轮每个线程恰好一次调用，全部样本都被记录"""
+        self.log_test_case("PERF-BURST-01", "工作线程复用与屏障释放")
+
+        concurrency, iterations = 4, 10
+        with StandInServer(delay_ms=5) as server:
+            recorder = CallRecorder(HttpClient(server.base_url))
+            result = PerformanceTest().concurrent_test(
+                recorder.get, concurrency, iterations, "/api/books/1", keep_samples=True
+            )
+
+        idents = [ident for ident, _ in recorder.calls]
+        self.log_step(f"线程: {sorted(set(name for _, name in recorder.calls))}")
+
+        self.assert_utils.assert_equals(len(set(idents)), concurrency, "全部迭代应由同一组工作线程执行")
+        self.assert_utils.assert_true(
+            all(idents.count(ident) == iterations for ident in set(idents)), "每个工作线程每轮应恰好调用一次"
+        )
+        self.assert_utils.assert_true(
+            all(name.startswith("burst-worker-") for _, name in recorder.calls), "调用应在常驻工作线程中执行"
+        )
+        # 下一轮在本轮全部完成后才释放，按调用顺序每 concurrency 次调用恰好来自所有线程各一次
+        bursts = [idents[i:i + concurrency] for i in range(0, len(idents), concurrency)]
+        self.assert_utils.assert_true(
+            all(len(set(burst)) == concurrency for burst in bursts), "每轮所有线程应在屏障处一起被释放"
+        )
+        self.assert_utils.assert_equals(result["total_requests"], concurrency * iterations, "全部请求都应记录")
+        self.assert_utils.assert_equals(
+            len(result["all_durations"]), concurrency * iterations, "每个线程缓冲区中的样本都应收集到"
+        )
+
+    @pytest.mark.performance
+    def test_send_spread_reported(self):
+        """结果应报告每轮最早与最晚发送时间之差的平均值和最大值"""
+        self.log_test_case("PERF-BURST-02", "发送时间差")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url)
+            result = PerformanceTest().concurrent_test(client.get, 4, 10, "/api/books/1")
+
+        self.log_step(f"发送时间差 平均 {result['send_spread_avg_ms']:.3f} ms, 最大 {result['send_spread_max_ms']:.3f} ms")
+
+        self.assert_utils.assert_true(
+            0 <= result["send_spread_avg_ms"] <= result["send_spread_max_ms"], "平均发送时间差不应超过最大值"
+        )
+        self.assert_utils.assert_true(result["send_spread_max_ms"] > 0, "多个线程的发送时间不可能完全相同")
+        self.assert_utils.assert_true(result["send_spread_max_ms"] < 100, "同一轮的请求应几乎同时发出")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,104 @@
+"""
+容量搜索测试
+使用容量固定的模拟服务验证指数探测、二分查找和边界确认，
+并用返回合成结果的测试引擎验证确认失败后的重新二分和错误率上限的判断
+"""
+
+import threading
+import time
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+
+
+class SyntheticPerformanceTest(PerformanceTest):
+    """按级别返回合成结果的测试引擎：不超过 stable 的级别总是满足 SLO，
+    stable 到 flaky 之间的级别只有第一次测量满足（模拟探测时满足、重复测试不稳定的边界）"""
+
+    def __init__(self, stable: int, flaky: int, error_rate: float = 0.0):
+        super().__init__()
+        self.stable = stable
+        self.flaky = flaky
+        self.error_rate = error_rate
+        self.measured = set()
+
+    def concurrent_test(self, func, concurrency=1, iterations=1, *args, **kwargs):
+        passed = concurrency <= self.stable or (concurrency <= self.flaky and concurrency not in self.measured)
+        self.measured.add(concurrency)
+        return {"avg_time_ms": 1, "p95_ms": 1 if passed else 1000, "p99_ms": 1,
+                "error_rate": self.error_rate, "throughput_rps": concurrency}
+
+
+class TestCapacitySearch(BaseTest):
+    """容量搜索测试类"""
+
+    @pytest.mark.performance
+    @pytest.mark.slow
+    def test_finds_highest_concurrency_within_slo(self):
+        """
+        模拟服务同时只能处理 4 个请求、每个耗时 20ms：
+        并发不超过 8 时最多排队一轮（约 40ms），超过 8 时至少 60ms，P95 上限 50ms 下容量应为 8
+        """
+        self.log_test_case("PERF-CAP-01", "容量搜索")
+
+        workers = threading.Semaphore(4)
+
+        def limited_service():
+            with workers:
+                time.sleep(0.02)
+
+        result = PerformanceTest().capacity_search(
+            limited_service,
+            max_p95_time_ms=50,
+            iterations=3,
+            limit=64
+        )
+
+        self.assert_utils.assert_equals(result["capacity"], 8, "容量应为 8")
+        self.assert_utils.assert_equals(result["confirm_pass_rate"], 1.0, "边界级别应全部确认通过")
+
+        levels = [point["level"] for point in result["curve"]]
+        self.assert_utils.assert_true({1, 2, 4, 8, 16}.issubset(levels), "应包含指数探测的各级别")
+        self.assert_utils.assert_true(
+            all(not point["passed"] for point in result["curve"] if point["level"] > 8),
+            "超过容量的级别都不应满足 SLO"
+        )
+
+    @pytest.mark.performance
+    def test_failed_confirmation_rebisects(self):
+        """边界级别确认失败时应在起始级别与该级别之间重新二分，而不是逐级下调"""
+        self.log_test_case("PERF-CAP-02", "确认失败后重新二分")
+
+        engine = SyntheticPerformanceTest(stable=430, flaky=500)
+        result = engine.capacity_search(lambda: None, max_p95_time_ms=100, limit=1024)
+
+        confirms = [point for point in result["curve"] if point["phase"] == "confirm"]
+        self.log_step(f"确认级别: {sorted(set(point['level'] for point in confirms))}, 测量次数: {result['evaluations']}")
+
+        self.assert_utils.assert_equals(result["capacity"], 430, "容量应为重复测试稳定满足 SLO 的最高级别")
+        self.assert_utils.assert_equals(result["confirm_pass_rate"], 1.0, "容量级别应全部确认通过")
+        self.assert_utils.assert_true(result["evaluations"] < 60, "重新二分的测量次数应为对数级")
+        self.assert_utils.assert_true(
+            all(sum(point["level"] == level and not point["passed"] for point in confirms) <= 1
+                for level in set(point["level"] for point in confirms)),
+            "每个级别第一次确认失败后应停止该级别的重复测试"
+        )
+
+    @pytest.mark.performance
+    def test_error_rate_limit_is_exclusive(self):
+        """错误率须严格小于上限：恰好等于上限的级别不满足 SLO"""
+        self.log_test_case("PERF-CAP-03", "错误率上限")
+
+        at_limit = SyntheticPerformanceTest(64, 64, error_rate=0.001).capacity_search(
+            lambda: None, max_p95_time_ms=100, max_error_rate=0.001, limit=64
+        )
+        below_limit = SyntheticPerformanceTest(64, 64, error_rate=0.0009).capacity_search(
+            lambda: None, max_p95_time_ms=100, max_error_rate=0.001, limit=64
+        )
+
+        self.assert_utils.assert_equals(at_limit["capacity"], None, "错误率等于上限时不应满足 SLO")
+        self.assert_utils.assert_equals(below_limit["capacity"], 64, "错误率低于上限时应满足 SLO")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
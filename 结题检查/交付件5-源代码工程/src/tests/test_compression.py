@@ -0,0 +1,101 @@
+"""
+传输字节与压缩测试
+验证每个请求的线上传输字节数和 Content-Encoding 统计、压缩开启与关闭的对比测试、raw 传输层的 gzip 解压，
+以及流式请求的响应体不被提前读取
+"""
+
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+class TestCompression(BaseTest):
+    """传输字节与压缩测试类"""
+
+    @pytest.mark.performance
+    def test_transfer_accounting(self):
+        """未压缩的响应，线上传输的响应体字节数应等于解码后的字节数"""
+        self.log_test_case("PERF-BYTES-01", "传输字节统计")
+
+        with StandInServer() as server:
+            for transport in ("requests", "raw"):
+                client = HttpClient(server.base_url, transport=transport, compression=False)
+                result = PerformanceTest().concurrent_test(client.get, 1, 3, "/api/books")
+                client.close()
+                transfer = result["transfer"]
+                self.log_step(f"{transport}: {transfer}")
+
+                self.assert_utils.assert_equals(transfer["requests"], 3, "每个请求都应统计传输字节")
+                self.assert_utils.assert_equals(transfer["wire_body_bytes"], result["bytes_received"],
+                                                "未压缩时线上响应体字节数应等于解码后的字节数")
+                self.assert_utils.assert_equals(transfer["content_encodings"], {"identity": 3},
+                                                "应记录响应的 Content-Encoding")
+                self.assert_utils.assert_true(transfer["bytes_sent"] > 0, "应统计请求报文字节数")
+                self.assert_utils.assert_true(transfer["wire_bytes_received"] > result["bytes_received"],
+                                              "线上接收的字节数应包含响应头")
+
+    @pytest.mark.performance
+    def test_compression_comparison(self):
+        """请求压缩时线上传输的响应体应明显小于不压缩时，解码后的内容不变"""
+        self.log_test_case("PERF-BYTES-02", "压缩开启与关闭对比")
+
+        with StandInServer(compression=True, conditional=False) as server:
+            client = HttpClient(server.base_url)
+            results = PerformanceTest().compression_comparison(client.get, 2, 5, "/api/books")
+
+        compressed = results["compressed"]["transfer"]
+        uncompressed = results["uncompressed"]["transfer"]
+        self.log_step(f"压缩: {compressed['wire_body_bytes']} 字节, 不压缩: {uncompressed['wire_body_bytes']} 字节")
+
+        self.assert_utils.assert_equals(compressed["content_encodings"], {"gzip": 10}, "应收到 gzip 压缩的响应")
+        self.assert_utils.assert_equals(uncompressed["content_encodings"], {"identity": 10}, "应收到未压缩的响应")
+        self.assert_utils.assert_equals(compressed["decoded_body_bytes"], uncompressed["decoded_body_bytes"],
+                                        "解码后的字节数应相同")
+        self.assert_utils.assert_true(compressed["wire_body_bytes"] < uncompressed["wire_body_bytes"],
+                                      "压缩后线上传输的响应体应更小")
+        self.assert_utils.assert_true(compressed["compression_ratio"] > 2, "图书列表的压缩比应大于 2")
+        self.assert_utils.assert_true(
+            all(result["client_cpu_ms_per_request"] > 0 for result in results.values()),
+            "应统计每请求的 CPU 时间"
+        )
+
+    @pytest.mark.performance
+    def test_raw_transport_decompression(self):
+        """raw 传输层应解压 gzip 响应体，结果与 requests 传输层一致"""
+        self.log_test_case("PERF-BYTES-03", "raw 传输层解压")
+
+        with StandInServer(compression=True) as server:
+            reference = HttpClient(server.base_url, compression=True).get("/api/books")
+            raw = HttpClient(server.base_url, transport="raw", compression=True)
+            actual = raw.get("/api/books")
+            raw.close()
+
+        self.assert_utils.assert_equals(actual.headers.get("Content-Encoding"), "gzip", "应收到 gzip 压缩的响应")
+        self.assert_utils.assert_equals(actual.content, reference.content, "解压后的响应体应与 requests 一致")
+        self.assert_utils.assert_true(actual.wire_body_bytes < len(actual.content), "线上传输的响应体应小于解压后的")
+
+    @pytest.mark.performance
+    def test_streamed_body_not_read(self):
+        """调用方流式读取时，统计字节数不应读取响应体，响应体字节数取自 Content-Length"""
+        self.log_test_case("PERF-BYTES-04", "流式请求不读取响应体")
+
+        responses = []
+        with StandInServer() as server:
+            client = HttpClient(server.base_url, compression=False)
+            result = PerformanceTest().concurrent_test(
+                lambda endpoint: responses.append(client.get(endpoint, stream=True)), 1, 3, "/api/books"
+            )
+            consumed = [response._content_consumed for response in responses]
+            lengths = [len(response.content) for response in responses]
+
+        self.log_step(f"响应体已读取: {consumed}, 统计的字节数: {result['bytes_received']}")
+        self.assert_utils.assert_equals(consumed, [False] * 3, "流式请求的响应体应留给调用方读取")
+        self.assert_utils.assert_equals(result["bytes_received"], sum(lengths), "响应体字节数应取自 Content-Length")
+        self.assert_utils.assert_equals(result["transfer"]["wire_body_bytes"], sum(lengths),
+                                        "线上响应体字节数应取自 Content-Length")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
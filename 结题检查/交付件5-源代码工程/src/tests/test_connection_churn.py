@@ -0,0 +1,61 @@
+"""
+长连接与连接抖动对比测试
+验证每请求新建连接模式的连接数、TIME_WAIT 监控，以及 /proc/net/tcp 的解析
+"""
+
+import sys
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from port_monitor import count_sockets
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+# /proc/net/tcp 格式的样例：一个监听套接字、一个已建立连接和两个 TIME_WAIT（其中一个本地端口不在临时端口范围内）
+PROC_NET_TCP_SAMPLE = [
+    "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode",
+    "   0: 0100007F:1F90 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 1001",
+    "   1: 0100007F:9C40 0100007F:1F90 01 00000000:00000000 00:00000000 00000000     0        0 1002",
+    "   2: 0100007F:9C41 0100007F:1F90 06 00000000:00000000 03:00001770 00000000     0        0 0",
+    "   3: 0100007F:0050 0100007F:9C42 06 00000000:00000000 03:00001770 00000000     0        0 0",
+]
+
+
+class TestConnectionChurn(BaseTest):
+    """长连接与连接抖动对比测试类"""
+
+    @pytest.mark.performance
+    def test_keep_alive_comparison(self):
+        """长连接只为每个并发建立一次连接，关闭长连接时每个请求都新建连接并留下 TIME_WAIT"""
+        self.log_test_case("PERF-CHURN-01", "长连接与连接抖动对比")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url)
+            results = PerformanceTest().keep_alive_comparison(client.get, 4, 5, "/api/books")
+
+        keep_alive, churn = results["keep-alive"], results["churn"]
+        self.log_step(f"新建连接 长连接: {keep_alive['new_connections']}, 抖动: {churn['new_connections']}")
+
+        self.assert_utils.assert_equals(list(results), ["keep-alive", "churn"], "应分别测试两种模式")
+        self.assert_utils.assert_equals(churn["failed_requests"], 0, "不应有失败请求")
+        self.assert_utils.assert_equals(keep_alive["new_connections"], 4, "长连接模式每个并发只应建立一个连接")
+        self.assert_utils.assert_equals(churn["new_connections"], 20, "抖动模式每个请求都应新建连接")
+        self.assert_utils.assert_equals(client.connection_stats()["requests"], 0, "原客户端不应发送请求")
+        if sys.platform.startswith("linux"):
+            self.assert_utils.assert_true(churn["ports"]["peak_time_wait"] >= 1, "抖动模式应留下 TIME_WAIT 套接字")
+            self.assert_utils.assert_true(churn["ports"]["samples"] >= 2, "应至少采样基线和结束时各一次")
+
+    @pytest.mark.performance
+    def test_count_sockets(self):
+        """只统计本地端口在临时端口范围内的非监听套接字"""
+        self.log_test_case("PERF-CHURN-02", "/proc/net/tcp 解析")
+
+        in_use, time_wait = count_sockets(PROC_NET_TCP_SAMPLE, (32768, 60999))
+
+        self.assert_utils.assert_equals(in_use, 2, "监听套接字和非临时端口不应计入占用")
+        self.assert_utils.assert_equals(time_wait, 1, "应统计临时端口范围内的 TIME_WAIT")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,71 @@
+"""
+HTTP连接池测试
+验证连接池大小不足时连接被丢弃重建并在结果中报告缺口，连接池足够大并预热后测量窗口内的请求全部复用已有连接
+"""
+
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+class TestConnectionPool(BaseTest):
+    """HTTP连接池测试类"""
+
+    CONCURRENCY = 11
+
+    @pytest.mark.performance
+    def test_undersized_pool_reopens_connections(self):
+        """连接池小于并发数时，多出的连接用完即被丢弃，每轮都要重新建立"""
+        self.log_test_case("PERF-POOL-01", "连接池过小时的连接重建")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url, pool_size=2)
+            result = PerformanceTest().concurrent_test(
+                client.get, self.CONCURRENCY, 3, "/api/books", warm_up=True
+            )
+
+        self.log_step(f"新建连接: {result['new_connections']}, 复用连接: {result['reused_connections']}")
+        self.assert_utils.assert_equals(result["failed_requests"], 0, "不应有失败请求")
+        self.assert_utils.assert_true(
+            result["new_connections"] > self.CONCURRENCY,
+            "连接池过小时新建连接数应超过并发数"
+        )
+        self.assert_utils.assert_equals(result["pool_shortfall"], self.CONCURRENCY - 2, "结果应报告连接池的缺口")
+        self.assert_utils.assert_equals(result["warmed_connections"], 2, "预热只能建立连接池大小的连接")
+
+    @pytest.mark.performance
+    def test_warmed_pool_reuses_all_connections(self):
+        """连接池不小于并发数并预热后，测量窗口内不应新建任何连接"""
+        self.log_test_case("PERF-POOL-02", "预热连接池的连接复用")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url, pool_size=16)
+            result = PerformanceTest().concurrent_test(
+                client.get, self.CONCURRENCY, 3, "/api/books", warm_up=True
+            )
+
+        self.log_step(f"新建连接: {result['new_connections']}, 复用连接: {result['reused_connections']}")
+        self.assert_utils.assert_equals(result["new_connections"], 0, "测量窗口内不应新建连接")
+        self.assert_utils.assert_equals(result["warmed_connections"], self.CONCURRENCY, "应预建与并发数相同的连接")
+        self.assert_utils.assert_true("pool_shortfall" not in result, "连接池足够大时不应报告缺口")
+        self.assert_utils.assert_equals(
+            result["reused_connections"], self.CONCURRENCY * 3, "所有请求都应复用已有连接"
+        )
+
+    @pytest.mark.performance
+    def test_keep_alive_disabled_opens_connection_per_request(self):
+        """关闭长连接后每个请求都新建连接"""
+        self.log_test_case("PERF-POOL-03", "关闭长连接")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url, keep_alive=False)
+            result = PerformanceTest().concurrent_test(client.get, 4, 3, "/api/books")
+
+        self.assert_utils.assert_equals(result["new_connections"], 12, "每个请求都应新建连接")
+        self.assert_utils.assert_equals(result["reused_connections"], 0, "不应复用连接")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,68 @@
+"""
+协调遗漏校正测试
+使用本地替身服务器验证并发测试按期望请求间隔输出校正后的统计数据，
+以及偶发停顿被原始统计掩盖时，按校正后的数据验证会得出不同结论
+"""
+
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+class StallingCaller:
+    """大部分请求发往快速服务器，每 stall_every 次调用发往慢速服务器一次（模拟偶发停顿）"""
+
+    def __init__(self, fast: HttpClient, slow: HttpClient, stall_every: int):
+        self.fast = fast
+        self.slow = slow
+        self.stall_every = stall_every
+        self.calls = 0
+
+    def get(self, endpoint: str):
+        self.calls += 1
+        client = self.slow if self.calls % self.stall_every == 0 else self.fast
+        return client.get(endpoint)
+
+
+class TestCoordinatedOmission(BaseTest):
+    """协调遗漏校正测试类"""
+
+    @pytest.mark.performance
+    def test_corrected_statistics_change_the_verdict(self):
+        """停顿远大于期望间隔时，校正后的 P95 应包含停顿期间本应发出的请求，验证结论随 use_corrected 改变"""
+        self.log_test_case("PERF-CO-02", "协调遗漏校正与性能验证")
+
+        perf = PerformanceTest()
+        with StandInServer() as fast_server, StandInServer(delay_ms=300) as slow_server:
+            caller = StallingCaller(HttpClient(fast_server.base_url), HttpClient(slow_server.base_url), 30)
+            result = perf.concurrent_test(caller.get, 1, 60, "/api/books/1", expected_interval_ms=10)
+
+        self.log_step(f"原始 P95 {result['p95_ms']:.2f} ms / {result['total_requests']} 个样本, "
+                      f"校正后 P95 {result['corrected_p95_ms']:.2f} ms / {result['corrected_total_requests']} 个样本")
+
+        self.assert_utils.assert_equals(result["expected_interval_ms"], 10, "结果应记录期望请求间隔")
+        for key in ("total_requests", "max_time_ms", "avg_time_ms", "p50_ms", "p90_ms", "p95_ms", "p99_ms"):
+            self.assert_utils.assert_true(
+                key in result and f"corrected_{key}" in result, f"{key} 应同时有原始值和校正值"
+            )
+        self.assert_utils.assert_equals(result["total_requests"], 60, "原始样本数应为实际请求数")
+        self.assert_utils.assert_true(
+            result["corrected_total_requests"] >= 60 + 2 * 25, "每次停顿应补录停顿期间本应发出的请求"
+        )
+        self.assert_utils.assert_true(result["p95_ms"] < 100, "两次停顿不足 5%，原始 P95 不应包含停顿")
+        self.assert_utils.assert_true(result["corrected_p95_ms"] > 100, "校正后的 P95 应反映停顿")
+
+        requirement = dict(max_avg_time_ms=1000, max_p95_time_ms=100, max_p99_time_ms=1000)
+        self.assert_utils.assert_true(
+            perf.validate_performance_requirement(result, **requirement), "按原始数据验证应通过"
+        )
+        self.assert_utils.assert_false(
+            perf.validate_performance_requirement(result, use_corrected=True, **requirement),
+            "按校正后的数据验证应失败"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,122 @@
+"""
+条件请求缓存测试
+验证 ETag 校验、304 时返回缓存的响应体、LRU 和 TTL 淘汰、不同用户不共享缓存项、性能测试结果中的节省统计，
+以及条件请求支持探测
+"""
+
+import json
+import time
+import pytest
+from base_test import BaseTest
+from http_cache import ConditionalCache, probe_conditional_support
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer, STAND_IN_BOOKS
+from utils import HttpClient
+
+
+class TestHttpCache(BaseTest):
+    """条件请求缓存测试类"""
+
+    @pytest.mark.performance
+    def test_revalidated_response(self):
+        """第二次请求应带上 If-None-Match，304 时返回与完整响应相同的内容"""
+        self.log_test_case("PERF-CACHE-01", "条件请求缓存")
+
+        with StandInServer() as server:
+            for transport in ("requests", "raw"):
+                client = HttpClient(server.base_url, transport=transport, cache=True)
+                first = client.get("/api/categories")
+                second = client.get("/api/categories")
+                stats = client.cache.summary()
+                self.log_step(f"{transport}: {stats}")
+
+                self.assert_utils.assert_equals(second.status_code, 200, "304 应改写为缓存的 200 响应")
+                self.assert_utils.assert_true(getattr(second, "from_cache", False), "第二次请求应使用缓存的响应体")
+                self.assert_utils.assert_equals(second.json(), first.json(), "缓存的响应体应与完整响应相同")
+                self.assert_utils.assert_equals(stats["not_modified"], 1, "应收到一次 304")
+                self.assert_utils.assert_equals(stats["bytes_saved"], len(first.content), "应节省一次完整响应体")
+                client.close()
+
+    @pytest.mark.performance
+    def test_lru_and_ttl_eviction(self):
+        """超过容量时淘汰最久未使用的项，超过有效期的项重新完整获取"""
+        self.log_test_case("PERF-CACHE-02", "LRU 与 TTL 淘汰")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url, cache=ConditionalCache(max_entries=2, ttl_s=0.2))
+            for endpoint in ("/api/books/1", "/api/books/2", "/api/books/1", "/api/books/3", "/api/books/2"):
+                client.get(endpoint)
+            lru = client.cache.stats()
+
+            time.sleep(0.3)
+            client.get("/api/books/3")
+            ttl = client.cache.stats()
+
+        self.assert_utils.assert_equals(lru["lru_evictions"], 2, "/api/books/2 和 /api/books/1 应先后被淘汰")
+        self.assert_utils.assert_equals(lru["not_modified"], 1, "只有仍在缓存中的 /api/books/1 应返回 304")
+        self.assert_utils.assert_equals(ttl["ttl_evictions"], 1, "过期的缓存项应被淘汰")
+        self.assert_utils.assert_equals(ttl["not_modified"], 1, "过期后应重新完整获取")
+
+    @pytest.mark.performance
+    def test_savings_in_results(self):
+        """性能测试结果应报告窗口内的 304 数和节省的流量"""
+        self.log_test_case("PERF-CACHE-03", "304 节省统计")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url, cache=True)
+            result = PerformanceTest().concurrent_test(client.get, 4, 5, "/api/books")
+
+        cache = result["http_cache"]
+        body_size = len(json.dumps(STAND_IN_BOOKS, ensure_ascii=False).encode("utf-8"))
+        self.log_step(f"缓存统计: {cache}")
+
+        self.assert_utils.assert_equals(result["failed_requests"], 0, "304 不应计为失败")
+        self.assert_utils.assert_equals(cache["requests"], 20, "所有请求都应经过缓存")
+        self.assert_utils.assert_equals(cache["not_modified"], 16, "首轮之后的请求都应返回 304")
+        self.assert_utils.assert_equals(cache["bytes_saved"], 16 * body_size, "每个 304 应节省一个完整响应体")
+        self.assert_utils.assert_equals(result["bytes_received"], 4 * body_size, "只有首轮请求传输响应体")
+
+    @pytest.mark.performance
+    def test_probe_conditional_support(self):
+        """探测应区分支持和不支持条件请求的服务器"""
+        self.log_test_case("PERF-CACHE-04", "条件请求支持探测")
+
+        with StandInServer() as server:
+            supported = probe_conditional_support(HttpClient(server.base_url, cache=True), "/api/books")
+        with StandInServer(conditional=False) as server:
+            unsupported = probe_conditional_support(HttpClient(server.base_url), "/api/books")
+
+        self.assert_utils.assert_true(supported["supported"], "替身服务器应支持条件请求")
+        self.assert_utils.assert_equals(supported["status"], 304, "条件请求应返回 304")
+        self.assert_utils.assert_false(unsupported["supported"], "关闭条件请求后应判定为不支持")
+        self.assert_utils.assert_equals(unsupported["etag"], None, "不支持时不应返回 ETag")
+
+    @pytest.mark.performance
+    def test_users_do_not_share_entries(self):
+        """共享缓存的客户端以不同用户登录时，各自的请求不应使用另一个用户的缓存项"""
+        self.log_test_case("PERF-CACHE-05", "缓存按用户区分")
+
+        with StandInServer() as server:
+            for transport in ("requests", "raw"):
+                cache = ConditionalCache()
+                alice = HttpClient(server.base_url, transport=transport, cache=cache)
+                bob = alice.clone()
+                alice.post("/api/login", json={"username": "alice", "password": "secret"})
+                bob.post("/api/login", json={"username": "bob", "password": "secret"})
+
+                alice.get("/api/categories")
+                bob_first = bob.get("/api/categories")
+                alice_second = alice.get("/api/categories")
+                stats = cache.stats()
+                self.log_step(f"{transport}: {stats}")
+
+                self.assert_utils.assert_false(getattr(bob_first, "from_cache", False), "另一个用户的首次请求不应使用缓存")
+                self.assert_utils.assert_equals(len(cache), 2, "每个用户应有各自的缓存项")
+                self.assert_utils.assert_true(getattr(alice_second, "from_cache", False), "同一用户的请求应使用自己的缓存项")
+                self.assert_utils.assert_equals(stats["not_modified"], 1, "只有同一用户的重复请求应返回 304")
+                alice.close()
+                bob.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,117 @@
+"""
+JSON 解码测试
+验证后端选择、字段路径取值、性能测试期间的延迟解码，并按响应体大小对比各后端的解码开销
+"""
+
+import importlib.util
+import json
+import time
+import pytest
+from base_test import BaseTest
+from json_codec import BACKEND, LazyJSON, get_path, loads
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def make_payload(users: int) -> bytes:
+    """生成与后台用户列表结构相同的响应体"""
+    return json.dumps({
+        "code": 200,
+        "result": [
+            {"id": i, "username": f"user{i}", "name": f"测试用户{i}", "phone": "13800000000",
+             "email": f"user{i}@example.com", "enabled": True, "roles": [{"id": 1, "name": "admin"}]}
+            for i in range(users)
+        ],
+    }, ensure_ascii=False).encode("utf-8")
+
+
+def per_decode_us(func, payload: bytes) -> float:
+    """测量平均单次解码耗时（微秒），大响应体减少重复次数"""
+    rounds = max(3, 20000 // max(len(payload) // 1000, 1))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(payload)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+class TestJsonCodec(BaseTest):
+    """JSON 解码测试类"""
+
+    @pytest.mark.performance
+    def test_backend_and_field_path(self):
+        """应选择已安装的最快后端，字段路径可以跨越对象和列表"""
+        self.log_test_case("PERF-JSON-01", "JSON 后端与字段路径")
+
+        expected = next(
+            (name for name in ("orjson", "ujson") if importlib.util.find_spec(name)), "json"
+        )
+        data = loads(make_payload(3))
+        lazy = LazyJSON(make_payload(3))
+        self.log_step(f"JSON 后端: {BACKEND}")
+
+        self.assert_utils.assert_equals(BACKEND, expected, "应按 orjson、ujson、json 的顺序选择后端")
+        self.assert_utils.assert_equals(get_path(data, "result.2.username"), "user2", "字段路径应支持列表下标")
+        self.assert_utils.assert_false(lazy.decoded, "创建 LazyJSON 时不应解码")
+        self.assert_utils.assert_equals(lazy["code"], 200, "访问内容时应解码")
+        self.assert_utils.assert_equals(lazy.path("result.1.roles.0.name"), "admin", "LazyJSON 应支持字段路径")
+        with pytest.raises(KeyError):
+            get_path(data, "result.9.username")
+
+    @pytest.mark.performance
+    def test_lazy_decoding_in_perf_runs(self):
+        """性能测试期间辅助方法返回未解码的结果，decode_responses=True 或测试之外时立即解码"""
+        self.log_test_case("PERF-JSON-02", "性能测试期间延迟解码")
+
+        returned = []
+
+        def get_categories():
+            returned.append(self.get_book_categories())
+
+        with StandInServer() as server:
+            self.client = HttpClient(server.base_url)
+            PerformanceTest().concurrent_test(get_categories, 2, 2)
+            lazy = list(returned)
+            returned.clear()
+            PerformanceTest(decode_responses=True).concurrent_test(get_categories, 2, 2)
+            eager = list(returned)
+            outside = self.get_book_categories()
+            field = self.decode(self.client.get("/api/categories"), "0.name")
+
+        self.assert_utils.assert_true(
+            all(isinstance(result, LazyJSON) and not result.decoded for result in lazy),
+            "默认不应解码被测函数未读取的响应"
+        )
+        self.assert_utils.assert_equals(lazy[0], outside, "延迟解码的结果读取后应与完整解码相同")
+        self.assert_utils.assert_true(all(isinstance(result, list) for result in eager), "decode_responses=True 时应立即解码")
+        self.assert_utils.assert_true(isinstance(outside, list), "性能测试之外应立即解码")
+        self.assert_utils.assert_equals(field, "分类1", "应只返回字段路径的值")
+
+    @pytest.mark.performance
+    def test_decode_cost_by_payload_size(self):
+        """基准：按响应体大小对比标准库 json、所选后端和延迟解码（不读取）的单次开销"""
+        self.log_test_case("PERF-JSON-03", "解码开销基准")
+
+        rows = []
+        for users in (10, 100, 1000, 10000):
+            payload = make_payload(users)
+            stdlib_us = per_decode_us(json.loads, payload)
+            backend_us = per_decode_us(loads, payload)
+            lazy_us = per_decode_us(LazyJSON, payload)
+            rows.append((users, len(payload), stdlib_us, backend_us, lazy_us))
+
+        logger.info(f"{'用户数':<8} {'字节数':>10} {'json(us)':>12} {BACKEND + '(us)':>14} {'延迟(us)':>10}")
+        for users, size, stdlib_us, backend_us, lazy_us in rows:
+            logger.info(f"{users:<8} {size:>10} {stdlib_us:>12.1f} {backend_us:>14.1f} {lazy_us:>10.2f}")
+
+        largest = rows[-1]
+        self.assert_utils.assert_true(largest[4] < largest[2] / 100, "不读取内容时延迟解码的开销应可忽略")
+        if BACKEND != "json":
+            self.assert_utils.assert_true(largest[3] < largest[2], f"{BACKEND} 解码大响应体应快于标准库 json")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
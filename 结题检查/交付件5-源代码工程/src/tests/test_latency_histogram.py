@@ -0,0 +1,54 @@
+"""
+延迟直方图测试
+验证直方图百分位数精度、合并和协调遗漏校正
+"""
+
+import random
+import statistics
+import pytest
+from histogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """延迟直方图测试类"""
+
+    @pytest.mark.performance
+    def test_percentile_precision(self):
+        """百分位数误差应在有效数字精度范围内"""
+        values = [random.lognormvariate(3, 1) for _ in range(20000)]
+        histogram = LatencyHistogram.from_values(values, significant_digits=3)
+        sorted_values = sorted(values)
+
+        for percentile in (50, 90, 95, 99):
+            expected = sorted_values[int(len(sorted_values) * percentile / 100) - 1]
+            assert histogram.percentile(percentile) == pytest.approx(expected, rel=2e-3)
+
+        assert histogram.mean == pytest.approx(statistics.mean(values))
+        assert histogram.stdev == pytest.approx(statistics.stdev(values))
+        assert histogram.min_ms == min(values)
+        assert histogram.max_ms == max(values)
+
+    @pytest.mark.performance
+    def test_merge_is_exact(self):
+        """分别记录再合并，应与整体记录的结果完全一致"""
+        values = [random.uniform(1, 500) for _ in range(5000)]
+        whole = LatencyHistogram.from_values(values)
+        merged = LatencyHistogram.from_values(values[:1234]).merge(LatencyHistogram.from_values(values[1234:]))
+
+        assert merged.total_count == whole.total_count
+        for percentile in (50, 90, 99, 100):
+            assert merged.percentile(percentile) == whole.percentile(percentile)
+
+    @pytest.mark.performance
+    def test_expected_interval_correction(self):
+        """一次 1000ms 的停顿在 100ms 期望间隔下应补录为 10 个样本"""
+        histogram = LatencyHistogram()
+        histogram.record_corrected(1000, 100)
+
+        assert histogram.total_count == 10
+        assert histogram.max_ms == 1000
+        assert histogram.min_ms == 100
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
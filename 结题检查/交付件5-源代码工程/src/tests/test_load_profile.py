@@ -0,0 +1,68 @@
+"""
+负载曲线测试
+验证阶段构造以及按曲线施压时各阶段的分别统计
+"""
+
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from load_profile import LoadProfile
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+class TestLoadProfile(BaseTest):
+    """负载曲线测试类"""
+
+    @pytest.mark.performance
+    def test_profile_shape(self):
+        """爬坡按时间线性插值，阶梯每一级为独立阶段，曲线结束后用户数为 0"""
+        self.log_test_case("PERF-PROFILE-01", "负载曲线构造")
+
+        profile = LoadProfile().ramp(0, 100, 10).step(10, 30, 10, 5, name="stairs").spike(500, 2)
+
+        self.assert_utils.assert_equals(profile.users_at(5), 50, "爬坡中点应为 50 个用户")
+        self.assert_utils.assert_equals(
+            [stage.name for stage in profile.stages],
+            ["ramp-1", "stairs-1", "stairs-2", "stairs-3", "spike-5"],
+            "阶梯应展开为三级"
+        )
+        self.assert_utils.assert_equals(profile.users_at(21), 30, "阶梯第三级应为 30 个用户")
+        self.assert_utils.assert_equals(profile.max_users, 500, "最大用户数应为尖峰值")
+        self.assert_utils.assert_equals(profile.total_duration, 27, "总时长应为各阶段之和")
+        self.assert_utils.assert_equals(profile.users_at(27), 0, "曲线结束后用户数应为 0")
+
+    @pytest.mark.performance
+    @pytest.mark.slow
+    def test_stages_reported_separately(self):
+        """同一组常驻虚拟用户依次经历各阶段，每个阶段分别统计吞吐量和响应时间"""
+        self.log_test_case("PERF-PROFILE-02", "负载曲线分阶段统计")
+
+        profile = LoadProfile().ramp(1, 4, 1.0, name="warm-up").plateau(4, 1.0, name="steady").spike(12, 1.0)
+
+        # 服务器延迟远大于客户端每请求的 CPU 时间，吞吐量由虚拟用户数决定而不受客户端 CPU 限制
+        with StandInServer(delay_ms=50) as server:
+            client = HttpClient(server.base_url)
+            results = PerformanceTest().profile_test(client.get, profile, "/api/books")
+
+        self.assert_utils.assert_equals(
+            list(results), ["warm-up", "steady", "spike-3"], "结果应按阶段顺序排列"
+        )
+        for name, result in results.items():
+            self.assert_utils.assert_true(result["total_requests"] > 0, f"阶段 {name} 应有成功请求")
+            self.assert_utils.assert_equals(result["failed_requests"], 0, f"阶段 {name} 不应有失败请求")
+
+        self.log_step(f"各阶段请求数: { {name: result['total_requests'] for name, result in results.items()} }")
+        self.assert_utils.assert_equals(
+            [(result["start_users"], result["end_users"], result["concurrency"]) for result in results.values()],
+            [(1, 4, 4), (4, 4, 4), (12, 12, 12)],
+            "各阶段应报告曲线规定的虚拟用户数"
+        )
+        self.assert_utils.assert_true(
+            results["spike-3"]["total_requests"] > 1.5 * results["steady"]["total_requests"],
+            "尖峰阶段完成的请求应多于平台阶段"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
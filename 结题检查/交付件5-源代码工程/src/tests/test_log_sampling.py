@@ -0,0 +1,133 @@
+"""
+压测日志采样测试
+验证压测调用期间的日志按调用采样、失败调用总是保留、重复日志限流并汇总省略条数，
+以及性能测试中自动启用、功能测试中不生效
+"""
+
+import io
+import logging
+import pytest
+from base_test import BaseTest
+from logger import LoadRunLogFilter, logger as test_logger
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+def capture(sampling_filter: LoadRunLogFilter, name: str):
+    """创建挂载采样过滤器、只写消息内容的日志记录器，返回 (日志记录器, 输出缓冲区)"""
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    handler.addFilter(sampling_filter)
+    sampling_filter.handlers = [handler]
+    target = logging.getLogger(name)
+    target.handlers = [handler]
+    target.setLevel(logging.DEBUG)
+    target.propagate = False
+    return target, stream
+
+
+class TestLogSampling(BaseTest):
+    """压测日志采样测试类"""
+
+    @pytest.mark.performance
+    def test_sampling_keeps_failed_calls(self):
+        """成功调用按 1/N 整体保留或丢弃，失败调用和警告日志总是保留，调用之外的日志不受影响"""
+        self.log_test_case("PERF-LOGS-01", "按调用采样")
+
+        sampling_filter = LoadRunLogFilter(sample_rate=10, rate_limit=1000)
+        target, stream = capture(sampling_filter, "test_log_sampling.calls")
+
+        for i in range(100):
+            sampling_filter.begin_call()
+            target.debug("发送 %d", i)
+            target.debug("响应 %d", i)
+            sampling_filter.end_call(keep=i == 55)
+        sampling_filter.begin_call()
+        target.warning("慢请求")
+        sampling_filter.end_call(keep=False)
+        for i in range(3):
+            target.debug("调用之外 %d", i)
+
+        lines = stream.getvalue().splitlines()
+        sent = [line for line in lines if line.startswith("发送")]
+        self.log_step(f"保留的调用: {sent}")
+
+        self.assert_utils.assert_equals(len(sent), 11, "100 次调用按 1/10 采样，另加 1 次必须保留的调用")
+        self.assert_utils.assert_true("发送 55" in lines and "响应 55" in lines, "必须保留的调用应完整写出")
+        self.assert_utils.assert_equals(
+            [line.replace("发送", "响应") for line in sent], [line for line in lines if line.startswith("响应")],
+            "同一调用的日志应一起保留或丢弃"
+        )
+        self.assert_utils.assert_true("慢请求" in lines, "警告日志不应被采样丢弃")
+        self.assert_utils.assert_equals(lines[-3:], [f"调用之外 {i}" for i in range(3)], "调用之外的日志应原样写出")
+        self.assert_utils.assert_equals(sampling_filter.report_suppressed()["dropped_calls"], 89, "应统计采样丢弃的调用数")
+
+    @pytest.mark.performance
+    def test_rate_limit_summary(self):
+        """相同的日志每个窗口最多写出 rate_limit 条，省略的条数在结束时汇总"""
+        self.log_test_case("PERF-LOGS-02", "重复日志限流")
+
+        sampling_filter = LoadRunLogFilter(sample_rate=1, rate_limit=5, interval_s=60)
+        target, stream = capture(sampling_filter, "test_log_sampling.rate_limit")
+
+        for i in range(30):
+            sampling_filter.begin_call()
+            target.error("请求失败: %s", "连接被重置")
+            target.error("请求失败: %s", f"超时 {i % 2}")
+            sampling_filter.end_call(keep=True)
+        stats = sampling_filter.report_suppressed()
+
+        lines = stream.getvalue().splitlines()
+        self.log_step(f"输出: {lines[-3:]}")
+
+        self.assert_utils.assert_equals(lines.count("请求失败: 连接被重置"), 5, "相同日志应限流")
+        self.assert_utils.assert_equals(lines.count("请求失败: 超时 0"), 5, "不同内容的日志应分别限流")
+        self.assert_utils.assert_equals(stats["suppressed"], 25 + 10 + 10, "应统计被限流省略的条数")
+        self.assert_utils.assert_true(
+            "请求失败: 连接被重置（限流省略 25 条相同日志）" in lines, "结束时应汇总每条日志被省略的条数"
+        )
+
+    @pytest.mark.performance
+    def test_enabled_only_in_performance_runs(self):
+        """性能测试中 HttpClient 的调试日志按调用采样，功能测试中的请求日志全部写出"""
+        self.log_test_case("PERF-LOGS-03", "压测中自动启用")
+
+        sampling_filter = test_logger.sampling_filter
+        if sampling_filter is None:
+            pytest.skip("未启用 LOG_SAMPLING")
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler.addFilter(sampling_filter)
+        root = logging.getLogger()
+        saved_level = root.level
+        root.addHandler(handler)
+        sampling_filter.handlers.append(handler)
+        root.setLevel(logging.DEBUG)
+        try:
+            with StandInServer() as server:
+                client = HttpClient(server.base_url)
+                for i in range(5):
+                    client.get(f"/api/books/{i}")
+                functional = stream.getvalue().count("发送 GET 请求")
+                result = PerformanceTest().concurrent_test(client.get, 2, 200, "/api/books/1")
+                sampled = stream.getvalue().count("发送 GET 请求") - functional
+        finally:
+            root.removeHandler(handler)
+            sampling_filter.handlers.remove(handler)
+            root.setLevel(saved_level)
+        self.log_step(f"功能测试写出 {functional} 条, 性能测试 {result['total_requests']} 个请求写出 {sampled} 条")
+
+        self.assert_utils.assert_equals(functional, 5, "功能测试中的请求日志应全部写出")
+        self.assert_utils.assert_equals(result["failed_requests"], 0, "采样不应影响测试结果")
+        self.assert_utils.assert_true(0 < sampled < result["total_requests"] / 2, "性能测试中的请求日志应被采样")
+        self.assert_utils.assert_true(
+            result["log_sampling"]["dropped_calls"] > result["total_requests"] / 2, "结果应包含本次运行的采样丢弃调用数"
+        )
+        self.assert_utils.assert_equals(sampling_filter.report_suppressed()["dropped_calls"], 0, "运行结束时计数应已清零")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
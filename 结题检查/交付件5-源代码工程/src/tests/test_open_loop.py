@@ -0,0 +1,69 @@
+"""
+开环（恒定到达率）测试
+使用本地替身服务器验证实际到达率接近目标、发送延迟统计、在途请求数上限，
+以及服务器处理能力低于到达率时从计划发送时间计算的响应时间随排队上升
+"""
+
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+class TestOpenLoop(BaseTest):
+    """开环测试类"""
+
+    @pytest.mark.performance
+    def test_achieved_rate_matches_target(self):
+        """服务器处理能力充足时，实际到达率应接近目标到达率，发送延迟应很小"""
+        self.log_test_case("PERF-OPEN-02", "开环到达率")
+
+        with StandInServer(delay_ms=5) as server:
+            client = HttpClient(server.base_url)
+            result = PerformanceTest().open_loop_test(client.get, 50, 2, False, 20, "/api/books/1")
+
+        self.log_step(f"目标 {result['target_rate']}/秒, 实际 {result['achieved_rate']:.1f}/秒, "
+                      f"发送延迟 P99 {result['send_lag_p99_ms']:.2f} ms")
+
+        self.assert_utils.assert_equals(result["failed_requests"], 0, "不应有失败请求")
+        self.assert_utils.assert_equals(result["sent_requests"], 100, "应按计划发送 2 秒 × 50/秒 个请求")
+        self.assert_utils.assert_true(
+            abs(result["achieved_rate"] - result["target_rate"]) <= result["target_rate"] * 0.1,
+            "实际到达率应在目标到达率的 10% 以内"
+        )
+        self.assert_utils.assert_true(
+            all(key in result for key in ("send_lag_avg_ms", "send_lag_p99_ms", "send_lag_max_ms")),
+            "应报告发送延迟"
+        )
+        self.assert_utils.assert_true(result["send_lag_p99_ms"] < 50, "处理能力充足时发送延迟应很小")
+        self.assert_utils.assert_true(result["concurrency"] <= 20, "峰值在途请求数不应超过上限")
+
+    @pytest.mark.performance
+    def test_overloaded_server_queues_behind_in_flight_cap(self):
+        """服务器处理能力低于到达率时，在途请求数应被限制在上限，发送被推迟，从计划发送时间计算的响应时间应持续上升"""
+        self.log_test_case("PERF-OPEN-03", "开环过载与在途上限")
+
+        # 每个请求 100ms、最多 2 个在途：处理能力约 20/秒，低于 50/秒 的到达率
+        with StandInServer(delay_ms=100) as server:
+            client = HttpClient(server.base_url)
+            result = PerformanceTest().open_loop_test(
+                client.get, 50, 1, False, 2, "/api/books/1", keep_samples=True
+            )
+
+        samples = result["all_durations"]
+        self.log_step(f"峰值在途 {result['concurrency']}, 实际 {result['achieved_rate']:.1f}/秒, "
+                      f"发送延迟最大 {result['send_lag_max_ms']:.0f} ms, 平均响应时间 {result['avg_time_ms']:.0f} ms")
+
+        self.assert_utils.assert_true(result["concurrency"] <= 2, "峰值在途请求数不应超过上限")
+        self.assert_utils.assert_true(result["achieved_rate"] < result["target_rate"] * 0.7,
+                                      "过载时实际到达率应明显低于目标")
+        self.assert_utils.assert_true(result["send_lag_max_ms"] > 200, "在途上限应推迟发送并记为发送延迟")
+        self.assert_utils.assert_true(result["avg_time_ms"] > 2 * 100,
+                                      "从计划发送时间计算的响应时间应包含排队时间，明显高于服务时间")
+        self.assert_utils.assert_true(max(samples[-5:]) > max(samples[:5]) + 200,
+                                      "响应时间应随排队持续上升")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,157 @@
+"""
+多进程性能测试引擎测试
+使用本地替身服务器验证：客户端受 CPU（GIL）限制时，相同并发数下多进程引擎的吞吐量高于单进程和线程引擎，
+工作进程异常退出时结果报告失败的进程，以及解码设置传到工作进程
+"""
+
+import os
+import signal
+import time
+import pytest
+import json_codec
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from process_performance_test import ProcessPerformanceTest
+from load_profile import LoadProfile
+from stand_in_server import StandInServer
+from utils import HttpClient
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def usable_cpus() -> int:
+    """当前进程可以使用的CPU数"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class CpuBoundCaller:
+    """每次调用先做一段纯 Python 计算再发请求，使客户端成为瓶颈（持有 client 属性，工作进程会为其重建会话）"""
+
+    def __init__(self, client: HttpClient, work: int = 50000):
+        self.client = client
+        self.work = work
+
+    def get(self, endpoint: str):
+        total = 0
+        for i in range(self.work):
+            total += i * i
+        return self.client.get(endpoint)
+
+
+class FirstWorkerKiller:
+    """第一个执行到这里的工作进程用 SIGKILL 杀死自己（模拟 OOM 或崩溃），其余进程正常发请求"""
+
+    def __init__(self, client: HttpClient, marker: str):
+        self.client = client
+        self.marker = marker
+
+    def get(self, endpoint: str):
+        try:
+            os.close(os.open(self.marker, os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            return self.client.get(endpoint)
+        os.kill(os.getpid(), signal.SIGKILL)
+
+
+class DecodeModeCaller:
+    """发请求并检查当前的解码设置，与期望不同时抛出异常（计为失败）"""
+
+    def __init__(self, client: HttpClient, eager: bool):
+        self.client = client
+        self.eager = eager
+
+    def get(self, endpoint: str):
+        response = self.client.get(endpoint)
+        if json_codec.eager_decoding() != self.eager:
+            raise AssertionError(f"工作进程的解码设置为 {json_codec.eager_decoding()}，期望 {self.eager}")
+        return response
+
+
+class TestProcessEngine(BaseTest):
+    """多进程性能测试引擎测试类"""
+
+    @pytest.mark.performance
+    @pytest.mark.slow
+    @pytest.mark.skipif(usable_cpus() < 2, reason="多进程扩展需要至少 2 个可用CPU")
+    def test_throughput_scales_with_workers(self):
+        """
+        总并发数固定、服务器无延迟、被测函数受 CPU 限制：2 个工作进程的吞吐量应明显高于 1 个工作进程，
+        也应明显高于同一进程内的线程引擎（线程引擎受 GIL 限制，增加线程不能提高吞吐量）
+        """
+        self.log_test_case("PERF-PROC-01", "多进程吞吐量扩展")
+
+        concurrency = 4
+        iterations = 20
+        throughput = {}
+
+        with StandInServer(delay_ms=0) as server:
+            caller = CpuBoundCaller(HttpClient(server.base_url))
+
+            self.log_step("同一进程内的线程引擎")
+            result = PerformanceTest().concurrent_test(caller.get, concurrency, iterations, "/api/books")
+            throughput["threads"] = result["throughput_rps"]
+
+            for workers in (1, 2):
+                self.log_step(f"使用 {workers} 个工作进程执行测试")
+                result = ProcessPerformanceTest(workers=workers).concurrent_test(
+                    caller.get, concurrency, iterations, "/api/books"
+                )
+                self.assert_utils.assert_equals(result["failed_workers"], 0, "所有工作进程都应完成")
+                self.assert_utils.assert_equals(result["total_requests"], concurrency * iterations, "所有请求都应完成")
+                throughput[workers] = result["throughput_rps"]
+
+        logger.info(f"吞吐量: 线程 {throughput['threads']:.2f}/秒, 1 进程 {throughput[1]:.2f}/秒, "
+                    f"2 进程 {throughput[2]:.2f}/秒")
+
+        self.assert_utils.assert_true(
+            throughput[2] >= throughput[1] * 1.3, "2 个工作进程的吞吐量应明显高于 1 个工作进程"
+        )
+        self.assert_utils.assert_true(
+            throughput[2] >= throughput["threads"] * 1.3, "2 个工作进程的吞吐量应明显高于相同并发数的线程引擎"
+        )
+
+    @pytest.mark.performance
+    @pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="需要 SIGKILL")
+    def test_killed_worker_is_reported(self, tmp_path):
+        """被杀死的工作进程不回传结果：测试不应挂起，结果应报告失败的进程数，只包含其余进程的负载"""
+        self.log_test_case("PERF-PROC-02", "工作进程异常退出")
+
+        with StandInServer() as server:
+            caller = FirstWorkerKiller(HttpClient(server.base_url), str(tmp_path / "killed"))
+            start = time.perf_counter()
+            result = ProcessPerformanceTest(workers=2).concurrent_test(caller.get, 4, 5, "/api/books/1")
+            elapsed = time.perf_counter() - start
+
+        self.log_step(f"耗时 {elapsed:.2f} 秒, 失败进程 {result['failed_workers']}")
+        self.assert_utils.assert_equals(result["failed_workers"], 1, "应报告被杀死的工作进程")
+        self.assert_utils.assert_equals(result["completed_concurrency"], 2, "结果只应包含存活进程的并发数")
+        self.assert_utils.assert_equals(result["total_requests"], 2 * 5, "结果只应包含存活进程的请求")
+        self.assert_utils.assert_true(elapsed < 30, "父进程不应一直等待被杀死的进程")
+
+    @pytest.mark.performance
+    def test_decode_setting_reaches_workers(self):
+        """decode_responses 应传给每个工作进程，并发测试和负载曲线测试都按该设置解码"""
+        self.log_test_case("PERF-PROC-03", "工作进程解码设置")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url)
+            for eager in (True, False):
+                engine = ProcessPerformanceTest(workers=2, decode_responses=eager)
+                caller = DecodeModeCaller(client, eager)
+                result = engine.concurrent_test(caller.get, 2, 3, "/api/books/1")
+                self.assert_utils.assert_equals(
+                    (result["total_requests"], result["failed_requests"]), (6, 0),
+                    f"decode_responses={eager} 时并发测试的工作进程应使用相同的解码设置"
+                )
+                stage = engine.profile_test(caller.get, LoadProfile().plateau(2, 0.3), "/api/books/1")["plateau-1"]
+                self.assert_utils.assert_true(stage["total_requests"] > 0, "负载曲线测试应有请求")
+                self.assert_utils.assert_equals(
+                    stage["failed_requests"], 0, f"decode_responses={eager} 时负载曲线测试的工作进程应使用相同的解码设置"
+                )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
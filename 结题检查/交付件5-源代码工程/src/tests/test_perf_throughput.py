@@ -0,0 +1,55 @@
+"""
+吞吐量与错误分类测试
+验证结果中的吞吐量、有效吞吐量、错误率（按异常类型和HTTP状态码分类）和传输速率
+"""
+
+import itertools
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+class TestThroughputResults(BaseTest):
+    """吞吐量与错误分类测试类"""
+
+    @pytest.mark.performance
+    def test_goodput_and_error_breakdown(self):
+        """四分之一请求返回 404、四分之一抛出异常时，有效吞吐量应为吞吐量的一半"""
+        self.log_test_case("PERF-THRU-01", "吞吐量与错误分类")
+
+        counter = itertools.count()
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url)
+
+            def mixed_call():
+                n = next(counter)
+                if n % 4 == 0:
+                    return client.get("/api/not-found")
+                if n % 4 == 1:
+                    raise RuntimeError("模拟客户端故障")
+                return client.get("/api/books")
+
+            perf = PerformanceTest()
+            result = perf.concurrent_test(mixed_call, 4, 5)
+
+        self.assert_utils.assert_equals(result["errors_by_status"], {404: 5}, "应有 5 个 404 响应")
+        self.assert_utils.assert_equals(result["errors_by_type"], {"RuntimeError": 5}, "应有 5 个异常")
+        self.assert_utils.assert_equals(result["failed_requests"], 10, "失败请求数应为 10")
+        self.assert_utils.assert_equals(result["error_rate"], 0.5, "错误率应为 50%")
+        self.assert_utils.assert_true(
+            result["goodput_rps"] == pytest.approx(result["throughput_rps"] / 2),
+            "有效吞吐量应为吞吐量的一半"
+        )
+        self.assert_utils.assert_true(result["bytes_per_second"] > 0, "应统计到接收字节数")
+
+        self.assert_utils.assert_false(
+            perf.validate_performance_requirement(result, max_error_rate=0.1),
+            "错误率超过阈值时验证应失败"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -6,6 +6,7 @@
 import pytest
 from base_test import BaseTest
 from performance_test import perf_test
+from async_performance_test import async_perf_test
 from constants import TestData
 from logger import get_logger
 
@@ -97,6 +98,84 @@ class TestPerformance(BaseTest):
         
         assert passed, "搜索性能测试未通过"
 
+    
+    @pytest.mark.performance
+    def test_open_loop_performance(self):
+        """
+        测试恒定到达率（开环）下的性能
+        """
+        self.log_test_case("PERF-OPEN-01", "开环恒定到达率性能测试")
+        
+        result = perf_test.open_loop_test(
+            func=self.get_books,
+            rate=20,
+            duration=10,
+            poisson=True
+        )
+        
+        # 实际发送速率应接近目标速率
+        self.assert_utils.assert_true(
+            result["achieved_rate"] >= result["target_rate"] * 0.9,
+            "实际发送速率应不低于目标速率的90%"
+        )
+        
+        passed = perf_test.validate_performance_requirement(
+            result,
+            max_avg_time_ms=5000
+        )
+        
+        assert passed, "开环性能测试未通过"
+    
+    @pytest.mark.performance
+    def test_corrected_latency_performance(self):
+        """
+        使用协调遗漏校正后的延迟验证性能
+        """
+        self.log_test_case("PERF-CO-01", "协调遗漏校正性能测试")
+        
+        result = perf_test.concurrent_test(
+            func=self.get_books,
+            concurrency=10,
+            iterations=TestData.PERFORMANCE_TEST_ITERATIONS,
+            expected_interval_ms=100
+        )
+        
+        # 校正后的样本数不会少于原始样本数
+        self.assert_utils.assert_true(
+            result["corrected_total_requests"] >= result["total_requests"],
+            "校正后的样本数应不少于原始样本数"
+        )
+        
+        passed = perf_test.validate_performance_requirement(
+            result,
+            max_avg_time_ms=5000,
+            max_p95_time_ms=5000,
+            max_p99_time_ms=5000,
+            use_corrected=True
+        )
+        
+        assert passed, "协调遗漏校正后的性能测试未通过"
+    
+    @pytest.mark.performance
+    def test_async_high_concurrency_performance(self):
+        """
+        使用异步引擎测试高并发下的性能
+        """
+        pytest.importorskip("aiohttp")
+        self.log_test_case("PERF-ASYNC-01", "异步引擎高并发性能测试")
+        
+        result = async_perf_test.concurrent_test(
+            func=self.async_get_books,
+            concurrency=1000,
+            iterations=3
+        )
+        
+        passed = async_perf_test.validate_performance_requirement(
+            result,
+            max_avg_time_ms=5000
+        )
+        
+        assert passed, "异步引擎高并发性能测试未通过"
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,129 @@
+"""
+队列日志测试
+验证队列模式下日志记录按顺序批量写出、不可变参数延迟到监听线程格式化，
+并对比同步写日志、队列模式和关闭日志时的单次日志调用开销和被测请求的响应时间
+"""
+
+import io
+import logging
+import os
+import time
+import pytest
+from base_test import BaseTest
+from logger import BatchingQueueListener, DeferredQueueHandler, get_logger
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+logger = get_logger(__name__)
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def isolated_logger(name: str, handlers) -> logging.Logger:
+    """创建只使用给定处理器、不传递给根日志记录器的日志记录器"""
+    target = logging.getLogger(name)
+    target.handlers = list(handlers)
+    target.setLevel(logging.DEBUG)
+    target.propagate = False
+    return target
+
+
+def log_handlers(path: str, console):
+    """与 TestLogger 相同的文件和控制台处理器"""
+    handlers = [logging.FileHandler(path, encoding='utf-8'), logging.StreamHandler(console)]
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handlers
+
+
+class TestQueueLogging(BaseTest):
+    """队列日志测试类"""
+
+    @pytest.mark.performance
+    def test_ordered_batched_writes(self):
+        """记录应按调用顺序写出，不可变参数原样入队，可变参数在入队时合并，flush 后内容完整"""
+        self.log_test_case("PERF-LOG-01", "队列日志批量写出")
+
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        listener = BatchingQueueListener([handler], batch_size=4)
+        listener.start()
+        queue_handler = DeferredQueueHandler(listener)
+        target = isolated_logger("test_queue_logging.ordered", [queue_handler])
+
+        for i in range(10):
+            target.debug("消息 %d", i)
+        data = [1]
+        target.info("列表 %s", data)
+        data.append(2)
+        listener.flush()
+        lines = stream.getvalue().splitlines()
+        listener.stop()
+
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, "消息 %d", (1,), None)
+        deferred = queue_handler.prepare(record)
+
+        self.assert_utils.assert_equals(lines, [f"消息 {i}" for i in range(10)] + ["列表 [1]"], "应按顺序写出全部记录")
+        self.assert_utils.assert_equals((deferred.msg, deferred.args), ("消息 %d", (1,)), "不可变参数应延迟格式化")
+
+    @pytest.mark.performance
+    def test_logging_overhead_benchmark(self, tmp_path):
+        """基准：对比同步写日志、队列模式和关闭日志时的单次日志调用开销和被测请求的响应时间"""
+        self.log_test_case("PERF-LOG-02", "日志开销基准")
+
+        console = open(os.devnull, "w", encoding="utf-8")
+        http_logger = logging.getLogger("utils")
+        saved = (http_logger.handlers, http_logger.level, http_logger.propagate)
+        rows = []
+        try:
+            with StandInServer() as server:
+                client = HttpClient(server.base_url, transport="raw")
+                for mode in ("sync", "queue", "off"):
+                    handlers = log_handlers(str(tmp_path / f"{mode}.log"), console)
+                    listener = None
+                    if mode == "queue":
+                        listener = BatchingQueueListener(handlers)
+                        listener.start()
+                        handlers = [DeferredQueueHandler(listener)]
+                    elif mode == "off":
+                        handlers = []
+                    target = isolated_logger(f"test_queue_logging.{mode}", handlers)
+                    if mode == "off":
+                        target.setLevel(logging.WARNING)
+
+                    # 单次日志调用开销：与 HttpClient 发送请求时的调试日志相同
+                    calls = 2000
+                    start = time.perf_counter()
+                    for i in range(calls):
+                        target.debug("发送 %s 请求: %s", "GET", f"{server.base_url}/api/books/{i}")
+                    call_us = (time.perf_counter() - start) / calls * 1e6
+
+                    # 被测请求的响应时间：HttpClient 的日志按当前模式写出
+                    isolated_logger("utils", handlers).setLevel(target.level)
+                    result = PerformanceTest().concurrent_test(client.get, 1, 1000, "/api/books/1")
+
+                    if listener is not None:
+                        listener.stop()
+                    for handler in handlers:
+                        handler.close()
+                    rows.append((mode, call_us, result["avg_time_ms"], result["p50_ms"], result["p99_ms"]))
+                client.close()
+        finally:
+            http_logger.handlers, http_logger.level, http_logger.propagate = saved
+            console.close()
+
+        logger.info(f"{'模式':<8} {'单次日志(us)':>14} {'平均(ms)':>10} {'P50(ms)':>10} {'P99(ms)':>10}")
+        for mode, call_us, avg_ms, p50_ms, p99_ms in rows:
+            logger.info(f"{mode:<8} {call_us:>14.2f} {avg_ms:>10.3f} {p50_ms:>10.3f} {p99_ms:>10.3f}")
+
+        timings = {mode: call_us for mode, call_us, _, _, _ in rows}
+        with open(tmp_path / "queue.log", encoding="utf-8") as f:
+            queued_lines = sum(1 for _ in f)
+        self.assert_utils.assert_true(queued_lines >= 2000, "队列模式应写出全部日志")
+        self.assert_utils.assert_true(timings["queue"] < timings["sync"], "队列模式下单次日志调用应快于同步写日志")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,94 @@
+"""
+raw 传输层测试
+用 requests 传输层的结果校验 raw 传输层的状态码和响应体，并验证长连接复用、流水线和性能测试统计
+"""
+
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+# (请求方法, 端点, 请求参数)
+VALIDATION_CASES = [
+    ("GET", "/api/books", {}),
+    ("GET", "/api/books/7", {}),
+    ("GET", "/api/books/search", {"params": {"keyword": "测试图书1"}}),
+    ("GET", "/api/categories", {}),
+    ("GET", "/api/missing", {}),
+    ("POST", "/api/login", {"json": {"username": "admin", "password": "123"}}),
+    ("POST", "/api/login", {"json": {"username": "", "password": ""}}),
+    ("DELETE", "/api/books", {}),
+]
+
+
+class TestRawTransport(BaseTest):
+    """raw 传输层测试类"""
+
+    @pytest.mark.performance
+    def test_matches_requests_transport(self):
+        """raw 传输层的状态码、响应体和 cookies 应与 requests 传输层一致"""
+        self.log_test_case("PERF-RAW-01", "raw 传输层与 requests 一致性")
+
+        with StandInServer() as server:
+            reference = HttpClient(server.base_url)
+            raw = HttpClient(server.base_url, transport="raw")
+
+            for method, endpoint, kwargs in VALIDATION_CASES:
+                expected = reference.request(method, endpoint, **kwargs)
+                actual = raw.request(method, endpoint, **kwargs)
+                self.log_step(f"{method} {endpoint}: {expected.status_code} / {actual.status_code}")
+
+                self.assert_utils.assert_equals(actual.status_code, expected.status_code, f"{endpoint} 状态码应一致")
+                self.assert_utils.assert_equals(actual.content, expected.content, f"{endpoint} 响应体应一致")
+                self.assert_utils.assert_equals(actual.json(), expected.json(), f"{endpoint} JSON 应一致")
+
+            stats = raw.connection_stats()
+            raw.close()
+
+        self.assert_utils.assert_equals(raw.get_cookies(), reference.get_cookies(), "登录后的 cookies 应一致")
+        self.assert_utils.assert_equals(stats, {"requests": len(VALIDATION_CASES), "new_connections": 1},
+                                        "所有请求应复用同一个连接")
+
+    @pytest.mark.performance
+    def test_pipeline(self):
+        """流水线请求应按发送顺序返回各自的响应"""
+        self.log_test_case("PERF-RAW-02", "HTTP/1.1 流水线")
+
+        endpoints = [f"/api/books/{book_id}" for book_id in range(1, 11)]
+        with StandInServer() as server:
+            client = HttpClient(server.base_url, transport="raw")
+            responses = client.pipeline("GET", endpoints)
+            stats = client.connection_stats()
+            client.close()
+
+        self.assert_utils.assert_equals([response.json()["id"] for response in responses], list(range(1, 11)),
+                                        "响应顺序应与请求顺序一致")
+        self.assert_utils.assert_equals(stats["new_connections"], 1, "流水线请求应只使用一个连接")
+
+    @pytest.mark.performance
+    def test_concurrent_with_raw_transport(self):
+        """性能测试引擎应照常统计 raw 传输层的结果、新建连接数和阶段耗时"""
+        self.log_test_case("PERF-RAW-03", "raw 传输层并发测试")
+
+        with StandInServer() as server:
+            perf = PerformanceTest()
+            baseline = perf.concurrent_test(HttpClient(server.base_url).get, 1, 200, "/api/books/1")
+            client = HttpClient(server.base_url, transport="raw")
+            single = perf.concurrent_test(client.get, 1, 200, "/api/books/1")
+            result = perf.concurrent_test(client.get, 4, 5, "/api/books", warm_up=True)
+            client.close()
+
+        self.log_step(f"单线程吞吐量 requests: {baseline['throughput_rps']:.1f} req/s, "
+                      f"raw: {single['throughput_rps']:.1f} req/s")
+
+        self.assert_utils.assert_equals(result["failed_requests"], 0, "不应有失败请求")
+        self.assert_utils.assert_equals(result["new_connections"], 0, "预热后测量窗口内不应新建连接")
+        self.assert_utils.assert_equals(result["reused_connections"], 20, "所有请求都应复用预建连接")
+        self.assert_utils.assert_equals(list(result["phases"]), ["dns", "connect", "send", "ttfb", "body"],
+                                        "raw 传输层应记录各阶段耗时")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
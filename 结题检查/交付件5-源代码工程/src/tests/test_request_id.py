@@ -0,0 +1,68 @@
+"""
+请求ID关联测试
+验证每个请求携带唯一的 X-Request-ID、最慢样本保留请求ID，以及按请求ID与替身服务器访问日志关联拆分耗时
+"""
+
+import pytest
+from base_test import BaseTest
+from log_join import join_access_log, parse_access_log
+from performance_test import PerformanceTest
+from request_trace import tag_request
+from stand_in_server import StandInServer
+from utils import HttpClient
+from config import SLOWEST_SAMPLE_COUNT
+
+
+class TestRequestId(BaseTest):
+    """请求ID关联测试类"""
+
+    @pytest.mark.performance
+    def test_request_id_header(self, tmp_path):
+        """各传输层和请求模板发出的请求都应带有唯一的请求ID，调用方指定的请求ID应被沿用"""
+        self.log_test_case("PERF-RID-01", "请求ID请求头")
+
+        access_log = str(tmp_path / "access.log")
+        with StandInServer(access_log=access_log) as server:
+            HttpClient(server.base_url).get("/api/books/1")
+            HttpClient(server.base_url, transport="raw").get("/api/books/2")
+            HttpClient(server.base_url).template("GET", "/api/books/{id}").send(id=3)
+            HttpClient(server.base_url).get("/api/books/4", headers={"x-request-id": "caller-id"})
+            HttpClient(server.base_url, request_id_header=None).get("/api/books/5")
+
+        with open(access_log, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        ids = list(parse_access_log(access_log))
+        self.log_step(f"请求ID: {ids}")
+
+        self.assert_utils.assert_equals(len(lines), 5, "每个请求都应写一行访问日志")
+        self.assert_utils.assert_equals(len(ids), 4, "关闭请求ID后不应发送请求ID")
+        self.assert_utils.assert_equals(len(set(ids)), 4, "请求ID应唯一")
+        self.assert_utils.assert_true("caller-id" in ids, "应沿用调用方指定的请求ID")
+        self.assert_utils.assert_equals(tag_request({"X-Request-ID": "a"}), ({"X-Request-ID": "a"}, "a"),
+                                        "已有请求ID时不应生成新的")
+
+    @pytest.mark.performance
+    def test_join_slowest_with_access_log(self, tmp_path):
+        """最慢样本的请求ID应都能在访问日志中找到，服务器耗时不应超过客户端耗时"""
+        self.log_test_case("PERF-RID-02", "最慢样本与访问日志关联")
+
+        access_log = str(tmp_path / "access.log")
+        with StandInServer(delay_ms=5, access_log=access_log) as server:
+            client = HttpClient(server.base_url)
+            result = PerformanceTest().concurrent_test(client.get, 2, 10, "/api/books")
+
+        rows = join_access_log(result, access_log)
+
+        self.assert_utils.assert_equals(len(result["slowest_request_ids"]), SLOWEST_SAMPLE_COUNT,
+                                        "结果中应保留最慢样本的请求ID")
+        self.assert_utils.assert_equals([row["request_id"] for row in rows], result["slowest_request_ids"],
+                                        "关联结果应与最慢样本顺序一致")
+        self.assert_utils.assert_true(all(row["server_ms"] is not None for row in rows), "所有最慢请求都应关联成功")
+        self.assert_utils.assert_true(all(row["server_ms"] >= 5 for row in rows), "服务器耗时应包含模拟处理时间")
+        self.assert_utils.assert_true(
+            all(row["server_ms"] <= row["client_ms"] for row in rows), "服务器耗时不应超过客户端观察到的耗时"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,43 @@
+"""
+请求阶段耗时测试
+验证每个请求的 DNS解析、TCP连接、发送、等待首字节和读取响应体耗时被分别记录并给出百分位数
+"""
+
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+class TestRequestPhases(BaseTest):
+    """请求阶段耗时测试类"""
+
+    @pytest.mark.performance
+    def test_phase_breakdown(self):
+        """服务端处理时间应体现在等待首字节阶段，只有新建连接的请求有连接阶段耗时"""
+        self.log_test_case("PERF-PHASE-01", "请求阶段耗时分解")
+
+        with StandInServer(delay_ms=20) as server:
+            client = HttpClient(server.base_url)
+            result = PerformanceTest().concurrent_test(client.get, 4, 3, "/api/books")
+
+        phases = result["phases"]
+        self.log_step(f"阶段: {list(phases)}")
+
+        self.assert_utils.assert_equals(
+            list(phases), ["dns", "connect", "send", "ttfb", "body"], "HTTP 请求应记录五个阶段"
+        )
+        self.assert_utils.assert_true(
+            all(stats["count"] == 12 for stats in phases.values()), "每个阶段都应有 12 个样本"
+        )
+        self.assert_utils.assert_true(phases["ttfb"]["p50_ms"] >= 20, "服务端处理时间应计入等待首字节阶段")
+        self.assert_utils.assert_true(phases["connect"]["max_ms"] > 0, "新建连接的请求应有连接耗时")
+        self.assert_utils.assert_equals(phases["connect"]["p50_ms"], 0, "复用连接的请求连接耗时应为 0")
+        self.assert_utils.assert_true(
+            phases["send"]["max_ms"] < phases["ttfb"]["p50_ms"], "发送阶段不应包含等待服务端的时间"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,130 @@
+"""
+请求模板测试
+验证预先准备的请求可以按路径参数、查询参数和预编码请求体多次发送，通过客户端的传输层和条件请求缓存发送，
+并用微基准对比每个请求在客户端的准备开销
+"""
+
+import time
+import pytest
+import requests
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient, RequestTemplate, worker_local
+from raw_transport import RawResponse
+
+
+def per_request_us(func, rounds: int) -> float:
+    """
+    测量函数的平均单次耗时
+
+    Args:
+        func: 被测函数
+        rounds: 执行次数
+
+    Returns:
+        平均单次耗时（微秒）
+    """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+class TestRequestTemplate(BaseTest):
+    """请求模板测试类"""
+
+    @pytest.mark.performance
+    def test_template_send(self):
+        """路径参数、查询参数和预编码请求体都应正确发送，模板可直接作为被测函数"""
+        self.log_test_case("PERF-TEMPLATE-01", "请求模板发送")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url)
+
+            book = client.template("GET", "/api/books/{id}")
+            search = client.template("GET", "/api/books/search")
+            login = client.template("POST", "/api/login", json={"username": "", "password": ""})
+
+            found = book.send(id=3).json()
+            matched = search.send(params={"keyword": "测试图书1"}).json()
+            body = RequestTemplate.encode_json({"username": "admin", "password": "123"})
+            logged_in = login.send(body=body)
+            result = PerformanceTest().concurrent_test(worker_local(book.send), 4, 3, id=5)
+
+        self.log_step(f"图书: {found}, 搜索结果: {len(matched)} 本")
+
+        self.assert_utils.assert_equals(found["id"], 3, "应按路径参数请求对应图书")
+        self.assert_utils.assert_equals(len(matched), 10, "查询参数应正确编码")
+        self.assert_utils.assert_equals(logged_in.json()["result"], "admin", "应发送替换后的请求体")
+        self.assert_utils.assert_equals(client.get_cookies()["JSESSIONID"], "stand-in-admin", "响应的 cookies 应写入会话")
+        self.assert_utils.assert_equals(result["failed_requests"], 0, "不应有失败请求")
+        self.assert_utils.assert_equals(result["new_connections"], 4, "每个工作线程的会话应只建立一个连接")
+        self.assert_utils.assert_equals(list(result["phases"]), ["dns", "connect", "send", "ttfb", "body"],
+                                        "模板请求应记录各阶段耗时")
+
+    @pytest.mark.performance
+    def test_prepare_overhead(self):
+        """微基准：模板请求的客户端准备开销应低于 requests 每次调用的完整准备流程"""
+        self.log_test_case("PERF-TEMPLATE-02", "请求准备开销微基准")
+
+        client = HttpClient("http://127.0.0.1:8443")
+        client.set_cookies({"JSESSIONID": "abc"})
+        data = {"username": "admin", "password": "123", "remember": True}
+        params = {"page": 1, "size": 18}
+        session = client.session
+
+        def full_prepare():
+            # 与 Session.request 发送前的准备步骤相同
+            url = f"{client.base_url}/api/login"
+            request = session.prepare_request(requests.Request("POST", url, params=params, json=data))
+            session.merge_environment_settings(request.url, {}, None, None, None)
+
+        template = client.template("POST", "/api/login", json=data)
+        body = RequestTemplate.encode_json(data)
+
+        rounds = 2000
+        full_prepare(), template.prepare(params, body)
+        full_us = per_request_us(full_prepare, rounds)
+        template_us = per_request_us(lambda: template.prepare(params, body), rounds)
+        self.log_step(f"完整准备: {full_us:.1f}us/请求, 模板: {template_us:.1f}us/请求, "
+                      f"降低 {1 - template_us / full_us:.0%}")
+
+        self.assert_utils.assert_true(template_us < full_us, "模板请求的准备开销应更低")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url)
+            perf = PerformanceTest()
+            direct = perf.concurrent_test(client.get, 1, 200, "/api/books/1")
+            templated = perf.concurrent_test(client.template("GET", "/api/books/{id}").send, 1, 200, id=1)
+
+        self.log_step(f"单线程吞吐量 直接请求: {direct['throughput_rps']:.1f} req/s, "
+                      f"模板请求: {templated['throughput_rps']:.1f} req/s")
+
+    @pytest.mark.performance
+    def test_template_uses_client_transport_and_cache(self):
+        """模板应通过客户端的传输层发送（raw 客户端使用 raw 传输层），GET 请求经过客户端的条件请求缓存"""
+        self.log_test_case("PERF-TEMPLATE-03", "模板的传输层与缓存")
+
+        with StandInServer() as server:
+            for transport in ("requests", "raw"):
+                client = HttpClient(server.base_url, transport=transport, cache=True)
+                book = client.template("GET", "/api/books/{id}")
+                first = book.send(id=2)
+                second = book.send(id=2)
+                login = client.template("POST", "/api/login", json={"username": "admin", "password": "123"}).send()
+                stats = client.cache.stats()
+                client.close()
+
+                self.log_step(f"{transport}: 响应类型 {type(second).__name__}, 缓存统计 {stats}")
+                self.assert_utils.assert_equals(
+                    isinstance(first, RawResponse), transport == "raw", f"{transport} 客户端的模板应使用相同的传输层"
+                )
+                self.assert_utils.assert_equals(second.json()["id"], 2, "304 时应返回缓存的响应体")
+                self.assert_utils.assert_true(getattr(second, "from_cache", False), "第二次请求应由缓存校验")
+                self.assert_utils.assert_equals(stats["not_modified"], 1, "应统计 304 响应")
+                self.assert_utils.assert_equals(login.json()["result"], "admin", "POST 请求不经过缓存，应正常发送")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
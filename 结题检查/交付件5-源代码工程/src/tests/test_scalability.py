@@ -0,0 +1,54 @@
+"""
+可扩展性分析测试
+用已知参数的 USL 曲线生成测量数据，验证模型拟合、拐点检测和吞吐量预测
+"""
+
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from scalability import ScalabilityModel
+
+
+class TestScalabilityAnalysis(BaseTest):
+    """可扩展性分析测试类"""
+
+    @pytest.mark.performance
+    def test_usl_fit_recovers_parameters(self):
+        """由 λ=100、σ=0.05、κ=0.001 生成的数据应拟合回相同参数"""
+        self.log_test_case("PERF-USL-01", "USL 拟合与拐点检测")
+
+        truth = ScalabilityModel("usl", 100, 0.05, 0.001)
+        results = {}
+        for level in (2, 4, 8, 16, 32, 64, 128):
+            throughput = truth.predict(level)
+            results[level] = {
+                "throughput_rps": throughput,
+                # Little 定律：平均响应时间 = 并发数 / 吞吐量
+                "p95_ms": level / throughput * 1000,
+            }
+
+        analysis = PerformanceTest().scalability_analysis(results, predict_at=[1, 30, 256])
+
+        usl = analysis["usl"]
+        self.assert_utils.assert_true(usl["lambda_rps"] == pytest.approx(100, rel=1e-6), "λ 应为 100")
+        self.assert_utils.assert_true(usl["sigma"] == pytest.approx(0.05, rel=1e-6), "σ 应为 0.05")
+        self.assert_utils.assert_true(usl["kappa"] == pytest.approx(0.001, rel=1e-6), "κ 应为 0.001")
+        self.assert_utils.assert_true(usl["r_squared"] > 0.999, "USL 应完全拟合")
+        self.assert_utils.assert_true(usl["peak_concurrency"] == pytest.approx(30.8, abs=0.1), "峰值并发约为 30.8")
+
+        self.assert_utils.assert_true(
+            analysis["amdahl"]["r_squared"] < usl["r_squared"],
+            "存在一致性开销时 Amdahl 的拟合度应低于 USL"
+        )
+        self.assert_utils.assert_true(
+            analysis["predictions"][256]["usl_rps"] == pytest.approx(truth.predict(256), rel=1e-6),
+            "应能预测未测试级别的吞吐量"
+        )
+        self.assert_utils.assert_true(
+            8 <= analysis["knee_concurrency"] <= 64,
+            "响应时间拐点应位于吞吐量饱和区附近"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,104 @@
+"""
+耐久测试模式测试
+验证间隔快照的写出、性能劣化趋势的检测，以及跨越快照边界的失败调用和失败后的退避
+"""
+
+import json
+import threading
+import time
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+class TestSoakMode(BaseTest):
+    """耐久测试模式测试类"""
+
+    @pytest.mark.performance
+    @pytest.mark.slow
+    def test_stable_backend_passes(self, tmp_path):
+        """响应时间稳定时应按间隔写出快照且趋势判定通过"""
+        self.log_test_case("PERF-SOAK-01", "稳定后端的耐久测试")
+
+        snapshot_file = tmp_path / "soak.jsonl"
+        with StandInServer(delay_ms=5) as server:
+            client = HttpClient(server.base_url)
+            result = PerformanceTest().soak_test(
+                client.get, 3, 4, "/api/books",
+                snapshot_interval=0.5,
+                snapshot_file=str(snapshot_file),
+                # 秒级的测试中，少量抖动折算到每分钟就很可观，这里只检查明显的 P50 漂移
+                max_p50_slope=60,
+                max_p99_slope=None
+            )
+
+        snapshots = [json.loads(line) for line in snapshot_file.read_text(encoding="utf-8").splitlines()]
+        self.assert_utils.assert_equals(len(snapshots), 6, "3 秒测试应写出 6 个 0.5 秒快照")
+        self.assert_utils.assert_true(
+            sum(snapshot["requests"] for snapshot in snapshots) <= result["total_requests"],
+            "快照请求数之和不应超过总请求数"
+        )
+        self.assert_utils.assert_equals(result["failed_requests"], 0, "不应有失败请求")
+        self.assert_utils.assert_true(result["trend_passed"], "稳定后端不应判定为劣化")
+
+    @pytest.mark.performance
+    @pytest.mark.slow
+    def test_latency_drift_is_detected(self, tmp_path):
+        """响应时间随时间线性增长时应判定为劣化"""
+        self.log_test_case("PERF-SOAK-02", "响应时间漂移检测")
+
+        start = time.perf_counter()
+
+        def leaking_call():
+            # 每运行 1 秒响应时间增加 10ms，即 600ms/分钟
+            time.sleep(0.002 + (time.perf_counter() - start) * 0.01)
+
+        result = PerformanceTest().soak_test(
+            leaking_call, 2, 2,
+            snapshot_interval=0.4,
+            snapshot_file=str(tmp_path / "soak.jsonl")
+        )
+
+        self.assert_utils.assert_false(result["trend_passed"], "响应时间持续上升应判定为劣化")
+        self.assert_utils.assert_true(result["p50_slope_ms_per_min"] > 100, "P50 斜率应明显为正")
+
+    @pytest.mark.performance
+    def test_errors_across_intervals_are_counted(self, tmp_path):
+        """每次调用都跨越快照边界后失败：所有失败都应计入快照和总体统计，失败后应退避而不是空转"""
+        self.log_test_case("PERF-SOAK-03", "跨间隔的失败调用")
+
+        calls = []
+        lock = threading.Lock()
+
+        def failing_call(delay):
+            with lock:
+                calls.append(delay)
+            time.sleep(delay)
+            raise ConnectionError("后端不可用")
+
+        snapshot_file = tmp_path / "soak.jsonl"
+        slow = PerformanceTest().soak_test(
+            failing_call, 1, 2, 0.25, snapshot_interval=0.1, snapshot_file=str(snapshot_file)
+        )
+        snapshots = [json.loads(line) for line in snapshot_file.read_text(encoding="utf-8").splitlines()]
+        slow_calls = len(calls)
+
+        calls.clear()
+        fast = PerformanceTest().soak_test(
+            failing_call, 1, 1, 0, snapshot_interval=0.5, snapshot_file=str(tmp_path / "fast.jsonl")
+        )
+        self.log_step(f"慢失败调用 {slow_calls} 次, 快速失败调用 {len(calls)} 次")
+
+        self.assert_utils.assert_equals(slow["failed_requests"], slow_calls, "跨越快照边界的失败都应计入总体统计")
+        self.assert_utils.assert_true(
+            slow["failed_requests"] - sum(snapshot["errors"] for snapshot in snapshots) <= 2,
+            "除停止时的在途调用外，失败都应计入快照"
+        )
+        self.assert_utils.assert_equals(fast["failed_requests"], len(calls), "快速失败的调用都应计入")
+        self.assert_utils.assert_true(len(calls) <= 1 / 0.05 + 2, "失败后应退避，不应空转")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
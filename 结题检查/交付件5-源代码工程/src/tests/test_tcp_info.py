@@ -0,0 +1,58 @@
+"""
+TCP_INFO 采样测试
+验证开启 tcp_info 后每个请求都带有连接的内核统计，并附加到最慢样本上
+"""
+
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from tcp_info import is_supported
+from utils import HttpClient
+from config import SLOWEST_SAMPLE_COUNT
+
+
+@pytest.mark.skipif(not is_supported(), reason="TCP_INFO 仅在 Linux 上可用")
+class TestTcpInfo(BaseTest):
+    """TCP_INFO 采样测试类"""
+
+    @pytest.mark.performance
+    def test_slowest_samples_carry_tcp_info(self):
+        """开启采样后，最慢样本按耗时降序排列并带有 RTT、重传和拥塞窗口"""
+        self.log_test_case("PERF-TCPINFO-01", "TCP_INFO 采样")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url, tcp_info=True)
+            result = PerformanceTest().concurrent_test(client.get, 4, 5, "/api/books")
+
+        slowest = result["slowest_samples"]
+        self.log_step(f"TCP_INFO 汇总: {result['tcp_info']}")
+
+        self.assert_utils.assert_equals(result["tcp_info"]["samples"], 20, "每个请求都应采样一次")
+        self.assert_utils.assert_equals(len(slowest), SLOWEST_SAMPLE_COUNT, "应保留配置数量的最慢样本")
+        self.assert_utils.assert_true(
+            all(a["duration_ms"] >= b["duration_ms"] for a, b in zip(slowest, slowest[1:])),
+            "最慢样本应按耗时降序排列"
+        )
+        info = slowest[0]["requests"][0]["tcp_info"]
+        self.assert_utils.assert_true(info["snd_cwnd"] > 0, "拥塞窗口应为正数")
+        self.assert_utils.assert_true(info["rtt_ms"] >= 0 and info["retrans_delta"] >= 0, "RTT 和重传数应有效")
+
+    @pytest.mark.performance
+    def test_sampling_disabled_by_default(self):
+        """默认不采样，结果中不包含 TCP_INFO，最慢样本只带请求ID"""
+        self.log_test_case("PERF-TCPINFO-02", "默认关闭 TCP_INFO 采样")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url)
+            result = PerformanceTest().concurrent_test(client.get, 2, 2, "/api/books")
+
+        self.assert_utils.assert_false("tcp_info" in result, "默认不应采样 TCP_INFO")
+        self.assert_utils.assert_false(
+            any("tcp_info" in request for sample in result["slowest_samples"] for request in sample["requests"]),
+            "最慢样本中不应包含 TCP_INFO"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
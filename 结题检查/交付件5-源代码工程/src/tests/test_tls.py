@@ -0,0 +1,71 @@
+"""
+TLS 握手与会话恢复测试
+使用自签名证书的 HTTPS 替身服务器，验证证书校验、完整握手与恢复会话握手的统计、TLS 握手阶段耗时，
+以及长连接、恢复会话和强制完整握手三种模式的对比测试
+"""
+
+import shutil
+import pytest
+import requests
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="生成自签名证书需要 openssl 命令行工具")
+class TestTls(BaseTest):
+    """TLS 握手与会话恢复测试类"""
+
+    @pytest.mark.performance
+    def test_certificate_verification(self):
+        """未指定替身服务器的证书时应拒绝连接，指定后请求成功"""
+        self.log_test_case("PERF-TLS-01", "自签名证书校验")
+
+        with StandInServer(tls=True) as server:
+            with pytest.raises(requests.exceptions.SSLError):
+                HttpClient(server.base_url).get("/api/categories")
+            response = HttpClient(server.base_url, verify=server.ca_file).get("/api/categories")
+
+        self.assert_utils.assert_true(server.base_url.startswith("https://"), "替身服务器应使用 HTTPS")
+        self.assert_utils.assert_equals(response.status_code, 200, "指定 CA 证书后请求应成功")
+
+    @pytest.mark.performance
+    def test_session_resumption_stats(self):
+        """每请求新建连接时，除第一个连接外都应恢复 TLS 会话，握手耗时计入 tls 阶段"""
+        self.log_test_case("PERF-TLS-02", "TLS 会话恢复统计")
+
+        with StandInServer(tls=True) as server:
+            for transport in ("requests", "raw"):
+                client = HttpClient(server.base_url, transport=transport, verify=server.ca_file, keep_alive=False)
+                result = PerformanceTest().concurrent_test(client.get, 1, 5, "/api/books/1")
+                client.close()
+                self.log_step(f"{transport}: {result['tls']}")
+
+                self.assert_utils.assert_equals(result["failed_requests"], 0, "不应有失败请求")
+                self.assert_utils.assert_equals(result["tls"]["handshakes"], 5, "每个请求都应新建连接并握手")
+                self.assert_utils.assert_equals(result["tls"]["resumed_handshakes"], 4, "第一个连接之后应恢复会话")
+                self.assert_utils.assert_true("tls" in result["phases"], "应记录 TLS 握手阶段耗时")
+
+    @pytest.mark.performance
+    def test_tls_handshake_comparison(self):
+        """长连接几乎不握手，强制完整握手模式下每个请求都是完整握手"""
+        self.log_test_case("PERF-TLS-03", "TLS 握手成本对比")
+
+        with StandInServer(tls=True) as server:
+            client = HttpClient(server.base_url, verify=server.ca_file)
+            results = PerformanceTest().tls_handshake_comparison(client.get, 2, 5, "/api/books/1")
+
+        keep_alive, resumed, full = results["keep-alive"]["tls"], results["resumed"]["tls"], results["full"]["tls"]
+        self.log_step(f"握手耗时 P50 恢复会话: {results['resumed']['phases']['tls']['p50_ms']:.3f} ms, "
+                      f"完整握手: {results['full']['phases']['tls']['p50_ms']:.3f} ms")
+
+        self.assert_utils.assert_true(keep_alive["handshakes"] <= 2, "长连接模式每个工作线程最多握手一次")
+        self.assert_utils.assert_equals(resumed["handshakes"], 10, "恢复会话模式每个请求都应新建连接")
+        self.assert_utils.assert_true(resumed["resumed_handshakes"] >= 8, "恢复会话模式应复用之前的 TLS 会话")
+        self.assert_utils.assert_equals(full["full_handshakes"], 10, "强制完整握手模式每个请求都应完整握手")
+        self.assert_utils.assert_equals(full["resumed_handshakes"], 0, "强制完整握手模式不应恢复会话")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])
@@ -0,0 +1,87 @@
+"""
+工作线程独立会话测试
+验证每个工作线程使用独立的 HttpClient，复制登录状态，并在各迭代间复用同一会话
+"""
+
+import threading
+import pytest
+from base_test import BaseTest
+from performance_test import PerformanceTest
+from stand_in_server import StandInServer
+from utils import HttpClient, worker_local
+
+
+class BooksPage:
+    """持有 client 属性的被测对象，记录每次调用所在线程和使用的会话"""
+
+    def __init__(self, client: HttpClient):
+        self.client = client
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_books(self):
+        with self.lock:
+            self.calls.append((
+                threading.get_ident(),
+                id(self.client.session),
+                self.client.session.cookies.get("token"),
+                self.client.session.headers.get("Authorization"),
+            ))
+        return self.client.get("/api/books")
+
+
+class TestWorkerSessions(BaseTest):
+    """工作线程独立会话测试类"""
+
+    @pytest.mark.performance
+    def test_isolated_sessions_per_worker(self):
+        """每个工作线程一份会话，登录状态被复制，共享会话不发送任何请求"""
+        self.log_test_case("PERF-SESSION-01", "工作线程独立会话")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url)
+            client.set_cookies({"token": "abc"})
+            client.session.headers["Authorization"] = "Bearer abc"
+            page = BooksPage(client)
+
+            result = PerformanceTest().concurrent_test(page.get_books, 4, 3, isolate_sessions=True)
+
+        threads = {call[0] for call in page.calls}
+        sessions = {call[1] for call in page.calls}
+        self.log_step(f"线程数: {len(threads)}, 会话数: {len(sessions)}")
+
+        self.assert_utils.assert_equals(result["failed_requests"], 0, "不应有失败请求")
+        self.assert_utils.assert_equals(len(page.calls), 12, "应调用 12 次")
+        self.assert_utils.assert_equals(len(sessions), 4, "每个工作线程应有一份会话")
+        self.assert_utils.assert_true(
+            all(len({call[1] for call in page.calls if call[0] == thread}) == 1 for thread in threads),
+            "同一线程的各次迭代应复用同一会话"
+        )
+        self.assert_utils.assert_false(id(client.session) in sessions, "不应使用共享会话")
+        self.assert_utils.assert_true(
+            all(call[2] == "abc" and call[3] == "Bearer abc" for call in page.calls),
+            "cookies 和认证头应复制到独立会话"
+        )
+        self.assert_utils.assert_equals(client.connection_stats()["requests"], 0, "共享会话不应发送请求")
+        self.assert_utils.assert_equals(result["new_connections"], 4, "每个会话应只建立一个连接")
+
+    @pytest.mark.performance
+    def test_worker_local_with_warm_up(self):
+        """worker_local 包装的方法预热后，测量窗口内不新建连接"""
+        self.log_test_case("PERF-SESSION-02", "worker_local 预热")
+
+        with StandInServer() as server:
+            client = HttpClient(server.base_url)
+            get_books = worker_local(client.get)
+
+            result = PerformanceTest().concurrent_test(get_books, 4, 3, "/api/books", warm_up=True)
+            sessions = len(get_books.clients)
+            get_books.close()
+
+        self.assert_utils.assert_equals(sessions, 4, "每个工作线程应有一份会话")
+        self.assert_utils.assert_equals(result["new_connections"], 0, "测量窗口内不应新建连接")
+        self.assert_utils.assert_equals(result["reused_connections"], 12, "所有请求都应复用预建连接")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "-m", "performance"])